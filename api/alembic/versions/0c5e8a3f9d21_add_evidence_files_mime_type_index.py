@@ -0,0 +1,33 @@
+"""Add evidence_files.mime_type index for item filters
+
+Revision ID: 0c5e8a3f9d21
+Revises: b7d2e94f1c36
+Create Date: 2026-10-18 18:47:09.512384
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c5e8a3f9d21'
+down_revision: Union[str, None] = 'b7d2e94f1c36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # text_pattern_ops serves equality and prefix (LIKE 'image/%') filters alike
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_evidence_files_mime_type', 'evidence_files', ['mime_type'],
+            postgresql_ops={'mime_type': 'text_pattern_ops'}, postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_evidence_files_mime_type', table_name='evidence_files', postgresql_concurrently=True, if_exists=True
+        )
@@ -0,0 +1,29 @@
+"""Add ingestion_jobs.spool_node so jobs are claimed where they were spooled
+
+Revision ID: 3d9b6e2f7a14
+Revises: 6a1f0d4c8e57
+Create Date: 2026-10-18 22:41:36.208517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d9b6e2f7a14'
+down_revision: Union[str, None] = '6a1f0d4c8e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The API also runs create_all() on startup, so the column may already exist
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('ingestion_jobs')}
+    if 'spool_node' not in columns:
+        op.add_column('ingestion_jobs', sa.Column('spool_node', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('ingestion_jobs', 'spool_node')
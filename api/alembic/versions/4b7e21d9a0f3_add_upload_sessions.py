@@ -0,0 +1,44 @@
+"""Add upload_sessions for resumable chunked uploads
+
+Revision ID: 4b7e21d9a0f3
+Revises: cde80be40b82
+Create Date: 2026-10-18 10:02:17.518934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e21d9a0f3'
+down_revision: Union[str, None] = 'cde80be40b82'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The API also runs create_all() on startup, so the table may already exist
+    if sa.inspect(op.get_bind()).has_table('upload_sessions'):
+        return
+    op.create_table(
+        'upload_sessions',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('filename', sa.String(), nullable=False),
+        sa.Column('content_type', sa.String(), nullable=True),
+        sa.Column('upload_type', sa.String(), nullable=False),
+        sa.Column('total_size', sa.BigInteger(), nullable=False),
+        sa.Column('received_bytes', sa.BigInteger(), nullable=False),
+        sa.Column('expected_sha256', sa.String(length=64), nullable=True),
+        sa.Column('sha256', sa.String(length=64), nullable=True),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('result', postgresql.JSONB(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('upload_sessions')
@@ -0,0 +1,38 @@
+"""Add signature_verifications cache
+
+Revision ID: 5e21c7d94b3a
+Revises: a83c5f0e6d12
+Create Date: 2026-10-18 13:02:44.118529
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e21c7d94b3a'
+down_revision: Union[str, None] = 'a83c5f0e6d12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The API also runs create_all() on startup, so the table may already exist
+    if sa.inspect(op.get_bind()).has_table('signature_verifications'):
+        return
+    op.create_table(
+        'signature_verifications',
+        sa.Column('data_sha256', sa.String(length=64), nullable=False),
+        sa.Column('signature_sha256', sa.String(length=64), nullable=False),
+        sa.Column('fingerprint', sa.String(length=40), nullable=False),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('trust_level', sa.Integer(), nullable=True),
+        sa.Column('verified_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('data_sha256', 'signature_sha256', 'fingerprint'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('signature_verifications')
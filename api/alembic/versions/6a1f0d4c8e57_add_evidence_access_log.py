@@ -0,0 +1,62 @@
+"""Add append-only evidence_access_log
+
+Revision ID: 6a1f0d4c8e57
+Revises: 0c5e8a3f9d21
+Create Date: 2026-10-18 19:26:55.140273
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a1f0d4c8e57'
+down_revision: Union[str, None] = '0c5e8a3f9d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The API also runs create_all() on startup, which creates the table and its triggers
+    if sa.inspect(op.get_bind()).has_table('evidence_access_log'):
+        return
+    op.create_table(
+        'evidence_access_log',
+        sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column('object_name', sa.String(), nullable=False),
+        sa.Column('minio_version_id', sa.String(), nullable=True),
+        sa.Column('etag', sa.String(), nullable=True),
+        sa.Column('range_start', sa.BigInteger(), nullable=True),
+        sa.Column('range_end', sa.BigInteger(), nullable=True),
+        sa.Column('bytes_sent', sa.BigInteger(), nullable=False),
+        sa.Column('status_code', sa.Integer(), nullable=False),
+        sa.Column('completed', sa.Boolean(), nullable=False),
+        sa.Column('client_ip', sa.String(), nullable=True),
+        sa.Column('user_agent', sa.String(), nullable=True),
+        sa.Column('requested_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_evidence_access_log_object_name', 'evidence_access_log', ['object_name'])
+    op.create_index('ix_evidence_access_log_requested_at', 'evidence_access_log', ['requested_at'])
+    op.execute("""
+        CREATE OR REPLACE FUNCTION evidence_access_log_append_only() RETURNS trigger AS $$
+        BEGIN
+            RAISE EXCEPTION 'evidence_access_log is append-only';
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER evidence_access_log_no_update_delete BEFORE UPDATE OR DELETE ON evidence_access_log
+        FOR EACH ROW EXECUTE FUNCTION evidence_access_log_append_only()
+    """)
+    op.execute("""
+        CREATE TRIGGER evidence_access_log_no_truncate BEFORE TRUNCATE ON evidence_access_log
+        FOR EACH STATEMENT EXECUTE FUNCTION evidence_access_log_append_only()
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('evidence_access_log')
+    op.execute('DROP FUNCTION IF EXISTS evidence_access_log_append_only()')
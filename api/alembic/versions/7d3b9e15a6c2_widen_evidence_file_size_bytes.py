@@ -0,0 +1,26 @@
+"""Widen evidence_files.size_bytes to BIGINT for video evidence
+
+Revision ID: 7d3b9e15a6c2
+Revises: c4f8a21e7b90
+Create Date: 2026-10-18 15:37:50.217304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3b9e15a6c2'
+down_revision: Union[str, None] = 'c4f8a21e7b90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column('evidence_files', 'size_bytes', type_=sa.BigInteger(), existing_type=sa.Integer(), existing_nullable=True)
+
+
+def downgrade() -> None:
+    op.alter_column('evidence_files', 'size_bytes', type_=sa.Integer(), existing_type=sa.BigInteger(), existing_nullable=True)
@@ -0,0 +1,51 @@
+"""Add ingestion_jobs background queue
+
+Revision ID: a83c5f0e6d12
+Revises: 4b7e21d9a0f3
+Create Date: 2026-10-18 11:20:05.331870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a83c5f0e6d12'
+down_revision: Union[str, None] = '4b7e21d9a0f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The API also runs create_all() on startup, so the table may already exist
+    if sa.inspect(op.get_bind()).has_table('ingestion_jobs'):
+        return
+    op.create_table(
+        'ingestion_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('job_type', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('stage', sa.String(), nullable=True),
+        sa.Column('progress', sa.Integer(), nullable=False),
+        sa.Column('spool_path', sa.String(), nullable=False),
+        sa.Column('filename', sa.String(), nullable=False),
+        sa.Column('content_type', sa.String(), nullable=True),
+        sa.Column('sha256', sa.String(length=64), nullable=True),
+        sa.Column('size_bytes', sa.BigInteger(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('result', postgresql.JSONB(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_ingestion_jobs_status', 'ingestion_jobs', ['status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ingestion_jobs_status', table_name='ingestion_jobs')
+    op.drop_table('ingestion_jobs')
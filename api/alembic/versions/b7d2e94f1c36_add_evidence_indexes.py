@@ -0,0 +1,51 @@
+"""Add spatial, temporal and lookup indexes for evidence queries
+
+Revision ID: b7d2e94f1c36
+Revises: e91f4c7a2d58
+Create Date: 2026-10-18 18:02:47.315920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e94f1c36'
+down_revision: Union[str, None] = 'e91f4c7a2d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns, access method). Names match the models, so databases
+# created by create_all() on startup already have them and are skipped.
+INDEXES = [
+    ('idx_evidence_files_geometry', 'evidence_files', ['geometry'], 'gist'),
+    ('ix_evidence_files_geometry_captured_at', 'evidence_files', ['geometry', 'captured_at'], 'gist'),
+    ('ix_evidence_files_captured_at', 'evidence_files', ['captured_at'], None),
+    ('ix_evidence_files_object_id', 'evidence_files', ['object_id'], None),
+    ('ix_evidence_files_sha256', 'evidence_files', ['sha256'], None),
+    ('ix_evidence_objects_created_at', 'evidence_objects', ['created_at'], None),
+    ('ix_evidence_objects_object_type', 'evidence_objects', ['object_type'], None),
+    ('ix_evidence_derivatives_object_name', 'evidence_derivatives', ['object_name'], None),
+]
+
+
+def upgrade() -> None:
+    # GiST over (geography, timestamp) needs the btree_gist operator classes
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    # CONCURRENTLY keeps evidence tables writable while the indexes build; it cannot run in a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, using in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_using=using or 'btree', postgresql_concurrently=True, if_not_exists=True,
+            )
+    op.execute('ANALYZE evidence_files')
+    op.execute('ANALYZE evidence_objects')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        # idx_evidence_files_geometry is created with the table by GeoAlchemy2; keep it
+        for name, table, _, _ in reversed(INDEXES[1:]):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
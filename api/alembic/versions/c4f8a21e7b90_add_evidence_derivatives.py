@@ -0,0 +1,47 @@
+"""Add evidence_derivatives pyramid
+
+Revision ID: c4f8a21e7b90
+Revises: 5e21c7d94b3a
+Create Date: 2026-10-18 14:41:12.604417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f8a21e7b90'
+down_revision: Union[str, None] = '5e21c7d94b3a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The API also runs create_all() on startup, so the table may already exist
+    if sa.inspect(op.get_bind()).has_table('evidence_derivatives'):
+        return
+    op.create_table(
+        'evidence_derivatives',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('evidence_file_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('evidence_files.id'), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('format', sa.String(), nullable=False),
+        sa.Column('width', sa.Integer(), nullable=False),
+        sa.Column('height', sa.Integer(), nullable=False),
+        sa.Column('object_name', sa.String(), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('size_bytes', sa.Integer(), nullable=False),
+        sa.Column('content_type', sa.String(), nullable=False),
+        sa.Column('minio_version_id', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.UniqueConstraint('evidence_file_id', 'size', 'format'),
+    )
+    op.create_index('ix_evidence_derivatives_evidence_file_id', 'evidence_derivatives', ['evidence_file_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_evidence_derivatives_evidence_file_id', table_name='evidence_derivatives')
+    op.drop_table('evidence_derivatives')
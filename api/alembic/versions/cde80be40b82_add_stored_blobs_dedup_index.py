@@ -0,0 +1,40 @@
+"""Add stored_blobs content-addressed dedup index
+
+Revision ID: cde80be40b82
+Revises: 9f06e712c347
+Create Date: 2026-10-18 09:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cde80be40b82'
+down_revision: Union[str, None] = '9f06e712c347'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The API also runs create_all() on startup, so the table may already exist
+    if sa.inspect(op.get_bind()).has_table('stored_blobs'):
+        return
+    op.create_table(
+        'stored_blobs',
+        sa.Column('object_name', sa.String(), primary_key=True),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('size_bytes', sa.BigInteger(), nullable=True),
+        sa.Column('content_type', sa.String(), nullable=True),
+        sa.Column('minio_version_id', sa.String(), nullable=True),
+        sa.Column('etag', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_stored_blobs_sha256', 'stored_blobs', ['sha256'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stored_blobs_sha256', table_name='stored_blobs')
+    op.drop_table('stored_blobs')
@@ -0,0 +1,37 @@
+"""Add evidence_files.created_at for keyset pagination
+
+Revision ID: e91f4c7a2d58
+Revises: 7d3b9e15a6c2
+Create Date: 2026-10-18 16:20:31.908145
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e91f4c7a2d58'
+down_revision: Union[str, None] = '7d3b9e15a6c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('evidence_files')}
+    if 'created_at' not in columns:
+        op.add_column('evidence_files', sa.Column('created_at', sa.DateTime(), nullable=True))
+        # Existing files inherit the ingestion time of their evidence object
+        op.execute(
+            "UPDATE evidence_files f SET created_at = o.created_at "
+            "FROM evidence_objects o WHERE f.object_id = o.id AND f.created_at IS NULL"
+        )
+        op.execute("UPDATE evidence_files SET created_at = now() WHERE created_at IS NULL")
+        op.alter_column('evidence_files', 'created_at', nullable=False)
+    op.create_index('ix_evidence_files_created_at_id', 'evidence_files', ['created_at', 'id'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_evidence_files_created_at_id', table_name='evidence_files')
+    op.drop_column('evidence_files', 'created_at')
@@ -1,32 +1,93 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Depends
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, Header, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from uuid import uuid4
 import uuid
 import shutil
 import tempfile
 import zipfile
-import hashlib
 import json
+import re
 import yaml # For eyeWitness
 import os
 import logging
+import asyncio
 import subprocess
-from typing import List, Optional, Dict, Any
+from typing import BinaryIO, List, NamedTuple, Optional, Dict, Any, Tuple
 from minio import Minio
 from minio.error import S3Error
-from datetime import timedelta, datetime, timezone # Added timezone
+from datetime import datetime, timezone # Added timezone
 import mimetypes # Ensure mimetypes is imported
-import gnupg # Added for ProofMode GPG verification
-from PIL import Image # Added for thumbnail generation
+from urllib.parse import quote
 from sqlalchemy.orm import Session
-from sqlalchemy import func 
+from sqlalchemy import cast, func, tuple_
+from geoalchemy2 import Geometry
 from geoalchemy2.shape import from_shape, to_shape
 from geoalchemy2.functions import ST_MakeEnvelope, ST_Intersects 
 from shapely.geometry import Point
 from .database import get_db, create_tables
 from .models import EvidenceObject, EvidenceFile
-from .services.immudb_service import immudb_service
+from .services.cluster_service import CLUSTER_MAX_ZOOM, cluster_cache, cluster_feature, cluster_query, grid_size
+from .services.dedup_service import dedup_index
+from .services.derivative_service import derivative_service
+from .services.download_service import (
+    RangeNotSatisfiable,
+    access_log,
+    access_record,
+    parse_range,
+    stream_object,
+)
+from .services.geojson_service import STREAM_BATCH_ROWS, dumps, stream_feature_collection
+from .services.hashing_service import DigestCache, hashing_service
+from .services.immudb_service import ErrCorruptedData, immudb_service
+from .services.job_queue_service import (
+    PermanentJobError,
+    ProgressCallback,
+    ingestion_queue,
+    job_status,
+)
+from .services.pagination_service import (
+    COUNT_MODES,
+    InvalidCursorError,
+    count_cache,
+    decode_cursor,
+    encode_cursor,
+    estimate_count,
+)
+from .services.response_cache_service import (
+    ResponseCache,
+    dataset_version,
+    etag_matches,
+    response_cache,
+)
+from .services.presign_service import PRESIGN_BATCH_MAX, presign_cache
+from .services.resumable_upload_service import (
+    UploadSessionError,
+    resumable_upload_service,
+    session_status,
+)
+from .services.signature_service import is_public_key_file, signature_verifier
+from .services.storage_service import UploadBatch, upload_scheduler
+from .services.thumbnail_service import THUMBNAIL_SIZE, thumbnail_service
+from .services.tile_service import (
+    MVT_MEDIA_TYPE,
+    TILE_CACHE_TTL,
+    naive_utc,
+    tile_filters,
+    tile_in_range,
+    tile_service,
+)
+from .services.verification_cache_service import verification_cache
+from .services.video_service import VIDEO_MIME_TYPES, video_service
+from .services.zip_stream_service import (
+    DigestMismatchError,
+    check_member_name,
+    extract_members,
+    hash_member,
+    list_members,
+    put_member,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -36,99 +97,258 @@ app = FastAPI(
     version="0.1.0",
 )
 
+# Derived read caches start over whenever an ingest commits
+for derived_cache in (count_cache, tile_service.cache, cluster_cache):
+    dataset_version.subscribe(derived_cache.clear)
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize database tables on startup"""
     create_tables()
+    ingestion_queue.start()
+    access_log.start()
+    resumable_upload_service.start()
+    try:
+        await run_in_threadpool(signature_verifier.warm)
+    except Exception as e:
+        logger.warning(f"GPG keyring not loaded at startup: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release worker pools"""
+    hashing_service.close()
+    upload_scheduler.close()
+    signature_verifier.close()
+    thumbnail_service.close()
+    video_service.close()
+    await ingestion_queue.stop()
+    await access_log.stop()
+    await resumable_upload_service.stop()
+    await run_in_threadpool(immudb_service.close)
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint to verify API is running."""
     return {"status": "ok"}
 
+def build_items_query(
+    db: Session,
+    bbox: Optional[str] = None,
+    captured_from: Optional[datetime] = None,
+    captured_to: Optional[datetime] = None,
+    object_type: Optional[str] = None,
+    mime_type: Optional[str] = None,
+    object_id: Optional[uuid.UUID] = None,
+):
+    """
+    Evidence files with location data as a single SELECT: the parent object's
+    columns come from an outer join and the coordinates from ST_X/ST_Y, so no
+    per-row relationship loads or WKB decoding are needed. Every filter is a
+    WHERE clause served by an index (see the evidence_files/evidence_objects models).
+    """
+    point = cast(EvidenceFile.geometry, Geometry(geometry_type="POINT", srid=4326))
+    query = (
+        db.query(
+            EvidenceFile.id,
+            EvidenceFile.object_id,
+            EvidenceFile.filename,
+            EvidenceFile.sha256,
+            EvidenceFile.captured_at,
+            EvidenceFile.mime_type,
+            EvidenceFile.size_bytes,
+            EvidenceFile.minio_object_name,
+            EvidenceFile.created_at,
+            EvidenceObject.created_at.label("object_created_at"),
+            EvidenceObject.object_type,
+            func.ST_X(point).label("lon"),
+            func.ST_Y(point).label("lat"),
+        )
+        .select_from(EvidenceFile)
+        .outerjoin(EvidenceObject, EvidenceFile.object_id == EvidenceObject.id)
+        .filter(EvidenceFile.geometry.isnot(None))
+    )
+    
+    # Apply bounding box filter if provided
+    if bbox:
+        try:
+            bbox_coords = [float(x) for x in bbox.split(',')]
+            if len(bbox_coords) != 4:
+                raise ValueError("Bounding box must have 4 coordinates")
+            
+            min_lon, min_lat, max_lon, max_lat = bbox_coords
+            # Create a bbox polygon for PostGIS intersection
+            bbox_polygon = ST_MakeEnvelope(min_lon, min_lat, max_lon, max_lat, 4326)
+            query = query.filter(ST_Intersects(EvidenceFile.geometry, bbox_polygon))
+            
+        except (ValueError, IndexError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid bbox parameter: {str(e)}")
+    
+    # captured_at is stored as naive UTC
+    captured_from, captured_to = naive_utc(captured_from), naive_utc(captured_to)
+    if captured_from and captured_to and captured_from >= captured_to:
+        raise HTTPException(status_code=400, detail="captured_from must be before captured_to.")
+    if captured_from:
+        query = query.filter(EvidenceFile.captured_at >= captured_from)
+    if captured_to:
+        query = query.filter(EvidenceFile.captured_at < captured_to)
+    if object_type:
+        query = query.filter(EvidenceObject.object_type == object_type)
+    if mime_type:
+        # "image/" selects the whole family; the pattern_ops index serves the prefix match
+        if mime_type.endswith("/"):
+            query = query.filter(EvidenceFile.mime_type.startswith(mime_type, autoescape=True))
+        else:
+            query = query.filter(EvidenceFile.mime_type == mime_type)
+    if object_id:
+        query = query.filter(EvidenceFile.object_id == object_id)
+    return query
+
+def item_feature(row) -> Dict[str, Any]:
+    """GeoJSON Feature for one row of build_items_query"""
+    return {
+        "type": "Feature",
+        "geometry": {
+            "type": "Point",
+            "coordinates": [row.lon, row.lat]  # [longitude, latitude]
+        } if row.lon is not None else None,
+        "properties": {
+            "id": str(row.id),
+            "object_id": str(row.object_id),
+            "filename": row.filename,
+            "sha256": row.sha256,
+            "captured_at": row.captured_at.isoformat() if row.captured_at else None,
+            "mime_type": row.mime_type,
+            "size_bytes": row.size_bytes,
+            "minio_object_name": row.minio_object_name,
+            "created_at": row.object_created_at.isoformat() if row.object_created_at else None,
+            "object_type": row.object_type
+        }
+    }
+
+def items_cache_filters(
+    bbox: Optional[str] = None,
+    captured_from: Optional[datetime] = None,
+    captured_to: Optional[datetime] = None,
+    object_type: Optional[str] = None,
+    mime_type: Optional[str] = None,
+    object_id: Optional[uuid.UUID] = None,
+) -> Tuple:
+    """Filters in canonical form for cache keys: numeric bbox, naive UTC datetimes"""
+    try:
+        bbox_key = tuple(float(x) for x in bbox.split(',')) if bbox else None
+    except ValueError:
+        bbox_key = bbox
+    return (bbox_key, naive_utc(captured_from), naive_utc(captured_to), object_type, mime_type, object_id)
+
 @app.get("/api/v1/items")
 async def get_evidence_items(
     limit: int = 100,
     offset: int = 0,
     bbox: Optional[str] = None,
+    cursor: Optional[str] = None,
+    count: str = "none",
+    captured_from: Optional[datetime] = None,
+    captured_to: Optional[datetime] = None,
+    object_type: Optional[str] = None,
+    mime_type: Optional[str] = None,
+    object_id: Optional[uuid.UUID] = None,
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
     db: Session = Depends(get_db)
 ):
     """
-    Get evidence items as GeoJSON FeatureCollection.
+    Get evidence items as GeoJSON FeatureCollection, newest first.
     
     Parameters:
     - limit: Maximum number of items to return (default: 100)
-    - offset: Number of items to skip (default: 0) 
+    - cursor: metadata.next_cursor of the previous page; keyset pagination on (created_at, id)
+    - offset: Number of items to skip (default: 0); deprecated, cost grows with depth - use cursor
     - bbox: Bounding box filter as "min_lon,min_lat,max_lon,max_lat"
+    - captured_from / captured_to: captured_at range, from inclusive, to exclusive
+    - object_type: Type of the parent evidence object (e.g. "proofmode_bundle")
+    - mime_type: Exact type, or a family with a trailing slash (e.g. "image/")
+    - object_id: Files of one evidence object
+    - count: "none" (default), "estimate" (planner estimate) or "exact" (cached briefly);
+      totals honour all filters
     
-    Returns GeoJSON FeatureCollection of all evidence files with location data.
+    Returns GeoJSON FeatureCollection of all evidence files with location data,
+    streamed from a server-side cursor; metadata follows the features.
+    Responses carry a strong ETag tied to the dataset version; a matching
+    If-None-Match gets 304 without a database query.
     """
+    if count not in COUNT_MODES:
+        raise HTTPException(status_code=400, detail=f"count must be one of {', '.join(COUNT_MODES)}")
+    if cursor and offset:
+        raise HTTPException(status_code=400, detail="Use either cursor or offset, not both.")
+    filters = {
+        "bbox": bbox,
+        "captured_from": captured_from,
+        "captured_to": captured_to,
+        "object_type": object_type,
+        "mime_type": mime_type,
+        "object_id": object_id,
+    }
+    
+    # Evidence only changes when an ingest commits, so identical requests within one
+    # dataset version get identical bytes. Planner estimates drift, so they are not cached.
+    cacheable = count != "estimate"
+    version = dataset_version.current()
+    cache_key = ("items", limit, offset, cursor, count, *items_cache_filters(**filters))
+    headers = {}
+    if cacheable:
+        headers = {"ETag": ResponseCache.etag(cache_key, version), "Cache-Control": "no-cache"}
+        if etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        body = response_cache.get((cache_key, version))
+        if body is not None:
+            return Response(content=body, media_type="application/geo+json", headers=headers)
+    
     try:
-        # Start with base query for evidence files that have geometry
-        query = db.query(EvidenceFile).filter(EvidenceFile.geometry.isnot(None))
-        
-        # Apply bounding box filter if provided
-        if bbox:
-            try:
-                bbox_coords = [float(x) for x in bbox.split(',')]
-                if len(bbox_coords) != 4:
-                    raise ValueError("Bounding box must have 4 coordinates")
-                
-                min_lon, min_lat, max_lon, max_lat = bbox_coords
-                # Create a bbox polygon for PostGIS intersection
-                bbox_polygon = ST_MakeEnvelope(min_lon, min_lat, max_lon, max_lat, 4326)
-                query = query.filter(ST_Intersects(EvidenceFile.geometry, bbox_polygon))
-                
-            except (ValueError, IndexError) as e:
-                raise HTTPException(status_code=400, detail=f"Invalid bbox parameter: {str(e)}")
+        # One joined, column-projected SELECT; PostGIS returns the coordinates
+        query = build_items_query(db, **filters)
         
-        # Apply pagination
-        evidence_files = query.offset(offset).limit(limit).all()
+        # Totals are opt-in and computed over the same filters as the page
+        total_count = None
+        if count == "exact":
+            total_count = count_cache.count(("items", *filters.values()), query)
+        elif count == "estimate":
+            total_count = estimate_count(db, query)
         
-        # Build GeoJSON FeatureCollection
-        features = []
-        for evidence_file in evidence_files:            # Get coordinates from PostGIS geometry
-            coordinates = None
-            if evidence_file.geometry:
-                point = to_shape(evidence_file.geometry)
-                coordinates = [point.x, point.y]  # [longitude, latitude]
-            
-            feature = {
-                "type": "Feature",
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": coordinates
-                } if coordinates else None,
-                "properties": {
-                    "id": str(evidence_file.id),
-                    "object_id": str(evidence_file.object_id),
-                    "filename": evidence_file.filename,
-                    "sha256": evidence_file.sha256,
-                    "captured_at": evidence_file.captured_at.isoformat() if evidence_file.captured_at else None,
-                    "mime_type": evidence_file.mime_type,
-                    "size_bytes": evidence_file.size_bytes,
-                    "minio_object_name": evidence_file.minio_object_name,
-                    "created_at": evidence_file.evidence_object.created_at.isoformat() if evidence_file.evidence_object else None,
-                    "object_type": evidence_file.evidence_object.object_type if evidence_file.evidence_object else None
-                }
-            }
-            features.append(feature)
+        # Keyset pagination: continue strictly after the last (created_at, id) returned
+        if cursor:
+            try:
+                cursor_created_at, cursor_id = decode_cursor(cursor)
+            except InvalidCursorError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            query = query.filter(tuple_(EvidenceFile.created_at, EvidenceFile.id) < (cursor_created_at, cursor_id))
+        query = query.order_by(EvidenceFile.created_at.desc(), EvidenceFile.id.desc())
         
-        # Get total count for metadata
-        total_count = db.query(EvidenceFile).filter(EvidenceFile.geometry.isnot(None)).count()
+        # Rows come from a server-side cursor and features are encoded as they arrive,
+        # so memory stays flat whatever the limit. One extra row tells whether another
+        # page exists. Executed here so query errors still surface as a 500.
+        rows = db.execute(
+            query.offset(offset).limit(limit + 1).statement.execution_options(yield_per=STREAM_BATCH_ROWS)
+        )
         
-        return {
-            "type": "FeatureCollection",
-            "features": features,
-            "metadata": {
+        def page_metadata(last_row, has_more: bool, returned_count: int) -> Dict[str, Any]:
+            return {
                 "total_count": total_count,
-                "returned_count": len(features),
+                "total_count_type": count if total_count is not None else None,
+                "returned_count": returned_count,
                 "limit": limit,
                 "offset": offset,
-                "bbox": bbox
+                "bbox": bbox,
+                "filters": {name: value for name, value in filters.items() if value is not None},
+                "next_cursor": encode_cursor(last_row.created_at, last_row.id) if has_more and last_row else None
             }
-        }
         
+        # Build GeoJSON FeatureCollection
+        chunks = stream_feature_collection(rows, item_feature, page_metadata, limit)
+        if cacheable:
+            chunks = response_cache.tee(cache_key, version, chunks)
+        return StreamingResponse(chunks, media_type="application/geo+json", headers=headers)
+        
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve evidence items: {str(e)}")
 
@@ -150,11 +370,13 @@ class EyeWitnessMetadata(BaseModel):
     # Add other eyeWitness top-level fields if needed
 
 async def calculate_sha256(file_path: str) -> str:
-    sha256_hash = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
-            sha256_hash.update(byte_block)
-    return sha256_hash.hexdigest()
+    """Hash a file on the hashing thread pool so the event loop keeps serving requests"""
+    return await hashing_service.sha256_file(file_path)
+
+def _extract_zip_stream(stream, dest_dir: str) -> Dict[str, str]:
+    """Extract an uploaded ZIP below dest_dir. Returns {extracted path: sha256}."""
+    with zipfile.ZipFile(stream) as zip_ref:
+        return extract_members(zip_ref, dest_dir)
 
 # MinIO Configuration - Load from environment variables
 MINIO_HOST = os.getenv("MINIO_HOST", "localhost")
@@ -163,6 +385,7 @@ MINIO_ACCESS_KEY = os.getenv("MINIO_ACCESS_KEY", "minioadmin") # Default for loc
 MINIO_SECRET_KEY = os.getenv("MINIO_SECRET_KEY", "minioadmin") # Default for local dev
 MINIO_BUCKET = os.getenv("MINIO_BUCKET", "evidence")
 MINIO_USE_SSL = os.getenv("MINIO_USE_SSL", "False").lower() == "true"
+MINIO_REGION = os.getenv("MINIO_REGION", "us-east-1") # MinIO's default region
 
 print(f"Attempting to connect to MinIO at: {MINIO_HOST}:{MINIO_PORT} with Access Key: {MINIO_ACCESS_KEY} for Bucket: {MINIO_BUCKET}") # Diagnostic print
 
@@ -179,7 +402,8 @@ try:
         f"localhost:{MINIO_PORT}",
         access_key=MINIO_ACCESS_KEY,
         secret_key=MINIO_SECRET_KEY,
-        secure=MINIO_USE_SSL
+        secure=MINIO_USE_SSL,
+        region=MINIO_REGION  # Known region: presigning is pure HMAC, no bucket-location request
     )
 
     # Check if bucket exists, create if not (though init script should handle this)
@@ -204,75 +428,54 @@ async def upload_evidence(file: UploadFile = File(...)):
     Accepts a ZIP file, validates its contents against a manifest,
     or accepts other file types directly.
     P5-T1: Strict upload validation (modified for flexibility)
-    """
-
-    print("james")
-    print("after james")
 
+    ZIP members are read straight out of the uploaded archive, so nothing is
+    extracted to disk. All of them are checked against the manifest before the
+    first one is uploaded, so a rejected bundle leaves nothing in the
+    object-locked bucket.
+    """
     # Allows for multiple content types for ZIP files
     allowed_zip_types = ["application/zip", "application/x-zip-compressed", "application/x-zip"]
     is_zip_file = file.content_type in allowed_zip_types
 
-    print("before if")
     if not is_zip_file:
-        print("in non zip")
-        # Handle non-ZIP files
-        with tempfile.TemporaryDirectory() as temp_dir:
-            file_path = f"{temp_dir}/{file.filename}"
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            
-            calculated_hash = await calculate_sha256(file_path)
-            
-            return {
-                "id": str(uuid4()),
-                "message": "File uploaded successfully.",
-                "processed_files": [{"filename": file.filename, "sha256": calculated_hash, "is_standalone_file": True}],
-                "original_filename": file.filename,
-                "content_type": file.content_type
-            }
+        # Handle non-ZIP files; the upload is already spooled, so hash it in place
+        calculated_hash, _ = await hashing_service.sha256_stream(file.file)
 
-    # Proceed with ZIP file processing if it's a ZIP file
-    # The existing ZIP handling logic starts here
-    with tempfile.TemporaryDirectory() as temp_dir:
-        zip_file_path = f"{temp_dir}/{file.filename}"
-        with open(zip_file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        return {
+            "id": str(uuid4()),
+            "message": "File uploaded successfully.",
+            "processed_files": [{"filename": file.filename, "sha256": calculated_hash, "is_standalone_file": True}],
+            "original_filename": file.filename,
+            "content_type": file.content_type
+        }
 
-        extracted_files_path = f"{temp_dir}/extracted"
-        try:
-            with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-                zip_ref.extractall(extracted_files_path)
-        except zipfile.BadZipFile:
-            raise HTTPException(status_code=400, detail="Invalid ZIP file.")
+    try:
+        zip_ref = zipfile.ZipFile(file.file)
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail="Invalid ZIP file.")
+
+    with zip_ref:
+        zip_members = list_members(zip_ref)
 
-        manifest_data: Optional[Dict[str, Any]] = None
         parsed_manifest: Optional[Manifest] = None
         parsed_eyewitness_metadata: Optional[EyeWitnessMetadata] = None
         is_tella_format = False
         is_eyewitness_format = False
 
-        # Determine manifest type by checking for file existence in the ZIP root
-        # Use zipfile.Path for robust checking within the archive before extraction for this specific check
-        # However, we've already extracted, so we check the extracted_files_path
-        manifest_json_path = f"{extracted_files_path}/manifest.json"
-        metadata_yaml_path = f"{extracted_files_path}/metadata.yaml"
-
-        # Check which manifest file exists in the root of the extracted archive
-        if os.path.exists(manifest_json_path):
+        # Determine manifest type by checking for the file in the ZIP root
+        if "manifest.json" in zip_members:
             try:
-                with open(manifest_json_path, 'r') as f:
-                    manifest_content = json.load(f)
+                manifest_content = json.loads(zip_ref.read(zip_members["manifest.json"]))
                 parsed_manifest = Manifest(**manifest_content)
                 is_tella_format = True
             except json.JSONDecodeError:
                 raise HTTPException(status_code=400, detail="Invalid manifest.json: Not valid JSON.")
             except Exception as e: # Covers Pydantic validation errors
                 raise HTTPException(status_code=400, detail=f"Invalid manifest.json: {e}")
-        elif os.path.exists(metadata_yaml_path):
+        elif "metadata.yaml" in zip_members:
             try:
-                with open(metadata_yaml_path, 'r') as f:
-                    metadata_content = yaml.safe_load(f)
+                metadata_content = yaml.safe_load(zip_ref.read(zip_members["metadata.yaml"]))
                 # Basic check, eyeWitness structure can vary.
                 if not metadata_content or "files" not in metadata_content:
                      raise HTTPException(status_code=400, detail="Invalid metadata.yaml: Missing 'files' list or empty.")
@@ -282,58 +485,57 @@ async def upload_evidence(file: UploadFile = File(...)):
                 is_eyewitness_format = True
             except yaml.YAMLError:
                 raise HTTPException(status_code=400, detail="Invalid metadata.yaml: Not valid YAML.")
+            except HTTPException:
+                raise
             except Exception as e: # Covers Pydantic validation errors
                 raise HTTPException(status_code=400, detail=f"Invalid metadata.yaml: {e}")
         else:
             raise HTTPException(status_code=400, detail="Missing manifest.json (Tella) or metadata.yaml (eyeWitness) in ZIP root.")
 
-        validation_errors = []
-        processed_files_metadata = []
-        files_in_zip_to_check = []
-
-        # List files in the extracted directory, excluding the manifest/metadata itself
-        for root, _, files_in_current_dir in os.walk(extracted_files_path):
-            for name in files_in_current_dir:
-                full_path = os.path.join(root, name)
-                relative_path = os.path.relpath(full_path, extracted_files_path)
-                # Normalize path separators for consistency
-                normalized_relative_path = relative_path.replace('\\', '/')
-
-                if is_tella_format and normalized_relative_path == "manifest.json":
-                    continue
-                if is_eyewitness_format and normalized_relative_path == "metadata.yaml":
-                    continue
-                files_in_zip_to_check.append(normalized_relative_path)
-        
+        # Files in the archive, excluding the manifest/metadata itself
+        files_in_zip_to_check = [
+            name for name in zip_members
+            if not (is_tella_format and name == "manifest.json")
+            and not (is_eyewitness_format and name == "metadata.yaml")
+        ]
+
         manifest_file_entries = {}
         if is_tella_format and parsed_manifest:
-            manifest_file_entries = {mf.filename: mf.sha256 for mf in parsed_manifest.files}
+            manifest_file_entries = {mf.filename.replace('\\', '/'): mf.sha256 for mf in parsed_manifest.files}
         elif is_eyewitness_format and parsed_eyewitness_metadata:
-            manifest_file_entries = {mf.file_name: mf.sha256 for mf in parsed_eyewitness_metadata.files}
+            manifest_file_entries = {mf.file_name.replace('\\', '/'): mf.sha256 for mf in parsed_eyewitness_metadata.files}
 
-        # Validate files listed in the manifest against those in the ZIP
-        for manifest_filename, manifest_sha256 in manifest_file_entries.items():
-            normalized_manifest_filename = manifest_filename.replace('\\', '/')
-            if normalized_manifest_filename not in files_in_zip_to_check:
-                validation_errors.append(f"File '{normalized_manifest_filename}' listed in manifest but not found in ZIP.")
+        # Structural validation comes from the central directory, before any bytes are read
+        validation_errors = []
+        for manifest_filename in manifest_file_entries:
+            # Names become object keys, so they get the same check as extracted members
+            try:
+                check_member_name(manifest_filename)
+            except ValueError as e:
+                validation_errors.append(f"File '{manifest_filename}' listed in manifest: {e}")
                 continue
-            
-            file_to_check_full_path = os.path.join(extracted_files_path, normalized_manifest_filename)
-            calculated_hash = await calculate_sha256(file_to_check_full_path)
+            if manifest_filename not in zip_members:
+                validation_errors.append(f"File '{manifest_filename}' listed in manifest but not found in ZIP.")
+        for zip_filepath_str in files_in_zip_to_check:
+            if zip_filepath_str not in manifest_file_entries:
+                validation_errors.append(f"File '{zip_filepath_str}' found in ZIP but not listed in manifest.")
+
+        if validation_errors:
+            return JSONResponse(
+                status_code=400,
+                content={"detail": "Upload rejected due to validation errors.", "errors": validation_errors}
+            )
 
-            if calculated_hash.lower() != manifest_sha256.lower():
+        # The bucket is object-locked, so a rejected upload must not leave objects behind:
+        # every member is checked against its manifest digest before anything is stored.
+        calculated_hashes = await run_in_threadpool(
+            lambda: {name: hash_member(zip_ref, zip_members[name]) for name in manifest_file_entries}
+        )
+        for manifest_filename, manifest_sha256 in manifest_file_entries.items():
+            if calculated_hashes[manifest_filename] != manifest_sha256.lower():
                 validation_errors.append(
-                    f"SHA-256 mismatch for '{normalized_manifest_filename}': "
-                    f"Expected {manifest_sha256}, Got {calculated_hash}"
+                    str(DigestMismatchError(manifest_filename, manifest_sha256, calculated_hashes[manifest_filename]))
                 )
-            else:
-                processed_files_metadata.append({"filename": normalized_manifest_filename, "sha256": calculated_hash})
-
-        # Check for files in ZIP that are not listed in the manifest
-        for zip_filepath_str in files_in_zip_to_check:
-            normalized_zip_filepath = zip_filepath_str.replace('\\', '/')
-            if normalized_zip_filepath not in manifest_file_entries:
-                validation_errors.append(f"File '{normalized_zip_filepath}' found in ZIP but not listed in manifest.")
 
         if validation_errors:
             return JSONResponse(
@@ -341,134 +543,77 @@ async def upload_evidence(file: UploadFile = File(...)):
                 content={"detail": "Upload rejected due to validation errors.", "errors": validation_errors}
             )
 
-    # If validation passes, proceed with next steps (P6, P7, P8)
-    # P6-T2: Upload to MinIO with retention
-    uploaded_minio_objects = []
-    if not minio_client:
-        raise HTTPException(status_code=500, detail="MinIO client not initialized. Check server logs.")
+        # P6-T2: Upload to MinIO with retention (bucket default retention applies).
+        # Members are hashed again while they stream, so bytes that changed since the
+        # check abort their put before the object is completed.
+        if not minio_client:
+            raise HTTPException(status_code=500, detail="MinIO client not initialized. Check server logs.")
 
-    # Determine the files to upload to MinIO
-    # For ZIPs, it's the validated files. For standalone, it's the single uploaded file.
-    files_to_upload_to_minio = []
-    if is_zip_file: # This variable needs to be available from the earlier part of the function
-        for pf_meta in processed_files_metadata:
-            # We need the full path to the file in the temp directory
-            # Assuming processed_files_metadata stores relative paths from extracted_files_path
-            file_full_path = os.path.join(extracted_files_path, pf_meta["filename"])
-            files_to_upload_to_minio.append({"path": file_full_path, "name": pf_meta["filename"]})
-    else:
-        # For non-ZIP files, the file_path was defined in the non-ZIP handling block
-        # We need to ensure file_path and original filename are available here
-        # This requires refactoring how file_path is handled for non-ZIPs or passing it through
-        # For now, let's assume we re-construct or pass necessary info.
-        # This part needs careful review of variable scope from the non-ZIP path.
-        # A simple way: if not is_zip_file, the temp_dir and file.filename are from that block.
-        # However, the temp_dir for non-ZIPs is different. This needs a cleaner pass.
-
-        # Let's assume for now that if it's not a zip, the `file` object is the one to upload directly
-        # And we need to save it to a temporary location again to get its size and stream for MinIO
-        # This is inefficient; ideally, we'd use the already saved temp file.
-        # Re-evaluating the non-ZIP path for MinIO upload:
-        # The non-ZIP path currently returns early. We need to integrate MinIO upload there or restructure.
-
-        # For now, let's focus on the ZIP path for MinIO integration as per P6-T2
-        # and adjust the non-ZIP path later if direct MinIO upload is needed for them too.
-        pass # Placeholder for non-ZIP MinIO upload logic
-
-    # This loop is primarily for validated files from a ZIP
-    if is_zip_file:
-        for item in files_to_upload_to_minio:
-            object_name_in_minio = f"uploads/{uuid4()}/{item['name']}" # Unique path in MinIO
-            file_path_to_upload = item['path']
+        uploads = upload_scheduler.batch()
+
+        async def store_member(manifest_filename: str, manifest_sha256: str):
+            object_name_in_minio = f"uploads/{uuid4()}/{manifest_filename}" # Unique path in MinIO
             try:
-                with open(file_path_to_upload, 'rb') as file_data:
-                    file_stat = os.stat(file_path_to_upload)
-                    # Calculate retention date: +7 years from now
-                    # MinIO SDK expects retain_until_date in ISO 8601 format, e.g., "YYYY-MM-DDTHH:MM:SSZ"
-                    # The mc command uses relative time like +7y, but SDK needs absolute.
-                    # However, for put_object with bucket default retention, we might not need to set it per object
-                    # if the bucket's default retention is correctly set to COMPLIANCE and the desired duration.
-                    # Let's assume the bucket default is sufficient as per P6-T1.
-                    # If explicit per-object retention is needed: 
-                    # retain_until_date = datetime.utcnow() + timedelta(days=2555) # Approx 7 years
-                    # headers = {
-                    #     "x-amz-object-lock-mode": "COMPLIANCE",
-                    #     "x-amz-object-lock-retain-until-date": retain_until_date.isoformat() + "Z"
-                    # }
-                    # For now, relying on bucket default, so no specific headers here for lock/retention.
-
-                    result = minio_client.put_object(
-                        MINIO_BUCKET,
-                        object_name_in_minio,
-                        file_data,
-                        length=file_stat.st_size,
-                        # headers=headers # Uncomment if explicit per-object retention needed
-                        # content_type will be auto-detected by MinIO or can be set explicitly
-                    )
-                uploaded_minio_objects.append({
+                result, calculated_hash = await uploads.run(
+                    put_member,
+                    minio_client,
+                    MINIO_BUCKET,
+                    object_name_in_minio,
+                    zip_ref,
+                    zip_members[manifest_filename],
+                    expected_sha256=manifest_sha256,
+                    content_type=mimetypes.guess_type(manifest_filename)[0] or "application/octet-stream",
+                    **upload_scheduler.put_options,
+                )
+            except DigestMismatchError as e:
+                return str(e)
+            except S3Error as exc:
+                print(f"Error uploading {manifest_filename} to MinIO: {exc}")
+                raise HTTPException(status_code=500, detail=f"Failed to upload {manifest_filename} to MinIO: {exc}")
+
+            return (
+                {"filename": manifest_filename, "sha256": calculated_hash},
+                {
                     "minio_object_name": object_name_in_minio,
-                    "original_filename": item['name'],
+                    "original_filename": manifest_filename,
                     "version_id": result.version_id,
                     "etag": result.etag
-                })
-                # TODO: P6-T2 Store returned version_id in DB (requires DB schema and connection)
-            except S3Error as exc:
-                print(f"Error uploading {item['name']} to MinIO: {exc}")
-                # Decide on error handling: raise HTTPException or collect errors
-                raise HTTPException(status_code=500, detail=f"Failed to upload {item['name']} to MinIO: {exc}")
-            except FileNotFoundError:
-                raise HTTPException(status_code=500, detail=f"Temporary file {item['name']} not found for MinIO upload.")
+                }
+            )
 
-    # Adjusting the return for non-ZIP files if they were handled by the early return
-    if not is_zip_file:
-        # The original non-ZIP logic already returned. If we want it to go through MinIO,
-        # that logic needs to be integrated here. For now, this part of P6-T2 applies to ZIPs.
-        # If a non-ZIP file was uploaded, the `processed_files_metadata` would be from that path.
-        # Let's assume the `upload_evidence` function is refactored so that `is_zip_file` correctly gates
-        # the MinIO upload logic for ZIP contents, and a separate path handles non-ZIPs to MinIO if desired.
-
-        # For a single non-ZIP file, the MinIO upload logic would be similar but simpler:
-        # This is a conceptual placement; the actual temp file path needs to be passed correctly.
-        # Example for a single non-ZIP file (if it didn't return early):
-        # with tempfile.NamedTemporaryFile(delete=False) as tmp_upload_file:
-        #     shutil.copyfileobj(file.file, tmp_upload_file)
-        #     tmp_upload_file_path = tmp_upload_file.name
-        # file.file.seek(0) # Reset stream if needed elsewhere
-        # object_name_in_minio = f"uploads/{uuid4()}/{file.filename}"
-        # try:
-        #     with open(tmp_upload_file_path, 'rb') as file_data:
-        #         file_stat = os.stat(tmp_upload_file_path)
-        #         result = minio_client.put_object(MINIO_BUCKET, object_name_in_minio, file_data, length=file_stat.st_size)
-        #     uploaded_minio_objects.append({
-        #         "minio_object_name": object_name_in_minio,
-        #         "original_filename": file.filename,
-        #         "version_id": result.version_id,
-        #         "etag": result.etag
-        #     })
-        # finally:
-        #     os.unlink(tmp_upload_file_path)
-        # This is now part of the main non-ZIP path:
-        pass
-
-    # Modify the successful response to include MinIO upload details
-    response_payload = {
-        "id": str(uuid4()), 
+        # ZipFile serialises reads of the shared archive handle, so members can stream concurrently
+        member_results = await asyncio.gather(
+            *(store_member(name, sha256) for name, sha256 in manifest_file_entries.items())
+        )
+
+    processed_files_metadata = []
+    uploaded_minio_objects = []
+    for member_result in member_results:
+        if isinstance(member_result, str):
+            validation_errors.append(member_result)
+            continue
+        processed_files_metadata.append(member_result[0])
+        uploaded_minio_objects.append(member_result[1])
+
+    if validation_errors:
+        # Only reachable if the archive changed between the check and the upload; members
+        # stored by then are reported alongside the errors so nothing is left unaccounted for.
+        return JSONResponse(
+            status_code=400,
+            content={
+                "detail": "Upload rejected due to validation errors.",
+                "errors": validation_errors,
+                "minio_uploads": uploaded_minio_objects
+            }
+        )
+
+    return {
+        "id": str(uuid4()),
         "message": "File(s) processed and uploaded to MinIO successfully." if uploaded_minio_objects else "ZIP validated successfully. No files for MinIO or MinIO upload skipped.",
         "processed_files_metadata": processed_files_metadata, # From manifest validation
         "minio_uploads": uploaded_minio_objects, # Details of files uploaded to MinIO
         "original_filename": file.filename
     }
-    if not is_zip_file and not uploaded_minio_objects:
-        # This case means it was a non-zip file, and it returned early before minio logic
-        # The original return for non-zip files needs to be adjusted if they are to be included here.
-        # For now, if it's a non-zip, the early return in the beginning of the function handles it.
-        # This part of the code will primarily be hit by ZIP file processing.
-        # To make it cleaner, the non-ZIP path should also prepare `uploaded_minio_objects`
-        # if it uploads to MinIO.
-        # Let's refine the non-ZIP path to include MinIO upload:
-        pass # Covered by the refactor below
-
-    return response
 
 @app.get("/api/v1/audit/status")
 async def audit_status(db: Session = Depends(get_db)):
@@ -483,9 +628,10 @@ async def audit_status(db: Session = Depends(get_db)):
         
         # Get immudb connection status
         immudb_status = "connected"
+        ledger_state = None
         try:
             # Test immudb connection
-            await immudb_service.health_check()
+            ledger_state = await immudb_service.health_check()
         except Exception as e:
             immudb_status = f"error: {str(e)}"
         
@@ -496,7 +642,16 @@ async def audit_status(db: Session = Depends(get_db)):
             "status": "ok",
             "database": db_status,
             "immudb": immudb_status,
+            "ledger_state": ledger_state,
             "evidence_count": evidence_count,
+            "signature_cache": verification_cache.stats(),
+            "tile_cache": tile_service.cache.stats(),
+            "cluster_cache": cluster_cache.stats(),
+            "response_cache": response_cache.stats(),
+            "presign_cache": presign_cache.stats(),
+            "access_log": access_log.stats(),
+            "ledger": immudb_service.ledger.stats(),
+            "dataset_version": dataset_version.current(),
             "timestamp": datetime.utcnow().isoformat()
         }
         
@@ -507,6 +662,32 @@ async def audit_status(db: Session = Depends(get_db)):
         }
 
 
+class PresignRequest(BaseModel):
+    object_names: List[str]
+
+@app.post("/api/v1/files/presign")
+async def presign_files(request: PresignRequest):
+    """
+    Presigned GET links (15 min) for many MinIO objects in one round trip, e.g.
+    the minio_object_name of every feature on screen. Unexpired links are reused.
+    """
+    if not minio_client_external:
+        raise HTTPException(status_code=500, detail="MinIO client not initialized. Check server logs.")
+    if not request.object_names:
+        raise HTTPException(status_code=400, detail="object_names must not be empty.")
+    if len(request.object_names) > PRESIGN_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {PRESIGN_BATCH_MAX} object names per request.")
+    try:
+        signed = presign_cache.get_many(minio_client_external, MINIO_BUCKET, request.object_names)
+    except S3Error as exc:
+        raise HTTPException(status_code=500, detail=f"Could not generate presigned URLs: {exc}")
+    return {
+        "urls": {
+            object_name: {"presigned_url": url.url, "expires_at": url.expires_at.isoformat()}
+            for object_name, url in signed.items()
+        }
+    }
+
 @app.get("/api/v1/files/{object_name:path}") # Use path converter for object_name
 async def get_file_presigned_url(object_name: str):
     """P6-T3: Implement GET /api/v1/files/{object_name} returning presigned GET link valid 15 min."""
@@ -514,13 +695,10 @@ async def get_file_presigned_url(object_name: str):
         raise HTTPException(status_code=500, detail="MinIO client not initialized. Check server logs.")
 
     try:
-        # Generate a presigned URL for GET request, valid for 15 minutes (900 seconds)
-        presigned_url = minio_client_external.presigned_get_object(
-            MINIO_BUCKET,
-            object_name, # This should be the full MinIO object name, e.g., uploads/uuid/filename.jpg
-            expires=timedelta(minutes=15)
-        )
-        return {"object_name": object_name, "presigned_url": presigned_url}
+        # Presigned GET URL valid for 15 minutes, reused from the cache until close to expiry.
+        # object_name is the full MinIO object name, e.g., uploads/uuid/filename.jpg
+        signed = presign_cache.get(minio_client_external, MINIO_BUCKET, object_name)
+        return {"object_name": object_name, "presigned_url": signed.url, "expires_at": signed.expires_at.isoformat()}
     except S3Error as exc:
         print(f"Error generating presigned URL for {object_name}: {exc}")
         # Check if the error is due to the object not being found
@@ -529,23 +707,265 @@ async def get_file_presigned_url(object_name: str):
         raise HTTPException(status_code=500, detail=f"Could not generate presigned URL for {object_name}: {exc}")
 
 
-# Refactoring the upload_evidence for cleaner MinIO integration for both ZIP and non-ZIP
-@app.post("/api/v1/upload_refined") # Keeping old one for now, will replace
-async def upload_evidence_refined(file: UploadFile = File(...), db: Session = Depends(get_db)):
+def download_url(object_name: str) -> str:
+    """Path of the download proxy for an object; relative, so it works behind any hostname"""
+    return f"/api/v1/download/{quote(object_name)}"
+
+@app.api_route("/api/v1/download/{object_name:path}", methods=["GET", "HEAD"])
+async def download_object(
+    object_name: str,
+    request: Request,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None, alias="If-Range")
+):
+    """
+    Stream a stored object through the API, with single-range support (206) so
+    players can seek in large videos. Every GET is recorded in evidence_access_log.
+    """
     if not minio_client:
         raise HTTPException(status_code=500, detail="MinIO client not initialized. Check server logs.")
+    requested_at = datetime.utcnow()
+    try:
+        stat = await run_in_threadpool(minio_client.stat_object, MINIO_BUCKET, object_name)
+    except S3Error as exc:
+        if exc.code in ("NoSuchKey", "NoSuchObject"):
+            raise HTTPException(status_code=404, detail=f"File '{object_name}' not found in MinIO bucket '{MINIO_BUCKET}'.")
+        raise HTTPException(status_code=500, detail=f"Could not read {object_name}: {exc}")
+    
+    etag = f'"{stat.etag}"'
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Content-Disposition": f"inline; filename*=UTF-8''{quote(os.path.basename(object_name))}",
+        "Cache-Control": "private, no-store"
+    }
+    client_ip = request.client.host if request.client else None
+    user_agent = request.headers.get("user-agent")
+    
+    # If-Range: resume only if the object is unchanged, otherwise send it whole
+    byte_range = None
+    if range_header and (not if_range or if_range == etag):
+        try:
+            byte_range = parse_range(range_header, stat.size)
+        except RangeNotSatisfiable:
+            if request.method == "GET":
+                access_log.record(**access_record(
+                    object_name, stat, None, 416, client_ip, user_agent, requested_at, completed=True
+                ))
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{stat.size}"})
+    
+    start, end = byte_range or (0, stat.size - 1)
+    status_code = 206 if byte_range else 200
+    headers["Content-Length"] = str(end - start + 1)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{stat.size}"
+    if request.method == "HEAD":
+        return Response(status_code=status_code, headers=headers, media_type=stat.content_type)
+    
+    try:
+        # Ranged GET against MinIO: only the requested bytes leave the object store
+        response = await run_in_threadpool(
+            minio_client.get_object, MINIO_BUCKET, object_name, offset=start, length=end - start + 1
+        ) if stat.size else None
+    except S3Error as exc:
+        raise HTTPException(status_code=500, detail=f"Could not read {object_name}: {exc}")
+    
+    def log_access(bytes_sent: int, completed: bool):
+        access_log.record(**access_record(
+            object_name, stat, byte_range, status_code, client_ip, user_agent, requested_at, bytes_sent, completed
+        ))
+    
+    return StreamingResponse(
+        stream_object(response, log_access),
+        status_code=status_code,
+        headers=headers,
+        media_type=stat.content_type or "application/octet-stream"
+    )
 
-    upload_id = str(uuid4())
-    processed_files_metadata_list = [] # For files validated against manifest (ZIPs) or basic info (non-ZIPs)
-    minio_upload_results = []
+@app.get("/api/v1/items/clusters")
+async def get_evidence_clusters(
+    zoom: int,
+    bbox: Optional[str] = None,
+    captured_from: Optional[datetime] = None,
+    captured_to: Optional[datetime] = None,
+    object_type: Optional[str] = None,
+    mime_type: Optional[str] = None,
+    object_id: Optional[uuid.UUID] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Evidence items aggregated into grid clusters, for low zoom levels.
+    
+    Parameters:
+    - zoom: Map zoom level; cells are a quarter of a tile wide at this zoom
+    - bbox: Bounding box filter as "min_lon,min_lat,max_lon,max_lat"
+    - captured_from, captured_to, object_type, mime_type, object_id: as for /api/v1/items
+    
+    Returns a GeoJSON FeatureCollection with one Point per non-empty cell (at the
+    centroid of its items) carrying count and bbox. The grid is coarsened so the
+    area never holds more than CLUSTER_MAX_CELLS cells.
+    """
+    if not 0 <= zoom <= CLUSTER_MAX_ZOOM:
+        raise HTTPException(status_code=400, detail=f"zoom must be between 0 and {CLUSTER_MAX_ZOOM}")
+    filters = {
+        "bbox": bbox,
+        "captured_from": captured_from,
+        "captured_to": captured_to,
+        "object_type": object_type,
+        "mime_type": mime_type,
+        "object_id": object_id,
+    }
+    key = ("clusters", zoom, *filters.values())
+    body = cluster_cache.get(key)
+    if body is None:
+        try:
+            query = build_items_query(db, **filters)
+            cell_size = grid_size(zoom, [float(x) for x in bbox.split(',')] if bbox else None)
+            clusters = [cluster_feature(row) for row in cluster_query(query, cell_size)]
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to cluster evidence items: {str(e)}")
+        body = dumps({
+            "type": "FeatureCollection",
+            "features": clusters,
+            "metadata": {
+                "zoom": zoom,
+                "bbox": bbox,
+                "filters": {name: value for name, value in filters.items() if value is not None},
+                "cell_size_m": cell_size,
+                "cluster_count": len(clusters),
+                "item_count": sum(c["properties"]["count"] for c in clusters)
+            }
+        })
+        cluster_cache.put(key, body)
+    return Response(content=body, media_type="application/geo+json")
+
+@app.get("/api/v1/tiles/{z}/{x}/{y}.mvt")
+async def get_evidence_tile(
+    z: int,
+    x: int,
+    y: int,
+    object_type: Optional[str] = None,
+    captured_from: Optional[datetime] = None,
+    captured_to: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Evidence points of one XYZ tile as a Mapbox Vector Tile (layer "evidence").
+    
+    Parameters:
+    - object_type: Only files of evidence objects of this type
+    - captured_from / captured_to: captured_at range, from inclusive, to exclusive
+    
+    Features carry id, object_id, object_type, mime_type and captured_at (epoch seconds).
+    Empty tiles return 204.
+    """
+    if not tile_in_range(z, x, y):
+        raise HTTPException(status_code=400, detail=f"Tile {z}/{x}/{y} does not exist.")
+    try:
+        tile = tile_service.tile(db, z, x, y, tile_filters(object_type, captured_from, captured_to))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to render tile {z}/{x}/{y}: {str(e)}")
+    headers = {"Cache-Control": f"public, max-age={int(TILE_CACHE_TTL)}"}
+    if not tile:
+        return Response(status_code=204, headers=headers)
+    return Response(content=tile, media_type=MVT_MEDIA_TYPE, headers=headers)
+
+@app.get("/api/v1/evidence/files/{file_id}/derivative")
+async def get_evidence_file_derivative(
+    file_id: uuid.UUID,
+    width: int = 512,
+    format: Optional[str] = "webp",
+    db: Session = Depends(get_db)
+):
+    """
+    Presigned link to the smallest stored rendition of an evidence file at least
+    `width` px wide, preferring `format`. Images without derivatives (uploads from
+    before the pyramid existed) fall back to the original object; anything else
+    without a rendition (e.g. a video whose poster could not be extracted) is a 404,
+    so a preview never pulls a full video.
+    """
+    if not minio_client_external:
+        raise HTTPException(status_code=500, detail="MinIO client not initialized. Check server logs.")
+    if width <= 0:
+        raise HTTPException(status_code=400, detail="width must be positive.")
+    
+    evidence_file = db.query(EvidenceFile).filter(EvidenceFile.id == file_id).one_or_none()
+    if evidence_file is None:
+        raise HTTPException(status_code=404, detail=f"Evidence file {file_id} not found.")
+    
+    derivative = derivative_service.closest(evidence_file.derivatives, width, format)
+    if derivative is not None:
+        rendition = {
+            "object_name": derivative.object_name,
+            "width": derivative.width,
+            "height": derivative.height,
+            "format": derivative.format,
+            "content_type": derivative.content_type,
+            "size_bytes": derivative.size_bytes,
+            "original": False
+        }
+    elif evidence_file.minio_object_name and (evidence_file.mime_type or "").startswith("image/"):
+        rendition = {
+            "object_name": evidence_file.minio_object_name,
+            "content_type": evidence_file.mime_type,
+            "size_bytes": evidence_file.size_bytes,
+            "original": True
+        }
+    else:
+        raise HTTPException(status_code=404, detail=f"Evidence file {file_id} has no preview rendition.")
+    
+    try:
+        signed = presign_cache.get(minio_client_external, MINIO_BUCKET, rendition["object_name"])
+    except S3Error as exc:
+        raise HTTPException(status_code=500, detail=f"Could not generate presigned URL for {rendition['object_name']}: {exc}")
+    return {
+        "evidence_file_id": str(file_id),
+        **rendition,
+        "presigned_url": signed.url,
+        "expires_at": signed.expires_at.isoformat()
+    }
 
-    # Calculate retain_until_date for MinIO object lock (7 years from now)
-    current_utc = datetime.utcnow().replace(tzinfo=timezone.utc) # Make it timezone-aware
-    retain_until_date_dt = current_utc.replace(year=current_utc.year + 7)
-    retain_until_date_iso = retain_until_date_dt.strftime('%Y-%m-%dT%H:%M:%SZ')
 
-    allowed_zip_types = ["application/zip", "application/x-zip-compressed", "application/x-zip"]
-    is_zip_file = file.content_type in allowed_zip_types
+@app.get("/api/v1/evidence/{evidence_id}/proof")
+async def get_evidence_proof(evidence_id: uuid.UUID, db: Session = Depends(get_db)):
+    """
+    Ledger entry of an evidence object with its immudb inclusion proof, verified
+    against the server's trusted ledger state, and whether it still matches the database.
+    """
+    evidence_obj = db.query(EvidenceObject).filter(EvidenceObject.id == evidence_id).one_or_none()
+    if evidence_obj is None:
+        raise HTTPException(status_code=404, detail=f"Evidence {evidence_id} not found.")
+    try:
+        proof = await immudb_service.evidence_proof(evidence_id)
+    except ErrCorruptedData:
+        raise HTTPException(status_code=500, detail=f"Ledger proof for evidence {evidence_id} failed verification.")
+    except Exception as e:
+        logger.error(f"Could not fetch ledger proof for {evidence_id}: {e}")
+        raise HTTPException(status_code=503, detail="Ledger unavailable.")
+    if proof is None:
+        raise HTTPException(status_code=404, detail=f"Evidence {evidence_id} has no ledger entry.")
+    
+    entry = json.loads(proof.pop("value"))
+    return {
+        "evidence_id": str(evidence_id),
+        "entry": entry,
+        **proof,
+        "matches_database": entry.get("sha256") == evidence_obj.sha256,
+        "recorded_tx_id": evidence_obj.immudb_tx_id
+    }
+
+
+# Refactoring the upload_evidence for cleaner MinIO integration for both ZIP and non-ZIP
+@app.post("/api/v1/upload_refined") # Keeping old one for now, will replace
+async def upload_evidence_refined(file: UploadFile = File(...), background: bool = False, db: Session = Depends(get_db)):
+    if not minio_client:
+        raise HTTPException(status_code=500, detail="MinIO client not initialized. Check server logs.")
+
+    if background:
+        # Spool and queue; poll GET /api/v1/jobs/{job_id} for the result
+        return await enqueue_ingestion("general", file, db)
 
     with tempfile.TemporaryDirectory() as temp_dir_root:
         # TODO: For now this is not functioning 
@@ -684,107 +1104,138 @@ async def upload_evidence_refined(file: UploadFile = File(...), db: Session = De
             shutil.copyfileobj(file.file, buffer)
         file.file.seek(0)
 
-        calculated_hash = await calculate_sha256(temp_file_path)
-        processed_files_metadata_list.append({
-            "filename": file.filename, 
-            "sha256": calculated_hash, 
-            "is_standalone_file": True,
-            "content_type": file.content_type
+        return await process_general_upload(temp_file_path, file.filename, file.content_type, db)
+
+async def process_general_upload(
+    file_path: str,
+    filename: str,
+    content_type: Optional[str],
+    db: Session,
+    calculated_hash: Optional[str] = None,
+    progress: Optional[ProgressCallback] = None
+) -> Dict[str, Any]:
+    """
+    Store a single general upload already on local disk: MinIO, Postgres, immudb.
+    Shared by the multipart endpoint, resumable-upload finalize and the ingestion
+    queue; pass calculated_hash when the digest is already known to skip re-hashing.
+    """
+    report = progress or (lambda stage, percent: None)
+    upload_id = str(uuid4())
+    processed_files_metadata_list = [] # For files validated against manifest (ZIPs) or basic info (non-ZIPs)
+    minio_upload_results = []
+
+    # Calculate retain_until_date for MinIO object lock (7 years from now)
+    current_utc = datetime.utcnow().replace(tzinfo=timezone.utc) # Make it timezone-aware
+    retain_until_date_dt = current_utc.replace(year=current_utc.year + 7)
+    retain_until_date_iso = retain_until_date_dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    allowed_zip_types = ["application/zip", "application/x-zip-compressed", "application/x-zip"]
+    is_zip_file = content_type in allowed_zip_types
+
+    report("hashing", 10)
+    calculated_hash = calculated_hash or await calculate_sha256(file_path)
+    processed_files_metadata_list.append({
+        "filename": filename, 
+        "sha256": calculated_hash, 
+        "is_standalone_file": True,
+        "content_type": content_type
+    })
+    
+    minio_object_name = f"uploads/{upload_id}/{filename}"
+    report("storing", 30)
+    try:
+        file_size = os.path.getsize(file_path)
+        result = await upload_scheduler.batch().put_file(
+            minio_client,
+            MINIO_BUCKET,
+            minio_object_name,
+            file_path,
+            content_type=content_type or 'application/octet-stream',
+            metadata={
+                "retention-mode": "COMPLIANCE",
+                "retention-until": retain_until_date_iso,
+                "upload-id": upload_id,
+                "original-filename": filename
+            }
+        )
+        minio_upload_results.append({
+            "minio_object_name": minio_object_name,
+            "original_filename": filename,
+            "version_id": result.version_id, "etag": result.etag,
+            "content_type": content_type
         })
-        
-        minio_object_name = f"uploads/{upload_id}/{file.filename}"
+    
+        # P8-T1: Store to database and write to immudb ledger
+        report("indexing", 70)
         try:
-            with open(temp_file_path, 'rb') as file_data_stream:
-                file_size = os.path.getsize(temp_file_path)
-                result = minio_client.put_object(
-                    MINIO_BUCKET,
-                    minio_object_name,
-                    file_data_stream,
-                    length=file_size,
-                    content_type=file.content_type or 'application/octet-stream',
-                    metadata={
-                        "retention-mode": "COMPLIANCE",
-                        "retention-until": retain_until_date_iso,
-                        "upload-id": upload_id,
-                        "original-filename": file.filename
-                    }
-                )            
-                minio_upload_results.append({
-                "minio_object_name": minio_object_name,
-                "original_filename": file.filename,
-                "version_id": result.version_id, "etag": result.etag,
-                "content_type": file.content_type
-            })
-            
-            # P8-T1: Store to database and write to immudb ledger
+            # Create evidence object record
+            evidence_obj = EvidenceObject(
+                id=upload_id,
+                object_name=minio_object_name,
+                sha256=calculated_hash,
+                minio_version_id=result.version_id,
+                object_type="general_upload",
+                extra_metadata={
+                    "original_filename": filename,
+                    "content_type": content_type,
+                    "file_size": file_size
+                }
+            )
+            db.add(evidence_obj)
+    
+            # Create evidence file record
+            evidence_file = EvidenceFile(
+                object_id=upload_id,
+                filename=filename,
+                sha256=calculated_hash,
+                mime_type=content_type,
+                size_bytes=file_size,
+                minio_object_name=minio_object_name,
+                minio_version_id=result.version_id
+            )
+            db.add(evidence_file)
+    
+            # Commit database changes
+            db.commit()
+    
+            # Write transaction to immudb
+            report("ledger", 90)
             try:
-                # Create evidence object record
-                evidence_obj = EvidenceObject(
-                    id=upload_id,
-                    object_name=minio_object_name,
-                    sha256=calculated_hash,
-                    minio_version_id=result.version_id,
-                    object_type="general_upload",
-                    extra_metadata={
-                        "original_filename": file.filename,
-                        "content_type": file.content_type,
+                immudb_tx_id = await immudb_service.write_evidence_transaction(
+                    object_id=evidence_obj.id,
+                    sha256=evidence_obj.sha256,
+                    minio_version_id=evidence_obj.minio_version_id or "",
+                    timestamp=evidence_obj.created_at,
+                    additional_data={
+                        "upload_type": "general",
+                        "filename": filename,
+                        "content_type": content_type,
                         "file_size": file_size
                     }
                 )
-                db.add(evidence_obj)
-                
-                # Create evidence file record
-                evidence_file = EvidenceFile(
-                    object_id=upload_id,
-                    filename=file.filename,
-                    sha256=calculated_hash,
-                    mime_type=file.content_type,
-                    size_bytes=file_size,
-                    minio_object_name=minio_object_name,
-                    minio_version_id=result.version_id
-                )
-                db.add(evidence_file)
-                
-                # Commit database changes
+    
+                # Update database with immudb transaction ID
+                evidence_obj.immudb_tx_id = immudb_tx_id
                 db.commit()
-                
-                # Write transaction to immudb
-                try:
-                    immudb_tx_id = await immudb_service.write_evidence_transaction(
-                        object_id=evidence_obj.id,
-                        sha256=evidence_obj.sha256,
-                        minio_version_id=evidence_obj.minio_version_id or "",
-                        timestamp=evidence_obj.created_at,
-                        additional_data={
-                            "upload_type": "general",
-                            "filename": file.filename,
-                            "content_type": file.content_type,
-                            "file_size": file_size
-                        }
-                    )
-                    
-                    # Update database with immudb transaction ID
-                    evidence_obj.immudb_tx_id = immudb_tx_id
-                    db.commit()
-                    
-                    logger.info(f"General upload completed with immudb tx: {immudb_tx_id}")
-                    
-                except Exception as e:
-                    logger.error(f"Failed to write to immudb: {e}")
-                    # Don't fail the upload, just log the error
-                    
+    
+                logger.info(f"General upload completed with immudb tx: {immudb_tx_id}")
+    
             except Exception as e:
-                db.rollback()
-                logger.error(f"Database insertion failed: {str(e)}")
-                # Continue with upload response even if DB fails
-                
-        except S3Error as e_s3:
-            raise HTTPException(status_code=500, detail=f"MinIO upload failed for {file.filename}: {e_s3}")
+                logger.error(f"Failed to write to immudb: {e}")
+                # Don't fail the upload, just log the error
+    
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Database insertion failed: {str(e)}")
+            # Continue with upload response even if DB fails
+    
+    except S3Error as e_s3:
+        raise HTTPException(status_code=500, detail=f"MinIO upload failed for {filename}: {e_s3}")
 
     return {
         "id": upload_id,
         "message": "Upload processed and files stored.",
-        "original_input_filename": file.filename,
+        "original_input_filename": filename,
         "is_zip_package": is_zip_file,
         "validation_metadata": processed_files_metadata_list, # Contains SHA256 and filenames
         "minio_storage_details": minio_upload_results # Contains MinIO object names and version IDs
@@ -796,97 +1247,147 @@ async def upload_evidence_refined(file: UploadFile = File(...), db: Session = De
 
 # ProofMode-specific ZIP handling endpoint
 @app.post("/api/v1/upload/proofmode")
-async def upload_proofmode_zip(file: UploadFile = File(...), db: Session = Depends(get_db)):
+async def upload_proofmode_zip(file: UploadFile = File(...), background: bool = False, db: Session = Depends(get_db)):
     """
     ProofMode ZIP upload handler that follows the forensic workflow:
-    1. Stream ZIP to temp file
+    1. Hash the spooled upload in place
     2. Verify GPG signatures
     3. Extract and validate contents
     4. Store original ZIP in bundles/{sha256}.zip
     5. Store media files in media/{sha256}.{ext}
-    6. Generate thumbnails
+    6. Generate the derivative pyramid (thumbnails)
     7. Prepare for PostgreSQL/PostGIS insertion
     8. Prepare for immudb ledger entry
+    With ?background=true the bundle is spooled and queued, and a job id is returned at once.
     """
-    if not minio_client:
-        raise HTTPException(status_code=500, detail="MinIO client not initialized.")
-    
     # Validate it's a ZIP file
     allowed_zip_types = ["application/zip", "application/x-zip-compressed", "application/x-zip"]
     if file.content_type not in allowed_zip_types:
         raise HTTPException(status_code=400, detail="Only ZIP files are accepted for ProofMode uploads.")
     
+    if background:
+        # Spool and queue; poll GET /api/v1/jobs/{job_id} for the result
+        return await enqueue_ingestion("proofmode", file, db)
+    
+    return await process_proofmode_bundle(file.file, file.filename, db)
+
+async def process_proofmode_bundle(
+    bundle_stream: BinaryIO,
+    filename: str,
+    db: Session,
+    bundle_sha256: Optional[str] = None,
+    bundle_size: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None
+) -> Dict[str, Any]:
+    """
+    Run the ProofMode ingestion pipeline over a seekable ZIP stream.
+    Shared by the multipart endpoint, resumable-upload finalize and the ingestion
+    queue; pass bundle_sha256/bundle_size when the bundle digest is already known.
+    progress(stage, percent) is called as each step starts.
+    """
+    report = progress or (lambda stage, percent: None)
+    if not minio_client:
+        raise HTTPException(status_code=500, detail="MinIO client not initialized.")
+    
     upload_id = str(uuid4())
     
     with tempfile.TemporaryDirectory() as temp_dir:
-        # Step 1: Stream ZIP to temp file
-        zip_file_path = os.path.join(temp_dir, file.filename)
-        with open(zip_file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Calculate ZIP SHA256 for immutable storage
-        zip_sha256 = await calculate_sha256(zip_file_path)
+        report("hashing", 5)
+        # Step 1: Hash the spooled upload in place (no extra copy to a temp file)
+        if bundle_sha256 and bundle_size is not None:
+            zip_sha256, zip_size = bundle_sha256, bundle_size
+        else:
+            zip_sha256, zip_size = await hashing_service.sha256_stream(bundle_stream)
         
-        # Step 2: Extract ZIP contents
+        report("extracting", 10)
+        # Step 2: Extract ZIP contents straight from the spooled upload. Members are
+        # hashed as they are written and every later stage reuses those digests.
         extracted_path = os.path.join(temp_dir, "extracted")
+        digest_cache = DigestCache()
         try:
-            with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-                zip_ref.extractall(extracted_path)
+            digest_cache.seed(await run_in_threadpool(_extract_zip_stream, bundle_stream, extracted_path))
         except zipfile.BadZipFile:
             raise HTTPException(status_code=400, detail="Invalid ZIP file.")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid ZIP file: {e}")
         
+        report("verifying_signatures", 25)
         # Step 3: Verify GPG signatures
-        signature_verification = await verify_proofmode_signatures(extracted_path)
+        signature_verification = await verify_proofmode_signatures(extracted_path, db, digest_cache)
         if not signature_verification["valid"]:
             raise HTTPException(
                 status_code=400, 
                 detail=f"GPG signature verification failed: {signature_verification['errors']}"
             )
         
+        report("parsing", 40)
         # Step 4: Parse ProofMode metadata
-        proofmode_data = await parse_proofmode_contents(extracted_path)
+        proofmode_data = await parse_proofmode_contents(extracted_path, digest_cache)
         if not proofmode_data["valid"]:
             raise HTTPException(
                 status_code=400,
                 detail=f"ProofMode content validation failed: {proofmode_data['errors']}"
             )
         
-        # Step 5: Store original ZIP in bundles/{sha256}.zip (immutable)
+        report("storing", 55)
+        # Steps 5-6 run concurrently on the upload scheduler, bounded per request
+        uploads = upload_scheduler.batch()
+        
+        # Objects are content-addressed, so any key already in the dedup index holds
+        # these exact bytes and is linked to the new evidence without re-uploading.
+        media_digests = await digest_cache.sha256_many(mf["path"] for mf in proofmode_data["media_files"])
         bundle_object_name = f"bundles/{zip_sha256}.zip"
-        try:
-            with open(zip_file_path, 'rb') as zip_data:
-                zip_size = os.path.getsize(zip_file_path)
-                result = minio_client.put_object(
+        media_object_names = {
+            mf["path"]: f"media/{media_digests[mf['path']]}{os.path.splitext(mf['filename'])[1]}"
+            for mf in proofmode_data["media_files"]
+        }
+        known_blobs = dedup_index.lookup_many(db, [bundle_object_name, *media_object_names.values()])
+        # Derivative pyramids of media already stored are reused rather than re-rendered
+        known_derivatives = derivative_service.existing(
+            db, [media_digests[path] for path, name in media_object_names.items() if name in known_blobs]
+        )
+        
+        # Step 5: Store original ZIP in bundles/{sha256}.zip (immutable)
+        async def store_bundle():
+            known_bundle = known_blobs.get(bundle_object_name)
+            if known_bundle:
+                return known_bundle.minio_version_id, True
+            try:
+                bundle_stream.seek(0)
+                result = await uploads.put_object(
+                    minio_client,
                     MINIO_BUCKET,
                     bundle_object_name,
-                    zip_data,
-                    length=zip_size,
+                    bundle_stream,
+                    zip_size,
                     content_type="application/zip",
-                    metadata={"original_filename": file.filename, "upload_id": upload_id}
+                    metadata={"original_filename": filename, "upload_id": upload_id}
+                )
+                dedup_index.record(
+                    db, bundle_object_name, zip_sha256, zip_size, "application/zip", result.version_id, result.etag
                 )
-                bundle_version_id = result.version_id
-        except S3Error as e:
-            raise HTTPException(status_code=500, detail=f"Failed to store bundle: {e}")
+                return result.version_id, False
+            except S3Error as e:
+                raise HTTPException(status_code=500, detail=f"Failed to store bundle: {e}")
         
         # Step 6: Process and store media files
-        media_files = []
-        thumbnails = []
-        
-        for media_file in proofmode_data["media_files"]:
+        async def store_media(media_file: Dict[str, Any]):
             file_path = media_file["path"]
-            file_sha256 = await calculate_sha256(file_path)
-            file_extension = os.path.splitext(media_file["filename"])[1]
+            file_sha256 = media_digests[file_path]
+            file_size = os.path.getsize(file_path)
             
-            # Store original media file
-            media_object_name = f"media/{file_sha256}{file_extension}"
+            # Store original media file, unless the same bytes are already stored
+            media_object_name = media_object_names[file_path]
             try:
-                with open(file_path, 'rb') as media_data:
-                    file_size = os.path.getsize(file_path)
-                    media_result = minio_client.put_object(
+                known_media = known_blobs.get(media_object_name)
+                if known_media:
+                    media_version_id = known_media.minio_version_id
+                else:
+                    media_result = await uploads.put_file(
+                        minio_client,
                         MINIO_BUCKET,
                         media_object_name,
-                        media_data,
-                        length=file_size,
+                        file_path,
                         content_type=media_file.get("mime_type", "application/octet-stream"),
                         metadata={
                             "original_filename": media_file["filename"],
@@ -894,28 +1395,51 @@ async def upload_proofmode_zip(file: UploadFile = File(...), db: Session = Depen
                             "upload_id": upload_id
                         }
                     )
-                    
-                media_files.append({
+                    media_version_id = media_result.version_id
+                    dedup_index.record(
+                        db, media_object_name, file_sha256, file_size, media_file.get("mime_type"),
+                        media_result.version_id, media_result.etag
+                    )
+                
+                stored_media = {
                     "object_name": media_object_name,
                     "sha256": file_sha256,
                     "original_filename": media_file["filename"],
-                    "version_id": media_result.version_id,
+                    "version_id": media_version_id,
                     "size": file_size,
                     "mime_type": media_file.get("mime_type"),
-                    "metadata": media_file.get("metadata", {})
-                })
+                    "metadata": media_file.get("metadata", {}),
+                    "deduplicated": known_media is not None,
+                    "derivatives": []
+                }
                 
-                # Generate thumbnail for images
+                # Generate the derivative pyramid for images
+                thumbnail_result = None
                 if media_file.get("mime_type", "").startswith("image/"):
-                    thumbnail_result = await generate_and_store_thumbnail(
-                        file_path, file_sha256, minio_client, MINIO_BUCKET, upload_id
+                    stored_media["derivatives"] = known_derivatives.get(file_sha256) or await generate_and_store_derivatives(
+                        file_path, file_sha256, minio_client, MINIO_BUCKET, upload_id, uploads
+                    )
+                    thumbnail_result = thumbnail_from_derivatives(stored_media["derivatives"])
+                # Videos: probe metadata and render the pyramid from a poster frame
+                elif media_file.get("mime_type", "").startswith("video/"):
+                    stored_media["video"], stored_media["derivatives"] = await generate_and_store_video_derivatives(
+                        file_path, file_sha256, temp_dir, minio_client, MINIO_BUCKET, upload_id, uploads,
+                        known_derivatives.get(file_sha256)
                     )
-                    if thumbnail_result:
-                        thumbnails.append(thumbnail_result)
+                    thumbnail_result = thumbnail_from_derivatives(stored_media["derivatives"])
+                return stored_media, thumbnail_result
                         
             except S3Error as e:
                 raise HTTPException(status_code=500, detail=f"Failed to store media file {media_file['filename']}: {e}")
+        
+        (bundle_version_id, bundle_deduplicated), *stored = await asyncio.gather(
+            store_bundle(), *(store_media(mf) for mf in proofmode_data["media_files"])
+        )
+        # Results keep the bundle's media order, as before
+        media_files = [stored_media for stored_media, _ in stored]
+        thumbnails = [thumb for _, thumb in stored if thumb]
           # Step 7: Insert into PostgreSQL/PostGIS database
+        report("indexing", 80)
         try:
             # Create evidence object record for the bundle
             evidence_obj = EvidenceObject(
@@ -929,7 +1453,7 @@ async def upload_proofmode_zip(file: UploadFile = File(...), db: Session = Depen
                     "device_info": proofmode_data.get("device_info"),
                     "network_info": proofmode_data.get("network_info"),
                     "signature_verification": signature_verification,
-                    "original_filename": file.filename
+                    "original_filename": filename
                 }
             )
             db.add(evidence_obj)
@@ -965,8 +1489,12 @@ async def upload_proofmode_zip(file: UploadFile = File(...), db: Session = Depen
                     size_bytes=media_file.get("size"),
                     minio_object_name=media_file["object_name"],
                     minio_version_id=media_file["version_id"],
-                    extra_metadata=media_file.get("metadata", {})
+                    extra_metadata=(
+                        {**(media_file.get("metadata") or {}), "video": media_file["video"]}
+                        if media_file.get("video") else media_file.get("metadata", {})
+                    )
                 )
+                derivative_service.record(evidence_file, media_file.get("derivatives", []))
                 db.add(evidence_file)
                 file_records.append(evidence_file)
             
@@ -982,6 +1510,7 @@ async def upload_proofmode_zip(file: UploadFile = File(...), db: Session = Depen
             db.rollback()
             raise HTTPException(status_code=500, detail=f"Database insertion failed: {str(e)}")
           # Step 8: Write transaction to immudb ledger
+        report("ledger", 90)
         try:
             immudb_tx_id = await immudb_service.write_evidence_transaction(
                 object_id=evidence_obj.id,
@@ -995,7 +1524,7 @@ async def upload_proofmode_zip(file: UploadFile = File(...), db: Session = Depen
                     "bundle_version_id": bundle_version_id,
                     "media_version_ids": [mf["version_id"] for mf in media_files],
                     "signature_verification": signature_verification["valid"],
-                    "original_filename": file.filename
+                    "original_filename": filename
                 }
             )
             
@@ -1033,7 +1562,8 @@ async def upload_proofmode_zip(file: UploadFile = File(...), db: Session = Depen
             "bundle": {
                 "sha256": zip_sha256,
                 "object_name": bundle_object_name,
-                "version_id": bundle_version_id
+                "version_id": bundle_version_id,
+                "deduplicated": bundle_deduplicated
             },
             "media_files": media_files,
             "thumbnails": thumbnails,
@@ -1056,10 +1586,144 @@ async def upload_proofmode_zip(file: UploadFile = File(...), db: Session = Depen
             "proofmode_metadata": proofmode_data
         }
 
-async def verify_proofmode_signatures(extracted_path: str) -> Dict[str, Any]:
+# Resumable chunked uploads for large bundles
+class ResumableUploadCreate(BaseModel):
+    filename: str
+    size: int
+    upload_type: str = "general"  # 'general' or 'proofmode'
+    content_type: Optional[str] = None
+    sha256: Optional[str] = None  # Optional digest of the whole file, checked on finalize
+
+@app.post("/api/v1/uploads", status_code=201)
+async def create_resumable_upload(request: ResumableUploadCreate, db: Session = Depends(get_db)):
+    """Open a resumable upload session. Send chunks with PATCH, then POST .../finalize."""
+    try:
+        session = resumable_upload_service.create(
+            db,
+            filename=request.filename,
+            total_size=request.size,
+            upload_type=request.upload_type,
+            content_type=request.content_type,
+            expected_sha256=request.sha256
+        )
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return session_status(session)
+
+@app.get("/api/v1/uploads/{session_id}")
+async def get_resumable_upload(session_id: uuid.UUID, db: Session = Depends(get_db)):
+    """Upload session status; 'offset' is where the next chunk must start."""
+    try:
+        session = resumable_upload_service.get(db, session_id)
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return JSONResponse(session_status(session), headers={"Upload-Offset": str(session.received_bytes)})
+
+@app.patch("/api/v1/uploads/{session_id}")
+async def append_resumable_upload(
+    session_id: uuid.UUID,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset"),
+    chunk_sha256: Optional[str] = Header(None, alias="X-Chunk-SHA256"),
+    db: Session = Depends(get_db)
+):
+    """
+    Append the raw request body at Upload-Offset. Chunks are hashed as they are
+    written; a failed or interrupted chunk is discarded and can be resent.
+    """
+    try:
+        session = await resumable_upload_service.append(
+            db, session_id, upload_offset, request.stream(), chunk_sha256=chunk_sha256
+        )
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return JSONResponse(session_status(session), headers={"Upload-Offset": str(session.received_bytes)})
+
+@app.post("/api/v1/uploads/{session_id}/finalize")
+async def finalize_resumable_upload(session_id: uuid.UUID, db: Session = Depends(get_db)):
+    """Hand a fully received upload to the ProofMode or general ingestion pipeline."""
+    try:
+        session = await resumable_upload_service.begin_finalize(db, session_id)
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    spool_path = resumable_upload_service.spool_path(session.id)
+    try:
+        if session.upload_type == "proofmode":
+            with open(spool_path, "rb") as bundle_stream:
+                result = await process_proofmode_bundle(
+                    bundle_stream, session.filename, db,
+                    bundle_sha256=session.sha256, bundle_size=session.total_size
+                )
+        else:
+            result = await process_general_upload(
+                spool_path, session.filename, session.content_type, db, calculated_hash=session.sha256
+            )
+    except HTTPException as e:
+        resumable_upload_service.fail(db, session_id, e.detail, retryable=e.status_code >= 500)
+        raise
+    except Exception as e:
+        resumable_upload_service.fail(db, session_id, e, retryable=True)
+        raise HTTPException(status_code=500, detail=f"Finalize failed: {str(e)}")
+
+    resumable_upload_service.complete(db, session_id, {"id": result["id"], "message": result["message"]})
+    return result
+
+# Background ingestion queue
+async def enqueue_ingestion(job_type: str, file: UploadFile, db: Session) -> JSONResponse:
+    """Spool an upload (hashing it on the way) and queue it for the ingestion workers"""
+    spool_path, sha256, size = await run_in_threadpool(ingestion_queue.spool, file.file)
+    job = ingestion_queue.enqueue(
+        db, job_type, spool_path, file.filename,
+        content_type=file.content_type, sha256=sha256, size_bytes=size
+    )
+    return JSONResponse(
+        status_code=202,
+        content={**job_status(job), "job_id": str(job.id), "status_url": f"/api/v1/jobs/{job.id}"}
+    )
+
+async def _run_pipeline_job(pipeline):
+    """Translate client errors from a pipeline into permanent job failures"""
+    try:
+        return await pipeline
+    except HTTPException as e:
+        if e.status_code < 500:
+            raise PermanentJobError(e.detail)
+        raise RuntimeError(e.detail)
+
+async def run_proofmode_job(job, db: Session, progress: ProgressCallback) -> Dict[str, Any]:
+    with open(job.spool_path, "rb") as bundle_stream:
+        return await _run_pipeline_job(process_proofmode_bundle(
+            bundle_stream, job.filename, db,
+            bundle_sha256=job.sha256, bundle_size=job.size_bytes, progress=progress
+        ))
+
+async def run_general_job(job, db: Session, progress: ProgressCallback) -> Dict[str, Any]:
+    return await _run_pipeline_job(process_general_upload(
+        job.spool_path, job.filename, job.content_type, db,
+        calculated_hash=job.sha256, progress=progress
+    ))
+
+ingestion_queue.register("proofmode", run_proofmode_job)
+ingestion_queue.register("general", run_general_job)
+
+@app.get("/api/v1/jobs/{job_id}")
+async def get_ingestion_job(job_id: uuid.UUID, db: Session = Depends(get_db)):
+    """Status, progress and (once completed) the pipeline result of an ingestion job."""
+    job = ingestion_queue.get(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    return job_status(job)
+
+async def verify_proofmode_signatures(
+    extracted_path: str,
+    db: Optional[Session] = None,
+    digest_cache: Optional[DigestCache] = None
+) -> Dict[str, Any]:
     """
     Verify GPG signatures for ProofMode files.
     ProofMode typically includes .asc signature files for JSON and media files.
+    With a db session, verdicts already accepted for identical bytes and key are reused.
     """
     try:
         # Skip GPG verification in testing mode or if explicitly disabled
@@ -1092,17 +1756,15 @@ async def verify_proofmode_signatures(extracted_path: str) -> Dict[str, Any]:
                 "testing_mode": True
             }
         
-        # Initialize GPG for real verification
-        gpg = gnupg.GPG()
-        
-        verification_results = []
         signature_files = []
+        key_files = []
         
-        # Find all .asc signature files
+        # Find all .asc files: detached signatures, plus the bundle's armored public key
         for root, dirs, files in os.walk(extracted_path):
             for file in files:
                 if file.endswith('.asc'):
-                    signature_files.append(os.path.join(root, file))
+                    path = os.path.join(root, file)
+                    (key_files if is_public_key_file(path) else signature_files).append(path)
         
         if not signature_files:
             return {
@@ -1111,38 +1773,22 @@ async def verify_proofmode_signatures(extracted_path: str) -> Dict[str, Any]:
                 "verifications": []
             }
         
-        all_valid = True
+        # Import the bundle's key into the shared keyring (no-op once seen). The keyring
+        # also holds keys of earlier bundles, so only this bundle's keys, and the operator's
+        # trusted keyring (the fallback for bundles without pubkey.asc), may sign for it.
+        bundle_fingerprints = set(await run_in_threadpool(signature_verifier.trusted_fingerprints))
+        for key_file in key_files:
+            bundle_fingerprints.update(await run_in_threadpool(signature_verifier.import_key_file, key_file))
         
-        for sig_file in signature_files:
-            # Determine the corresponding data file
-            data_file = sig_file[:-4]  # Remove .asc extension
-            
-            if not os.path.exists(data_file):
-                all_valid = False
-                verification_results.append({
-                    "signature_file": os.path.basename(sig_file),
-                    "data_file": os.path.basename(data_file),
-                    "valid": False,
-                    "error": "Corresponding data file not found"
-                })
-                continue
-            
-            # Verify signature
-            with open(sig_file, 'rb') as sig_f:
-                verification = gpg.verify_file(sig_f, data_file)
-                
-                verification_results.append({
-                    "signature_file": os.path.basename(sig_file),
-                    "data_file": os.path.basename(data_file),
-                    "valid": verification.valid,
-                    "fingerprint": verification.fingerprint,
-                    "status": verification.status,
-                    "trust_level": verification.trust_level,
-                    "error": None if verification.valid else verification.stderr
-                })
-                
-                if not verification.valid:
-                    all_valid = False
+        # Verify every detached signature concurrently on the verification pool
+        pairs = [(sig_file, sig_file[:-4]) for sig_file in signature_files]  # Remove .asc extension
+        if db is not None:
+            verification_results = await verification_cache.verify_many(
+                db, pairs, digest_cache or DigestCache(), bundle_fingerprints
+            )
+        else:
+            verification_results = await signature_verifier.verify_many(pairs, bundle_fingerprints)
+        all_valid = all(v["valid"] for v in verification_results)
         
         return {
             "valid": all_valid,
@@ -1157,12 +1803,60 @@ async def verify_proofmode_signatures(extracted_path: str) -> Dict[str, Any]:
             "verifications": []
         }
 
-async def parse_proofmode_contents(extracted_path: str) -> Dict[str, Any]:
+class SidecarIndex(NamedTuple):
+    """ProofMode JSON sidecars parsed once, indexed for constant-time lookup per media file"""
+    parsed: Dict[str, Any]  # path -> parsed JSON
+    by_stem: Dict[str, str]  # file stem without .json/.proof -> path
+    by_hash: Dict[str, str]  # SHA-256 embedded in the file name or File.HashSHA256 -> path
+    
+    def match(self, media_filename: str, sha256: str) -> Optional[Any]:
+        """Sidecar for a media file: by its hash first, then by its name with or without extension"""
+        json_file = (
+            self.by_hash.get(sha256)
+            or self.by_stem.get(media_filename)
+            or self.by_stem.get(os.path.splitext(media_filename)[0])
+        )
+        return self.parsed[json_file] if json_file else None
+
+SHA256_IN_NAME = re.compile(r"(?<![0-9a-fA-F])[0-9a-fA-F]{64}(?![0-9a-fA-F])")
+
+def index_proofmode_sidecars(json_files: List[str]) -> SidecarIndex:
+    """
+    Parse each JSON sidecar once and index it by name stem and embedded hash.
+    ProofMode names sidecars after the media (IMG.jpg.proof.json, IMG.json) or its
+    SHA-256; the first sidecar seen wins each key, as in the original scan.
+    """
+    parsed, by_stem, by_hash = {}, {}, {}
+    for json_file in json_files:
+        try:
+            with open(json_file, 'r') as f:
+                parsed[json_file] = json.load(f)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            # One malformed sidecar must not fail the whole bundle; its media just go unmatched
+            logger.warning(f"Skipping unparseable ProofMode sidecar {os.path.basename(json_file)}: {e}")
+            continue
+        stem = os.path.splitext(os.path.basename(json_file))[0]
+        # Remove .proof suffix if present
+        if stem.endswith('.proof'):
+            stem = stem[:-6]
+        by_stem.setdefault(stem, json_file)
+        for embedded in SHA256_IN_NAME.findall(stem):
+            by_hash.setdefault(embedded.lower(), json_file)
+        content = parsed[json_file]
+        if isinstance(content, dict):
+            content_hash = content.get("File.HashSHA256") or (content.get("File") or {}).get("HashSHA256")
+            if isinstance(content_hash, str):
+                by_hash.setdefault(content_hash.lower(), json_file)
+    return SidecarIndex(parsed, by_stem, by_hash)
+
+async def parse_proofmode_contents(extracted_path: str, digest_cache: Optional[DigestCache] = None) -> Dict[str, Any]:
     """
     Parse ProofMode ZIP contents and extract metadata.
     ProofMode typically includes JSON metadata files with location, device info, etc.
+    Pass the upload's DigestCache so members hashed during extraction are not re-read.
     """
     try:
+        digest_cache = digest_cache or DigestCache()
         media_files = []
         metadata = {}
         
@@ -1172,6 +1866,7 @@ async def parse_proofmode_contents(extracted_path: str) -> Dict[str, Any]:
         # Find JSON metadata file (ProofMode usually has a .json file with the same base name as the image)
         json_files = []
         image_files = []
+        video_files = []
         
         for root, dirs, files in os.walk(extracted_path):
             for file in files:
@@ -1182,13 +1877,15 @@ async def parse_proofmode_contents(extracted_path: str) -> Dict[str, Any]:
                     json_files.append(file_path)
                 elif file_ext in image_extensions:
                     image_files.append(file_path)
+                elif file_ext in VIDEO_MIME_TYPES:
+                    video_files.append(file_path)
+        
+        # Parse every sidecar exactly once and index it for matching
+        sidecars = await run_in_threadpool(index_proofmode_sidecars, json_files)
         
         # Parse the main JSON metadata (should be similar to your json.example)
-        main_metadata = None
-        if json_files:
-            # Use the first JSON file as main metadata
-            with open(json_files[0], 'r') as f:
-                main_metadata = json.load(f)
+        # Use the first JSON file that parsed as main metadata
+        main_metadata = next(iter(sidecars.parsed.values()), None)
           # Extract location information for PostGIS
         location = None
         if main_metadata:
@@ -1211,30 +1908,22 @@ async def parse_proofmode_contents(extracted_path: str) -> Dict[str, Any]:
                 except (ValueError, TypeError):
                     # Invalid coordinates, skip location
                     pass
-          # Process media files (images with SHA256 in filename)
-        for image_file in image_files:
-            mime_type = mimetypes.guess_type(image_file)[0] or "application/octet-stream"
+          # Process media files (images and videos with SHA256 in filename)
+        # Hash every file not already known, concurrently on the hashing pool
+        image_digests = await digest_cache.sha256_many(image_files + video_files)
+        for image_file in image_files + video_files:
+            mime_type = (
+                VIDEO_MIME_TYPES.get(os.path.splitext(image_file)[1].lower())
+                or mimetypes.guess_type(image_file)[0]
+                or "application/octet-stream"
+            )
             
             # Calculate file size and SHA256
             file_size = os.path.getsize(image_file)
-            calculated_hash = await calculate_sha256(image_file)
-            
-            # Look for corresponding JSON metadata based on SHA256 hash in filename
-            base_name = os.path.splitext(os.path.basename(image_file))[0]
-            corresponding_json = None
+            calculated_hash = image_digests[image_file]
             
-            # ProofMode uses SHA256 hash in filenames, try to match
-            for json_file in json_files:
-                json_basename = os.path.splitext(os.path.basename(json_file))[0]
-                # Remove .proof suffix if present
-                if json_basename.endswith('.proof'):
-                    json_basename = json_basename[:-6]
-                
-                # Check if the hash part matches
-                if calculated_hash in json_basename or json_basename in os.path.basename(image_file):
-                    with open(json_file, 'r') as f:
-                        corresponding_json = json.load(f)
-                    break
+            # Look up the corresponding JSON metadata in the sidecar index
+            corresponding_json = sidecars.match(os.path.basename(image_file), calculated_hash)
             
             media_files.append({
                 "path": image_file,
@@ -1273,72 +1962,75 @@ async def parse_proofmode_contents(extracted_path: str) -> Dict[str, Any]:
             "media_files": []
         }
 
-async def generate_and_store_thumbnail(
+async def generate_and_store_derivatives(
     image_path: str, 
     original_sha256: str, 
     minio_client: Minio, 
     bucket: str, 
-    upload_id: str
-) -> Optional[Dict[str, Any]]:
+    upload_id: str,
+    uploads: Optional[UploadBatch] = None
+) -> List[Dict[str, Any]]:
     """
-    Generate a 1024px thumbnail and store it in MinIO.
+    Render the derivative pyramid (e.g. 128/512/1024 px, WebP and JPEG) and store it in MinIO.
+    The puts run on the request's UploadBatch when one is given.
+    Returns [] when the file is not a decodable image.
     """
     try:
-        # Check if the file is actually an image by trying to open it
-        try:
-            with Image.open(image_path) as img:
-                # Convert to RGB if necessary (for PNG with transparency, etc.)
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    img = img.convert('RGB')
-                
-                # Calculate thumbnail size maintaining aspect ratio
-                original_size = img.size
-                img.thumbnail((1024, 1024), Image.Resampling.LANCZOS)
-                
-                # Save thumbnail to temporary file
-                thumbnail_path = image_path + "_thumb.jpg"
-                img.save(thumbnail_path, "JPEG", quality=85, optimize=True)
-                
-                # Calculate thumbnail SHA256
-                thumb_sha256 = await calculate_sha256(thumbnail_path)
-                
-                # Store thumbnail in MinIO
-                thumbnail_object_name = f"thumbnails/{thumb_sha256}.jpg"
-                with open(thumbnail_path, 'rb') as thumb_data:
-                    thumb_size = os.path.getsize(thumbnail_path)
-                    result = minio_client.put_object(
-                        bucket,
-                        thumbnail_object_name,
-                        thumb_data,
-                        length=thumb_size,
-                        content_type="image/jpeg",
-                        metadata={
-                            "original_sha256": original_sha256,
-                            "upload_id": upload_id,
-                            "thumbnail_size": "1024",
-                            "original_dimensions": f"{original_size[0]}x{original_size[1]}"
-                        }
-                    )
-                
-                # Clean up temporary thumbnail file
-                os.unlink(thumbnail_path)
-                
-                return {
-                    "object_name": thumbnail_object_name,
-                    "sha256": thumb_sha256,
-                    "version_id": result.version_id,
-                    "size": thumb_size,
-                    "dimensions": f"{img.width}x{img.height}",
-                    "original_dimensions": f"{original_size[0]}x{original_size[1]}"
-                }
-        except Exception as img_error:
-            # If it's not a valid image file, skip thumbnail generation
-            print(f"Skipping thumbnail generation for {image_path}: {img_error}")
-            return None
-            
+        return await derivative_service.store(minio_client, bucket, image_path, original_sha256, upload_id, uploads)
+    except Exception as e:
+        # If it's not a valid image file, skip derivative generation
+        logger.warning(f"Skipping derivative generation for {image_path}: {e}")
+        return []
+
+async def generate_and_store_video_derivatives(
+    video_path: str,
+    original_sha256: str,
+    work_dir: str,
+    minio_client: Minio,
+    bucket: str,
+    upload_id: str,
+    uploads: Optional[UploadBatch] = None,
+    known_derivatives: Optional[List[Dict[str, Any]]] = None
+) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Probe a video (duration, codecs, dimensions) and store the derivative pyramid of
+    its poster frame. ffprobe/ffmpeg read the file from disk on the video pool; the
+    poster is only extracted when no pyramid is stored for these bytes yet.
+    Returns (video info, derivatives); (None, []) when the tools are missing or fail.
+    """
+    if not video_service.available():
+        logger.warning(f"Skipping video processing for {video_path}: ffprobe/ffmpeg not installed")
+        return None, known_derivatives or []
+    poster_path = None if known_derivatives else os.path.join(work_dir, f"{uuid4()}_poster.jpg")
+    try:
+        extract = await video_service.extract(video_path, poster_path)
     except Exception as e:
-        print(f"Failed to generate thumbnail for {image_path}: {e}")
-        return None
+        logger.warning(f"Skipping video processing for {video_path}: {e}")
+        return None, known_derivatives or []
+    if known_derivatives:
+        return extract.info, known_derivatives
+    if not extract.poster_path:
+        return extract.info, []
+    try:
+        return extract.info, await generate_and_store_derivatives(
+            extract.poster_path, original_sha256, minio_client, bucket, upload_id, uploads
+        )
+    finally:
+        os.unlink(extract.poster_path)
+
+def thumbnail_from_derivatives(derivatives: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """The 1024px JPEG level, in the shape upload responses have always reported thumbnails"""
+    for derivative in derivatives:
+        if derivative["size"] == THUMBNAIL_SIZE and derivative["format"] == "jpeg":
+            return {
+                "object_name": derivative["object_name"],
+                "sha256": derivative["sha256"],
+                "version_id": derivative["version_id"],
+                "size": derivative["size_bytes"],
+                "dimensions": f"{derivative['width']}x{derivative['height']}",
+                "original_dimensions": derivative.get("original_dimensions")
+            }
+    return None
 
 # P10 - Dossier Generator
 
@@ -1354,7 +2046,7 @@ async def generate_dossier(
     """
     P10-T2: Generate route - POST /api/v1/dossier with JSON {ids:[...]}
     Fetch files, build mapsnap, render Docx via docxtpl, save to MinIO dossiers bucket.
-    Respond with presigned download URL.
+    Respond with a download URL served by the logging proxy.
     """
     if not minio_client:
         raise HTTPException(status_code=500, detail="MinIO client not initialized.")
@@ -1443,29 +2135,15 @@ async def generate_dossier(
                 except S3Error as e:
                     raise HTTPException(status_code=500, detail=f"Failed to store dossier DOCX: {e}")
             
-            # Generate presigned download URL for DOCX
-            try:
-                docx_presigned_url = minio_client.presigned_get_object(
-                    MINIO_BUCKET,
-                    docx_object_name,
-                    expires=timedelta(hours=1)  # Valid for 1 hour
-                )
-
-                # Replace internal hostname with external hostname for browser access
-                docx_presigned_url = docx_presigned_url.replace(
-                    f"http://minio:{MINIO_PORT}",
-                    f"http://localhost:{MINIO_PORT}"
-                )
-                
-            except S3Error as e:
-                raise HTTPException(status_code=500, detail=f"Failed to generate presigned URL for DOCX: {e}")
+            # Downloads go through the API proxy, which logs each access
+            docx_download_url = download_url(docx_object_name)
             
             response_data = {
                 "case_id": case_id,
                 "evidence_count": len(evidence_items),
                 "docx": {
                     "object_name": docx_object_name,
-                    "download_url": docx_presigned_url,
+                    "download_url": docx_download_url,
                     "version_id": docx_result.version_id
                 },
                 "generated_at": datetime.utcnow().isoformat()
@@ -1499,16 +2177,11 @@ async def generate_dossier(
                                 }
                             )
                             
-                            # Generate presigned download URL for PDF
-                            pdf_presigned_url = minio_client.presigned_get_object(
-                                MINIO_BUCKET,
-                                pdf_object_name,
-                                expires=timedelta(hours=1)
-                            )
+                            pdf_download_url = download_url(pdf_object_name)
                             
                             response_data["pdf"] = {
                                 "object_name": pdf_object_name,
-                                "download_url": pdf_presigned_url,
+                                "download_url": pdf_download_url,
                                 "version_id": pdf_result.version_id,
                                 "conversion_method": "python-docx2pdf"
                             }
@@ -1548,16 +2221,11 @@ async def generate_dossier(
                                         }
                                     )
                                     
-                                    # Generate presigned download URL for PDF
-                                    pdf_presigned_url = minio_client.presigned_get_object(
-                                        MINIO_BUCKET,
-                                        pdf_object_name,
-                                        expires=timedelta(hours=1)
-                                    )
+                                    pdf_download_url = download_url(pdf_object_name)
                                     
                                     response_data["pdf"] = {
                                         "object_name": pdf_object_name,
-                                        "download_url": pdf_presigned_url,
+                                        "download_url": pdf_download_url,
                                         "version_id": pdf_result.version_id,
                                         "conversion_method": "libreoffice"
                                     }
@@ -3,7 +3,7 @@ Database models for Evidence-MVP
 """
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Text, Integer, ForeignKey
+from sqlalchemy import Column, String, DateTime, Text, Integer, BigInteger, Boolean, ForeignKey, Index, UniqueConstraint, DDL, event
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -20,12 +20,12 @@ class EvidenceObject(Base):
     org_id = Column(UUID(as_uuid=True), nullable=True)  # Will be FK when auth is implemented
     object_name = Column(String, nullable=False)  # MinIO object key
     sha256 = Column(String(64), nullable=False)
-    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
     minio_version_id = Column(String, nullable=True)  # MinIO version ID for object lock
     immudb_tx_id = Column(String, nullable=True)  # immudb transaction ID for P8-T1
     
     # Type differentiation
-    object_type = Column(String, nullable=False)  # 'proofmode_bundle', 'general_upload', 'tella_bundle', etc.
+    object_type = Column(String, nullable=False, index=True)  # 'proofmode_bundle', 'general_upload', 'tella_bundle', etc.
     
     # Additional metadata
     extra_metadata = Column(JSONB, nullable=True)  # Store parsed metadata as JSON
@@ -37,21 +37,29 @@ class EvidenceObject(Base):
 class EvidenceFile(Base):
     """Individual files within evidence objects"""
     __tablename__ = "evidence_files"
+    __table_args__ = (
+        Index("ix_evidence_files_created_at_id", "created_at", "id"),
+        # Time-windowed bbox queries; GiST on a timestamp needs btree_gist (see below)
+        Index("ix_evidence_files_geometry_captured_at", "geometry", "captured_at", postgresql_using="gist"),
+        # pattern_ops serves both equality and "image/%" prefix filters
+        Index("ix_evidence_files_mime_type", "mime_type", postgresql_ops={"mime_type": "text_pattern_ops"}),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    object_id = Column(UUID(as_uuid=True), ForeignKey("evidence_objects.id"), nullable=False)
+    object_id = Column(UUID(as_uuid=True), ForeignKey("evidence_objects.id"), nullable=False, index=True)
     filename = Column(String, nullable=False)  # Original filename
-    sha256 = Column(String(64), nullable=False)
+    sha256 = Column(String(64), nullable=False, index=True)
     
     # Spatial data - PostGIS GEOGRAPHY column for WGS84 coordinates
     geometry = Column(Geography(geometry_type='POINT', srid=4326), nullable=True)
     
     # Temporal data
-    captured_at = Column(DateTime, nullable=True)  # When the file was captured/created
+    captured_at = Column(DateTime, nullable=True, index=True)  # When the file was captured/created
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # Ingestion time; keyset pagination order
     
     # File metadata
     mime_type = Column(String, nullable=True)
-    size_bytes = Column(Integer, nullable=True)
+    size_bytes = Column(BigInteger, nullable=True)  # Videos routinely exceed 2 GiB
     
     # Additional metadata specific to the file
     extra_metadata = Column(JSONB, nullable=True)
@@ -62,6 +70,16 @@ class EvidenceFile(Base):
     
     # Relationship back to evidence object
     evidence_object = relationship("EvidenceObject", back_populates="files")
+    
+    # Downscaled renditions (see EvidenceDerivative)
+    derivatives = relationship("EvidenceDerivative", back_populates="evidence_file")
+
+
+event.listen(
+    EvidenceFile.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+)
 
 
 class ImmudbTransaction(Base):
@@ -82,3 +100,156 @@ class ImmudbTransaction(Base):
     
     # Store the actual payload for reference
     payload = Column(JSONB, nullable=False)
+
+
+class StoredBlob(Base):
+    """Content-addressed MinIO objects already stored, used to skip re-uploads"""
+    __tablename__ = "stored_blobs"
+    
+    # MinIO object key; content-addressed keys embed the sha256 (bundles/{sha}.zip, media/{sha}.ext)
+    object_name = Column(String, primary_key=True)
+    sha256 = Column(String(64), nullable=False, index=True)
+    size_bytes = Column(BigInteger, nullable=True)
+    content_type = Column(String, nullable=True)
+    
+    # MinIO write result of the first upload
+    minio_version_id = Column(String, nullable=True)
+    etag = Column(String, nullable=True)
+    
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class UploadSession(Base):
+    """Resumable chunked upload; bytes are spooled on local disk until finalize"""
+    __tablename__ = "upload_sessions"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    filename = Column(String, nullable=False)
+    content_type = Column(String, nullable=True)
+    upload_type = Column(String, nullable=False)  # 'proofmode' or 'general', selects the finalize pipeline
+    
+    total_size = Column(BigInteger, nullable=False)
+    received_bytes = Column(BigInteger, nullable=False, default=0)
+    expected_sha256 = Column(String(64), nullable=True)  # Optional client-declared digest, checked on finalize
+    sha256 = Column(String(64), nullable=True)  # Digest of the assembled upload, set on finalize
+    
+    status = Column(String, nullable=False, default="open")  # 'open', 'finalizing', 'completed', 'failed', 'expired'
+    result = Column(JSONB, nullable=True)  # Pipeline response (or error) once finalized
+    
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class IngestionJob(Base):
+    """Queued background ingestion of a spooled upload; claimed by workers with SKIP LOCKED"""
+    __tablename__ = "ingestion_jobs"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_type = Column(String, nullable=False)  # 'proofmode' or 'general', selects the pipeline
+    status = Column(String, nullable=False, default="queued", index=True)  # 'queued', 'running', 'completed', 'failed'
+    
+    # Progress reported by the pipeline stages
+    stage = Column(String, nullable=True)
+    progress = Column(Integer, nullable=False, default=0)  # 0-100
+    
+    # Spooled input
+    spool_path = Column(String, nullable=False)
+    spool_node = Column(String, nullable=True)  # Node whose spool directory holds the file; only it claims the job
+    filename = Column(String, nullable=False)
+    content_type = Column(String, nullable=True)
+    sha256 = Column(String(64), nullable=True)  # Digest computed while spooling
+    size_bytes = Column(BigInteger, nullable=True)
+    
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    result = Column(JSONB, nullable=True)  # Pipeline response once completed
+    
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)  # Worker heartbeat
+
+
+class SignatureVerification(Base):
+    """Accepted detached-signature verdicts, so byte-identical resubmissions skip gpg"""
+    __tablename__ = "signature_verifications"
+    
+    # A verdict only applies to these exact bytes checked against this exact key
+    data_sha256 = Column(String(64), primary_key=True)
+    signature_sha256 = Column(String(64), primary_key=True)
+    fingerprint = Column(String(40), primary_key=True)  # Key that produced the valid signature
+    
+    status = Column(String, nullable=True)
+    trust_level = Column(Integer, nullable=True)
+    
+    verified_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class EvidenceDerivative(Base):
+    """Downscaled rendition of an evidence file (map popups, previews), stored in MinIO"""
+    __tablename__ = "evidence_derivatives"
+    __table_args__ = (UniqueConstraint("evidence_file_id", "size", "format"),)
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    evidence_file_id = Column(UUID(as_uuid=True), ForeignKey("evidence_files.id"), nullable=False, index=True)
+    
+    size = Column(Integer, nullable=False)  # Requested longest edge in px (pyramid level)
+    format = Column(String, nullable=False)  # 'webp' or 'jpeg'
+    width = Column(Integer, nullable=False)
+    height = Column(Integer, nullable=False)
+    
+    # MinIO storage info; keys are derived from the original's sha256 so identical media share them
+    object_name = Column(String, nullable=False, index=True)
+    sha256 = Column(String(64), nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    content_type = Column(String, nullable=False)
+    minio_version_id = Column(String, nullable=True)
+    
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    evidence_file = relationship("EvidenceFile", back_populates="derivatives")
+
+
+class EvidenceAccessLog(Base):
+    """Append-only chain-of-custody record of each proxied download"""
+    __tablename__ = "evidence_access_log"
+    
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    object_name = Column(String, nullable=False, index=True)  # MinIO object key
+    minio_version_id = Column(String, nullable=True)
+    etag = Column(String, nullable=True)
+    
+    # Requested byte range (inclusive); both NULL for a full download
+    range_start = Column(BigInteger, nullable=True)
+    range_end = Column(BigInteger, nullable=True)
+    bytes_sent = Column(BigInteger, nullable=False, default=0)
+    status_code = Column(Integer, nullable=False)
+    completed = Column(Boolean, nullable=False, default=False)  # False if the client went away mid-transfer
+    
+    client_ip = Column(String, nullable=True)
+    user_agent = Column(String, nullable=True)
+    
+    requested_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+# Rows can be added but never changed or removed, not even by the application role
+ACCESS_LOG_APPEND_ONLY_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION evidence_access_log_append_only() RETURNS trigger AS $$
+    BEGIN
+        RAISE EXCEPTION 'evidence_access_log is append-only';
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER evidence_access_log_no_update_delete BEFORE UPDATE OR DELETE ON evidence_access_log
+    FOR EACH ROW EXECUTE FUNCTION evidence_access_log_append_only()
+    """,
+    """
+    CREATE TRIGGER evidence_access_log_no_truncate BEFORE TRUNCATE ON evidence_access_log
+    FOR EACH STATEMENT EXECUTE FUNCTION evidence_access_log_append_only()
+    """,
+]
+for statement in ACCESS_LOG_APPEND_ONLY_DDL:
+    event.listen(EvidenceAccessLog.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
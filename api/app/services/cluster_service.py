@@ -0,0 +1,94 @@
+"""
+Grid clustering of evidence points for low zoom levels.
+
+Points are snapped (``ST_SnapToGrid``) to a Web Mercator grid whose cells are a
+fixed fraction of a map tile at the requested zoom, and each non-empty cell is
+returned as one feature with its count, centroid and bounding box. The grid is
+coarsened until the requested area holds at most CLUSTER_MAX_CELLS cells, so the
+response size is bounded whatever the number of points.
+"""
+import math
+import os
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Query
+
+from .tile_service import TileCache
+
+# 4 cells per 256 px tile: one cluster per 64 px square on screen
+CLUSTER_CELLS_PER_TILE = int(os.getenv("CLUSTER_CELLS_PER_TILE", "4"))
+CLUSTER_MAX_CELLS = int(os.getenv("CLUSTER_MAX_CELLS", "4096"))
+CLUSTER_MAX_ZOOM = 22
+CLUSTER_CACHE_TTL = float(os.getenv("CLUSTER_CACHE_TTL", "60"))
+CLUSTER_CACHE_BYTES = 16 * 1024 * 1024
+
+# EPSG:3857 half extent in metres, and the latitude where it ends
+HALF_WORLD = 20037508.342789244
+MAX_MERCATOR_LAT = 85.0511287798066
+
+
+def mercator(lon: float, lat: float) -> Tuple[float, float]:
+    """EPSG:4326 to EPSG:3857, latitude clamped to the projection's range"""
+    lat = max(-MAX_MERCATOR_LAT, min(MAX_MERCATOR_LAT, lat))
+    x = lon * HALF_WORLD / 180
+    y = math.log(math.tan(math.pi / 4 + math.radians(lat) / 2)) * HALF_WORLD / math.pi
+    return x, y
+
+
+def grid_size(zoom: int, bounds: Optional[Sequence[float]] = None) -> float:
+    """
+    Cell edge in metres for a zoom level, doubled until the area
+    (min_lon, min_lat, max_lon, max_lat; the world if None) fits in CLUSTER_MAX_CELLS.
+    """
+    size = 2 * HALF_WORLD / (2 ** zoom * CLUSTER_CELLS_PER_TILE)
+    if bounds:
+        min_x, min_y = mercator(bounds[0], bounds[1])
+        max_x, max_y = mercator(bounds[2], bounds[3])
+        width, height = abs(max_x - min_x), abs(max_y - min_y)
+    else:
+        width = height = 2 * HALF_WORLD
+    while math.ceil(width / size) * math.ceil(height / size) > CLUSTER_MAX_CELLS:
+        size *= 2
+    return size
+
+
+def cluster_query(items_query: Query, cell_size: float) -> Query:
+    """
+    Per-cell count, centroid and extent over the rows of an items query (which
+    must project lon and lat). The grid origin sits on a cell corner, so the
+    antimeridian is always a cell boundary.
+    """
+    items = items_query.subquery()
+    point = func.ST_Transform(func.ST_SetSRID(func.ST_MakePoint(items.c.lon, items.c.lat), 4326), 3857)
+    cell = func.ST_SnapToGrid(point, cell_size / 2, cell_size / 2, cell_size, cell_size)
+    count = func.count().label("count")
+    return (
+        items_query.session.query(
+            count,
+            func.avg(items.c.lon).label("lon"),
+            func.avg(items.c.lat).label("lat"),
+            func.min(items.c.lon).label("min_lon"),
+            func.min(items.c.lat).label("min_lat"),
+            func.max(items.c.lon).label("max_lon"),
+            func.max(items.c.lat).label("max_lat"),
+        )
+        .group_by(cell)
+        .order_by(count.desc())
+    )
+
+
+def cluster_feature(row) -> Dict[str, Any]:
+    """GeoJSON Feature for one row of cluster_query"""
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [row.lon, row.lat]},
+        "properties": {
+            "count": row.count,
+            "bbox": [row.min_lon, row.min_lat, row.max_lon, row.max_lat],
+        },
+    }
+
+
+# Encoded cluster responses by (zoom, bbox)
+cluster_cache = TileCache(ttl=CLUSTER_CACHE_TTL, max_bytes=CLUSTER_CACHE_BYTES)
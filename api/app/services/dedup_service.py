@@ -0,0 +1,61 @@
+"""
+Content-addressed deduplication index.
+
+ProofMode objects are keyed by their SHA-256 (bundles/{sha}.zip, media/{sha}.ext),
+so a key already recorded in ``stored_blobs`` holds exactly those bytes and the
+new evidence record can point at it without uploading again.
+"""
+import logging
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..models import StoredBlob
+
+logger = logging.getLogger(__name__)
+
+
+class DedupIndex:
+    def lookup_many(self, db: Session, object_names: Iterable[str]) -> Dict[str, StoredBlob]:
+        """Return the already-stored blobs among object_names, keyed by object name"""
+        names = list(dict.fromkeys(object_names))
+        if not names:
+            return {}
+        blobs = db.query(StoredBlob).filter(StoredBlob.object_name.in_(names)).all()
+        return {blob.object_name: blob for blob in blobs}
+
+    def lookup(self, db: Session, object_name: str) -> Optional[StoredBlob]:
+        """Return the stored blob for object_name, if any"""
+        return self.lookup_many(db, [object_name]).get(object_name)
+
+    def record(
+        self,
+        db: Session,
+        object_name: str,
+        sha256: str,
+        size_bytes: Optional[int],
+        content_type: Optional[str],
+        minio_version_id: Optional[str],
+        etag: Optional[str],
+    ):
+        """
+        Record a freshly uploaded blob in the caller's transaction.
+        Concurrent uploads of the same bytes race harmlessly: the first row wins.
+        """
+        db.execute(
+            insert(StoredBlob)
+            .values(
+                object_name=object_name,
+                sha256=sha256,
+                size_bytes=size_bytes,
+                content_type=content_type,
+                minio_version_id=minio_version_id,
+                etag=etag,
+            )
+            .on_conflict_do_nothing(index_elements=[StoredBlob.object_name])
+        )
+
+
+# Global instance
+dedup_index = DedupIndex()
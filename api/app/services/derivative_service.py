@@ -0,0 +1,134 @@
+"""
+Image derivative pyramid (e.g. 128/512/1024 px in WebP and JPEG).
+
+Derivatives are rendered once at ingestion, stored in MinIO under keys
+derived from the original's SHA-256 and recorded against the EvidenceFile,
+so clients can fetch the smallest rendition that fits instead of the original.
+"""
+import io
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from minio import Minio
+from sqlalchemy.orm import Session
+
+from ..models import EvidenceDerivative, EvidenceFile
+from .storage_service import UploadBatch, upload_scheduler
+from .thumbnail_service import DERIVATIVE_FORMATS, DERIVATIVE_SIZES, ENCODINGS, ThumbnailService, thumbnail_service
+
+logger = logging.getLogger(__name__)
+
+
+class DerivativeService:
+    def __init__(self, renderer: Optional[ThumbnailService] = None):
+        self._renderer = renderer or thumbnail_service
+
+    @staticmethod
+    def object_name(original_sha256: str, size: int, fmt: str) -> str:
+        return f"derivatives/{original_sha256}/{size}.{ENCODINGS[fmt][2]}"
+
+    def existing(self, db: Session, original_sha256s: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Complete pyramids already stored for these originals, keyed by original sha256.
+        Identical media share derivative keys, so a resubmission can skip rendering.
+        """
+        wanted = {
+            self.object_name(sha, size, fmt): sha
+            for sha in dict.fromkeys(original_sha256s) for size in DERIVATIVE_SIZES for fmt in DERIVATIVE_FORMATS
+        }
+        if not wanted:
+            return {}
+        rows = db.query(EvidenceDerivative).filter(EvidenceDerivative.object_name.in_(list(wanted))).all()
+        found: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for row in rows:
+            found.setdefault(wanted[row.object_name], {})[row.object_name] = {
+                "size": row.size,
+                "format": row.format,
+                "width": row.width,
+                "height": row.height,
+                "object_name": row.object_name,
+                "sha256": row.sha256,
+                "size_bytes": row.size_bytes,
+                "content_type": row.content_type,
+                "version_id": row.minio_version_id,
+                "deduplicated": True,
+            }
+        per_original = len(DERIVATIVE_SIZES) * len(DERIVATIVE_FORMATS)
+        return {sha: list(stored.values()) for sha, stored in found.items() if len(stored) == per_original}
+
+    async def store(
+        self,
+        minio_client: Minio,
+        bucket: str,
+        image_path: str,
+        original_sha256: str,
+        upload_id: str,
+        uploads: Optional[UploadBatch] = None,
+    ) -> List[Dict[str, Any]]:
+        """Render the pyramid on the process pool and put every level to MinIO"""
+        derivatives = await self._renderer.render_derivatives(image_path)
+        uploads = uploads or upload_scheduler.batch()
+        stored = []
+        for derivative in derivatives:
+            object_name = self.object_name(original_sha256, derivative.size, derivative.format)
+            result = await uploads.put_object(
+                minio_client,
+                bucket,
+                object_name,
+                io.BytesIO(derivative.data),
+                len(derivative.data),
+                content_type=derivative.content_type,
+                metadata={
+                    "original_sha256": original_sha256,
+                    "upload_id": upload_id,
+                    "derivative_size": str(derivative.size),
+                    "original_dimensions": f"{derivative.original_width}x{derivative.original_height}",
+                },
+            )
+            stored.append({
+                "size": derivative.size,
+                "format": derivative.format,
+                "width": derivative.width,
+                "height": derivative.height,
+                "object_name": object_name,
+                "sha256": derivative.sha256,
+                "size_bytes": len(derivative.data),
+                "content_type": derivative.content_type,
+                "version_id": result.version_id,
+                "original_dimensions": f"{derivative.original_width}x{derivative.original_height}",
+                "deduplicated": False,
+            })
+        return stored
+
+    @staticmethod
+    def record(evidence_file: EvidenceFile, stored: Iterable[Dict[str, Any]]):
+        """Attach stored derivatives to an evidence file in the caller's transaction"""
+        for derivative in stored:
+            evidence_file.derivatives.append(EvidenceDerivative(
+                size=derivative["size"],
+                format=derivative["format"],
+                width=derivative["width"],
+                height=derivative["height"],
+                object_name=derivative["object_name"],
+                sha256=derivative["sha256"],
+                size_bytes=derivative["size_bytes"],
+                content_type=derivative["content_type"],
+                minio_version_id=derivative["version_id"],
+            ))
+
+    @staticmethod
+    def closest(derivatives: Iterable[EvidenceDerivative], width: int, fmt: Optional[str] = None) -> Optional[EvidenceDerivative]:
+        """Smallest derivative at least `width` px wide (else the largest), preferring format fmt"""
+        candidates = list(derivatives)
+        if fmt and any(d.format == fmt for d in candidates):
+            candidates = [d for d in candidates if d.format == fmt]
+        if not candidates:
+            return None
+        wide_enough = [d for d in candidates if d.width >= width]
+        if wide_enough:
+            return min(wide_enough, key=lambda d: (d.width, d.size_bytes))
+        return max(candidates, key=lambda d: (d.width, -d.size_bytes))
+
+
+# Global instance
+derivative_service = DerivativeService()
@@ -0,0 +1,201 @@
+"""
+Byte-range download proxy with a batched access log.
+
+Objects are streamed from MinIO through the API, so downloads work behind any
+public hostname and every access is recorded. A Range request becomes a ranged
+GET against MinIO, which lets a video player seek through large evidence
+without downloading it; chunks are forwarded as MinIO returns them, so memory
+per download is one chunk. Access records are buffered and written to the
+append-only ``evidence_access_log`` table in batches, off the request path.
+"""
+import asyncio
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from ..models import EvidenceAccessLog
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_CHUNK_SIZE = int(os.getenv("DOWNLOAD_CHUNK_SIZE", str(256 * 1024)))
+ACCESS_LOG_BATCH_SIZE = int(os.getenv("ACCESS_LOG_BATCH_SIZE", "200"))
+ACCESS_LOG_FLUSH_INTERVAL = float(os.getenv("ACCESS_LOG_FLUSH_INTERVAL", "2.0"))
+# Records kept while the database is unreachable; the oldest are dropped beyond this
+ACCESS_LOG_MAX_PENDING = int(os.getenv("ACCESS_LOG_MAX_PENDING", "50000"))
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (start, end) of a single "bytes=" range, clamped to the object.
+    None means serve the whole object (no header, other units, multiple ranges,
+    or a malformed spec, which RFC 9110 says to ignore).
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash:
+        return None
+    try:
+        if first == "":
+            suffix = int(last)
+            if suffix <= 0 or size == 0:
+                raise RangeNotSatisfiable()
+            return max(0, size - suffix), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def stream_object(response, on_finish: Callable[[int, bool], None],
+                  chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Forward a MinIO get_object response chunk by chunk. on_finish(bytes_sent, completed)
+    runs when the body ends or the client disconnects.
+    """
+    sent, completed = 0, False
+    try:
+        if response is not None:
+            for chunk in response.stream(chunk_size):
+                sent += len(chunk)
+                yield chunk
+        completed = True
+    finally:
+        if response is not None:
+            response.close()
+            response.release_conn()
+        on_finish(sent, completed)
+
+
+class AccessLogWriter:
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None,
+                 batch_size: int = ACCESS_LOG_BATCH_SIZE, flush_interval: float = ACCESS_LOG_FLUSH_INTERVAL,
+                 max_pending: int = ACCESS_LOG_MAX_PENDING):
+        self._session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.written = 0
+        self.dropped = 0
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _new_session(self) -> Session:
+        if self._session_factory is None:
+            from ..database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def _keep(self, records: List[Dict[str, Any]]):
+        """Queue records, dropping the oldest past max_pending (caller holds the lock)"""
+        self._pending.extend(records)
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            self.dropped += overflow
+            logger.error(f"Access log backlog full; dropped {overflow} oldest records")
+
+    def record(self, **fields):
+        """Queue one access record; safe to call from any thread"""
+        with self._lock:
+            self._keep([fields])
+            full = len(self._pending) >= self.batch_size
+        if full and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def flush(self) -> int:
+        """Write queued records in one INSERT; on failure they stay queued for the next flush"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            db = self._new_session()
+            try:
+                db.execute(insert(EvidenceAccessLog), batch)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Could not write {len(batch)} access log records: {e}")
+                with self._lock:
+                    pending, self._pending = self._pending, []
+                    self._keep(batch + pending)
+                return 0
+            finally:
+                db.close()
+            self.written += len(batch)
+            return len(batch)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await asyncio.to_thread(self.flush)
+
+    def start(self):
+        """Start the periodic flush on the running event loop"""
+        if self._task:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the periodic flush and write whatever is still queued"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            self._loop = None
+        await asyncio.to_thread(self.flush)
+
+    def stats(self) -> Dict[str, int]:
+        return {"pending": len(self._pending), "written": self.written, "dropped": self.dropped}
+
+
+def access_record(object_name: str, stat, byte_range: Optional[Tuple[int, int]], status_code: int,
+                  client_ip: Optional[str], user_agent: Optional[str], requested_at: datetime,
+                  bytes_sent: int = 0, completed: bool = False) -> Dict[str, Any]:
+    """Row for evidence_access_log"""
+    return {
+        "object_name": object_name,
+        "minio_version_id": getattr(stat, "version_id", None),
+        "etag": getattr(stat, "etag", None),
+        "range_start": byte_range[0] if byte_range else None,
+        "range_end": byte_range[1] if byte_range else None,
+        "bytes_sent": bytes_sent,
+        "status_code": status_code,
+        "completed": completed,
+        "client_ip": client_ip,
+        "user_agent": user_agent,
+        "requested_at": requested_at,
+        "finished_at": datetime.utcnow(),
+    }
+
+
+# Global instance
+access_log = AccessLogWriter()
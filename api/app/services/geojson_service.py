@@ -0,0 +1,65 @@
+"""
+Incremental GeoJSON FeatureCollection encoding.
+
+Rows are pulled from a server-side cursor and encoded one feature at a time
+into a small buffer that is flushed as it fills, so peak memory depends on the
+batch size rather than on the number of features returned.
+"""
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+try:
+    import orjson
+
+    def dumps(value: Any) -> bytes:
+        return orjson.dumps(value, default=str)
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":"), default=str).encode()
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip from the server-side cursor
+STREAM_BATCH_ROWS = int(os.getenv("GEOJSON_STREAM_BATCH_ROWS", "500"))
+# Encoded bytes buffered before a chunk is handed to the response
+STREAM_FLUSH_BYTES = 64 * 1024
+
+FeatureBuilder = Callable[[Any], Dict[str, Any]]
+# (last row written or None, whether more rows exist past the limit, features written) -> metadata
+MetadataBuilder = Callable[[Optional[Any], bool, int], Dict[str, Any]]
+
+
+def stream_feature_collection(
+    rows: Iterable[Any], feature: FeatureBuilder, metadata: MetadataBuilder, limit: Optional[int] = None
+) -> Iterator[bytes]:
+    """
+    Yield a FeatureCollection as JSON chunks. One row past `limit` may be read to
+    learn whether another page exists; it is not written. "metadata" follows
+    "features" so it can describe the rows actually streamed.
+    """
+    buffer = bytearray(b'{"type":"FeatureCollection","features":[')
+    written, last, has_more = 0, None, False
+    try:
+        for row in rows:
+            if limit is not None and written >= limit:
+                has_more = True
+                break
+            if written:
+                buffer += b","
+            buffer += dumps(feature(row))
+            written += 1
+            last = row
+            if len(buffer) >= STREAM_FLUSH_BYTES:
+                yield bytes(buffer)
+                buffer.clear()
+    finally:
+        # Release the server-side cursor even if the client went away mid-stream
+        close = getattr(rows, "close", None)
+        if close:
+            close()
+    buffer += b'],"metadata":' + dumps(metadata(last, has_more, written)) + b"}"
+    yield bytes(buffer)
@@ -0,0 +1,120 @@
+"""
+SHA-256 hashing off the event loop.
+
+hashlib releases the GIL while digesting large buffers, so a small thread
+pool hashes several bundle members in parallel without stalling requests.
+"""
+import asyncio
+import hashlib
+import logging
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, Iterable, Optional, Tuple
+
+from .zip_stream_service import hash_stream
+
+logger = logging.getLogger(__name__)
+
+# Buffer used for regular reads; large enough to amortise syscalls and GIL hand-offs
+HASH_BUFFER_SIZE = 1024 * 1024
+# Files at least this big are hashed through a read-only memory map
+MMAP_THRESHOLD = int(os.getenv("HASH_MMAP_THRESHOLD", str(64 * 1024 * 1024)))
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(min(8, (os.cpu_count() or 1) + 2))))
+
+
+def sha256_file_sync(file_path: str) -> str:
+    """Hash a file on the calling thread"""
+    sha256_hash = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                sha256_hash.update(mapped)
+        else:
+            buffer = bytearray(HASH_BUFFER_SIZE)
+            view = memoryview(buffer)
+            while True:
+                read = f.readinto(buffer)
+                if not read:
+                    break
+                sha256_hash.update(view[:read])
+    return sha256_hash.hexdigest()
+
+
+class HashingService:
+    def __init__(self, max_workers: int = HASH_WORKERS):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get or create the hashing thread pool"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sha256")
+        return self._executor
+
+    async def sha256_file(self, file_path: str) -> str:
+        """Hash a file on the hashing pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), sha256_file_sync, file_path)
+
+    async def sha256_files(self, file_paths: Iterable[str]) -> Dict[str, str]:
+        """Hash several files concurrently. Returns {path: sha256}."""
+        paths = list(dict.fromkeys(file_paths))
+        digests = await asyncio.gather(*(self.sha256_file(path) for path in paths))
+        return dict(zip(paths, digests))
+
+    async def sha256_stream(self, stream: BinaryIO) -> Tuple[str, int]:
+        """Hash a seekable stream on the hashing pool. Returns (sha256, size)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), hash_stream, stream)
+
+    def close(self):
+        """Shut down the hashing pool"""
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+class DigestCache:
+    """
+    Per-upload SHA-256 memo shared by every ingestion stage.
+
+    Entries are keyed by (path, size, mtime) so a file rewritten in place is
+    hashed again rather than served a stale digest.
+    """
+
+    def __init__(self, service: Optional[HashingService] = None):
+        self._service = service or hashing_service
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(file_path: str) -> Tuple[str, int, int]:
+        stat = os.stat(file_path)
+        return os.path.realpath(file_path), stat.st_size, stat.st_mtime_ns
+
+    def seed(self, digests: Dict[str, str]):
+        """Record digests computed elsewhere, e.g. while extracting a bundle"""
+        for file_path, digest in digests.items():
+            self._digests[self._key(file_path)] = digest
+
+    async def sha256(self, file_path: str) -> str:
+        """Return the cached digest for a file, hashing it on first use"""
+        return (await self.sha256_many([file_path]))[file_path]
+
+    async def sha256_many(self, file_paths: Iterable[str]) -> Dict[str, str]:
+        """Return digests for several files, hashing only the ones not seen yet"""
+        keys = {path: self._key(path) for path in dict.fromkeys(file_paths)}
+        missing = [path for path, key in keys.items() if key not in self._digests]
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            for path, digest in (await self._service.sha256_files(missing)).items():
+                self._digests[keys[path]] = digest
+        return {path: self._digests[key] for path, key in keys.items()}
+
+
+# Global instance
+hashing_service = HashingService()
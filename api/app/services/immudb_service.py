@@ -1,10 +1,39 @@
+"""
+immudb ledger client.
+
+Ledger entries are group-committed: callers queue (key, value) pairs and get a
+future, and a dedicated writer thread flushes the queue as one transaction per
+batch once it holds LEDGER_BATCH_SIZE entries or the oldest has waited
+LEDGER_MAX_DELAY. A burst of uploads costs a few ledger round trips instead of
+one each, and the blocking gRPC calls never run on the event loop. The single
+client is only used under a lock.
+
+Writes and reads are verified against a trusted state (the last verified
+transaction and its accumulated hash) that is persisted to IMMUDB_STATE_FILE.
+Each verification proves consistency from that state to the transaction at
+hand and then advances it, so the work covers the transactions written since
+the last check rather than the whole ledger, across restarts too.
+"""
+import asyncio
 import json
 import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 from uuid import UUID
 
+import immudb.database as immudb_database
+import immudb.schema as immudb_schema
+from google.protobuf import empty_pb2
 from immudb import ImmudbClient
+from immudb.embedded import store as immudb_store
+from immudb.exceptions import ErrCorruptedData
+from immudb.grpc import schema_pb2
+from immudb.rootService import RootService, State
 try:
     from immudb.exceptions import ImmudbError
 except ImportError:
@@ -15,21 +44,335 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+LEDGER_BATCH_SIZE = int(os.getenv("LEDGER_BATCH_SIZE", "256"))
+# Group-commit window: how long the first queued entry waits for others to join its batch
+LEDGER_MAX_DELAY = float(os.getenv("LEDGER_MAX_DELAY", "0.02"))
+IMMUDB_STATE_FILE = os.getenv("IMMUDB_STATE_FILE", os.path.join(os.path.expanduser("~"), ".evidence-immudb-state.json"))
+# PEM key the server signs its state with (immudb --signingKey); signatures are checked when set
+IMMUDB_PUBLIC_KEY_FILE = os.getenv("IMMUDB_PUBLIC_KEY_FILE") or None
+
+
+class TrustedState(RootService):
+    """
+    Last verified ledger state, persisted as JSON so verification after a restart
+    resumes from it. States of several ledgers share the file, one per
+    server and database; the client selects the database through init.
+    """
+
+    def __init__(self, path: str, server: str):
+        super().__init__()
+        self.path = path
+        self.server = server
+        self.name: Optional[str] = None
+        self._state: Optional[State] = None
+
+    def _load(self) -> Optional[State]:
+        try:
+            with open(self.path) as f:
+                saved = json.load(f).get(self.name)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.error(f"Unreadable immudb state file {self.path}: {e}")
+            return None
+        if not saved:
+            return None
+        return State(
+            db=saved["db"],
+            txId=saved["tx_id"],
+            txHash=bytes.fromhex(saved["tx_hash"]),
+            publicKey=bytes.fromhex(saved["public_key"]),
+            signature=bytes.fromhex(saved["signature"]),
+        )
+
+    def _save(self, state: State):
+        states = {}
+        try:
+            with open(self.path) as f:
+                states = json.load(f)
+        except (OSError, ValueError):
+            pass
+        states[self.name] = {
+            "db": state.db,
+            "tx_id": state.txId,
+            "tx_hash": bytes(state.txHash).hex(),
+            "public_key": bytes(state.publicKey).hex(),
+            "signature": bytes(state.signature).hex(),
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(states, f)
+        os.replace(tmp_path, self.path)
+
+    def init(self, dbname, service):
+        """Called by the client on login ("host:port/db") and database switch (b"db")"""
+        if isinstance(dbname, bytes):
+            dbname = dbname.decode()
+        self.name = f"{self.server}/{dbname.rsplit('/', 1)[-1]}"
+        # Never carry a state over from the previously selected database
+        self._state = self._load()
+        if self._state is None:
+            # Nothing verified yet: the server's current state is trusted on first use
+            self.set(State.FromGrpc(service.CurrentState(empty_pb2.Empty())))
+            logger.warning(f"No trusted immudb state for {self.name}; trusting tx {self._state.txId}")
+
+    def get(self) -> Optional[State]:
+        return self._state
+
+    def set(self, state: State):
+        self._state = state
+        try:
+            self._save(state)
+        except OSError as e:
+            logger.error(f"Could not persist immudb state to {self.path}: {e}")
+
+
+# The verified helpers below reuse the client's trusted state (_rs), gRPC stub (_stub)
+# and server signing key (_vk); immudb-py is pinned to the exact version they match.
+
+
+def _advance_state(client: ImmudbClient, state: State, verifiable_tx, tx_id: int, tx_alh: bytes):
+    """
+    Check the dual proof between the trusted state and transaction tx_id, then
+    move the trusted state forward to it (it never moves back)
+    """
+    trusted_alh = immudb_schema.DigestFromProto(state.txHash)
+    if state.txId <= tx_id:
+        source_id, source_alh, target_id, target_alh = state.txId, trusted_alh, tx_id, tx_alh
+    else:
+        source_id, source_alh, target_id, target_alh = tx_id, tx_alh, state.txId, trusted_alh
+    dual_proof = immudb_schema.DualProofFromProto(verifiable_tx.dualProof)
+    if state.txId > 0 and not immudb_store.VerifyDualProof(dual_proof, source_id, target_id, source_alh, target_alh):
+        raise ErrCorruptedData
+    if target_id == state.txId:
+        return
+    new_state = State(
+        db=state.db,
+        txId=target_id,
+        txHash=target_alh,
+        publicKey=verifiable_tx.signature.publicKey,
+        signature=verifiable_tx.signature.signature,
+    )
+    if client._vk is not None:
+        new_state.Verify(client._vk)
+    client._rs.set(new_state)
+
+
+def verified_set_all(client: ImmudbClient, kv: Dict[bytes, bytes]) -> int:
+    """
+    Write kv as one transaction and verify it the way ImmudbClient.verifiedSet
+    does for a single key: each entry is proven included in the transaction and
+    the transaction consistent with the trusted state. Returns the transaction id.
+    """
+    state = client._rs.get()
+    request = schema_pb2.VerifiableSetRequest(
+        setRequest=schema_pb2.SetRequest(KVs=[schema_pb2.KeyValue(key=key, value=value) for key, value in kv.items()]),
+        proveSinceTx=state.txId,
+    )
+    verifiable_tx = client._stub.VerifiableSet(request)
+    if verifiable_tx.tx.header.nentries != len(kv) or len(verifiable_tx.tx.entries) != len(kv):
+        raise ErrCorruptedData
+    tx = immudb_schema.TxFromProto(verifiable_tx.tx)
+    if tx.header.eh != immudb_schema.DigestFromProto(verifiable_tx.dualProof.targetTxHeader.eH):
+        raise ErrCorruptedData
+    entry_digest = immudb_store.EntrySpecDigestFor(tx.header.version)
+    positions = {entry.key(): i for i, entry in enumerate(tx.entries)}
+    for key, value in kv.items():
+        position = positions.get(immudb_database.EncodeKey(key))
+        if position is None:
+            raise ErrCorruptedData
+        metadata = tx.entries[position].metadata()
+        if metadata is not None and metadata.Deleted():
+            raise ErrCorruptedData
+        entry = immudb_database.EncodeEntrySpec(key, metadata, value)
+        if not immudb_store.VerifyInclusion(tx.htree.InclusionProof(position), entry_digest(entry), tx.header.eh):
+            raise ErrCorruptedData
+    _advance_state(client, state, verifiable_tx, tx.header.iD, tx.header.Alh())
+    return tx.header.iD
+
+
+def verified_proof(client: ImmudbClient, key: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Current value of key with its inclusion proof, verified against the trusted
+    state like ImmudbClient.verifiedGet; None if the key was never written
+    """
+    state = client._rs.get()
+    request = schema_pb2.VerifiableGetRequest(keyRequest=schema_pb2.KeyRequest(key=key), proveSinceTx=state.txId)
+    try:
+        verifiable_entry = client._stub.VerifiableGet(request)
+    except Exception as e:
+        if hasattr(e, "details") and str(e.details()).endswith("key not found"):
+            return None
+        raise
+    entry = verifiable_entry.entry
+    verifiable_tx = verifiable_entry.verifiableTx
+    if entry.HasField("referencedBy"):
+        raise ErrCorruptedData  # evidence keys are never references
+    tx_id = entry.tx
+    dual_proof = verifiable_tx.dualProof
+    header = immudb_schema.TxHeaderFromProto(
+        dual_proof.targetTxHeader if state.txId <= tx_id else dual_proof.sourceTxHeader
+    )
+    inclusion_proof = immudb_schema.InclusionProofFromProto(verifiable_entry.inclusionProof)
+    spec = immudb_database.EncodeEntrySpec(key, immudb_schema.KVMetadataFromProto(entry.metadata), entry.value)
+    entry_digest = immudb_store.EntrySpecDigestFor(int(verifiable_tx.tx.header.version))
+    if header.iD != tx_id or not immudb_store.VerifyInclusion(inclusion_proof, entry_digest(spec), header.eh):
+        raise ErrCorruptedData
+    _advance_state(client, state, verifiable_tx, tx_id, header.Alh())
+    trusted = client._rs.get()
+    return {
+        "key": key.decode(),
+        "value": entry.value.decode(),
+        "tx_id": tx_id,
+        "revision": entry.revision,
+        "tx_timestamp": datetime.utcfromtimestamp(header.ts).isoformat(),
+        "entries_hash": header.eh.hex(),
+        "tx_hash": header.Alh().hex(),
+        "inclusion_proof": {
+            "leaf": inclusion_proof.leaf,
+            "width": inclusion_proof.width,
+            "terms": [bytes(term).hex() for term in inclusion_proof.terms],
+        },
+        "trusted_state": {
+            "db": trusted.db,
+            "tx_id": trusted.txId,
+            "tx_hash": bytes(trusted.txHash).hex(),
+            "signature": bytes(trusted.signature).hex() or None,
+        },
+        "verified": True,
+    }
+
+
+class LedgerWriter:
+    """Queue of ledger entries written in batches by one dedicated thread"""
+
+    def __init__(
+        self,
+        commit: Callable[[Dict[bytes, bytes]], Any],
+        on_error: Optional[Callable[[], None]] = None,
+        batch_size: int = LEDGER_BATCH_SIZE,
+        max_delay: float = LEDGER_MAX_DELAY,
+    ):
+        self._commit = commit
+        self._on_error = on_error
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.batches = 0
+        self.entries = 0
+        self._pending: Deque[Tuple[bytes, bytes, Future]] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def submit(self, key: bytes, value: bytes) -> Future:
+        """Queue one entry; the future resolves to the id of the transaction that wrote it"""
+        future: Future = Future()
+        with self._cond:
+            if self._stopping:
+                raise RuntimeError("Ledger writer is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="immudb-ledger", daemon=True)
+                self._thread.start()
+            self._pending.append((key, value, future))
+            self._cond.notify()
+        return future
+
+    def _take_batch(self) -> List[Tuple[bytes, bytes, Future]]:
+        """Wait for a full batch or the group-commit window; [] once closed and drained"""
+        with self._cond:
+            while not self._pending and not self._stopping:
+                self._cond.wait()
+            deadline = time.monotonic() + self.max_delay
+            while len(self._pending) < self.batch_size and not self._stopping:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            # A key can only be set once per transaction; a repeat waits for the next batch
+            batch, keys = [], set()
+            while self._pending and len(batch) < self.batch_size and self._pending[0][0] not in keys:
+                entry = self._pending.popleft()
+                keys.add(entry[0])
+                batch.append(entry)
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            self._write(batch)
+
+    def _write(self, batch: List[Tuple[bytes, bytes, Future]]):
+        try:
+            tx_id = str(self._commit({key: value for key, value, _ in batch}))
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} ledger entries to immudb: {e}")
+            if self._on_error:
+                self._on_error()
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.entries += len(batch)
+        logger.info(f"Written {len(batch)} ledger entries to immudb in tx {tx_id}")
+        for _, _, future in batch:
+            future.set_result(tx_id)
+
+    def close(self, timeout: float = 10.0):
+        """Write what is queued, then stop the writer thread"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        return {"pending": len(self._pending), "batches": self.batches, "entries": self.entries}
+
 
 class ImmudbService:
-    def __init__(self, host: str = "immudb", port: int = 3322, database: str = "defaultdb"):
+    def __init__(
+        self,
+        host: str = "immudb",
+        port: int = 3322,
+        database: str = "defaultdb",
+        state_file: str = IMMUDB_STATE_FILE,
+        public_key_file: Optional[str] = IMMUDB_PUBLIC_KEY_FILE,
+    ):
         self.host = host
         self.port = port
         self.database = database
+        self.public_key_file = public_key_file
+        self.trusted_state = TrustedState(state_file, f"{host}:{port}")
         self._client: Optional[ImmudbClient] = None
+        # ImmudbClient is not thread-safe; every call holds this lock
+        self._lock = threading.Lock()
+        self.ledger = LedgerWriter(self._commit, on_error=self._reset_client)
+
+    def _reset_client(self):
+        """Drop the connection after a failure so the next call reconnects"""
+        with self._lock:
+            self._client = None
+
+    def _call(self, operation: Callable[..., Any], *args) -> Any:
+        """Run operation(client, *args) under the lock (blocking; keep off the event loop)"""
+        with self._lock:
+            return operation(self._get_client(), *args)
+
+    def _commit(self, kv: Dict[bytes, bytes]) -> int:
+        return self._call(verified_set_all, kv)
 
     def _get_client(self) -> ImmudbClient:
-        """Get or create immudb client connection"""
+        """Get or create immudb client connection (call with the lock held)"""
         if self._client is None:
             try:
-                self._client = ImmudbClient(f"{self.host}:{self.port}")
-                self._client.login("immudb", "immudb")  # default credentials
-                self._client.useDatabase(self.database.encode())
+                self._client = ImmudbClient(
+                    f"{self.host}:{self.port}", rs=self.trusted_state, publicKeyFile=self.public_key_file
+                )
+                # default credentials; login also selects the database and initialises its trusted state
+                self._client.login("immudb", "immudb", database=self.database)
                 logger.info(f"Connected to immudb at {self.host}:{self.port}")
             except ImmudbError as e:
                 logger.error(f"Failed to connect to immudb: {e}")
@@ -46,11 +389,9 @@ class ImmudbService:
     ) -> str:
         """
         Write evidence transaction to immudb ledger
-        Returns the transaction ID
+        Returns the transaction ID (shared by the entries group-committed with it)
         """
         try:
-            client = self._get_client()
-            
             # Prepare transaction data
             tx_data = {
                 "object_id": str(object_id),
@@ -67,9 +408,8 @@ class ImmudbService:
             key = f"evidence:{object_id}"
             value = json.dumps(tx_data)
             
-            # Write to immudb
-            result = client.set(key.encode(), value.encode())
-            tx_id = str(result.id)
+            # Queue for the next batch and wait for its transaction
+            tx_id = await asyncio.wrap_future(self.ledger.submit(key.encode(), value.encode()))
             
             logger.info(f"Written evidence transaction to immudb: {tx_id}")
             return tx_id
@@ -81,27 +421,48 @@ class ImmudbService:
             logger.error(f"Unexpected error writing to immudb: {e}")
             raise
 
+    async def proof(self, key: str) -> Optional[Dict[str, Any]]:
+        """Verified value of key with its inclusion proof; None if it is not in the ledger"""
+        try:
+            return await asyncio.to_thread(self._call, verified_proof, key.encode())
+        except ErrCorruptedData:
+            logger.critical(f"immudb proof for {key} does not verify against the trusted state")
+            raise
+
+    async def evidence_proof(self, object_id: UUID) -> Optional[Dict[str, Any]]:
+        """Ledger entry of an evidence object with its proof"""
+        return await self.proof(f"evidence:{object_id}")
+
     async def verify_transaction(self, key: str) -> Optional[Dict[str, Any]]:
         """Verify a transaction exists and return its data"""
         try:
-            client = self._get_client()
-            result = client.get(key.encode())
+            result = await self.proof(key)
             if result:
-                return json.loads(result.value.decode())
+                return json.loads(result["value"])
             return None
         except ImmudbError as e:
             logger.error(f"Failed to verify transaction: {e}")
             return None
 
+    async def health_check(self) -> Dict[str, Any]:
+        """Raises if immudb is unreachable or unhealthy"""
+        healthy = await asyncio.to_thread(self._call, lambda client: client.healthCheck())
+        if not healthy:
+            raise ImmudbError("immudb reports unhealthy")
+        state = self.trusted_state.get()
+        return {"trusted_tx_id": state.txId if state else None}
+
     def close(self):
-        """Close the immudb connection"""
-        if self._client:
-            try:
-                self._client.logout()
-                self._client = None
-            except Exception as e:
-                logger.error(f"Error closing immudb connection: {e}")
+        """Flush queued ledger entries and close the immudb connection"""
+        self.ledger.close()
+        with self._lock:
+            if self._client:
+                try:
+                    self._client.logout()
+                    self._client = None
+                except Exception as e:
+                    logger.error(f"Error closing immudb connection: {e}")
 
 
 # Global instance
-immudb_service = ImmudbService()
+immudb_service = ImmudbService(os.getenv("IMMUDB_HOST", "immudb"), int(os.getenv("IMMUDB_PORT", "3322")))
@@ -0,0 +1,313 @@
+"""
+Background ingestion queue backed by Postgres.
+
+Upload endpoints spool the request body to disk, enqueue an ``ingestion_jobs``
+row and return immediately. Worker tasks claim jobs with
+``SELECT ... FOR UPDATE SKIP LOCKED``, so several API processes can share the
+queue without extra services, and run the registered pipeline for the job type.
+
+The spool file is local, so a job is only claimed on the node that spooled it.
+Processes sharing a spool directory (e.g. a common volume) can share work by
+using the same INGEST_NODE. While a job runs, a heartbeat keeps its row fresh
+so long stages are not mistaken for orphaned jobs.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import socket
+import tempfile
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from ..models import IngestionJob
+
+logger = logging.getLogger(__name__)
+
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+INGEST_POLL_INTERVAL = float(os.getenv("INGEST_POLL_INTERVAL", "2.0"))
+INGEST_MAX_ATTEMPTS = int(os.getenv("INGEST_MAX_ATTEMPTS", "3"))
+# A running job whose heartbeat is older than this is assumed orphaned and re-claimed
+INGEST_STALE_AFTER = timedelta(minutes=int(os.getenv("INGEST_STALE_MINUTES", "15")))
+INGEST_HEARTBEAT_INTERVAL = float(os.getenv("INGEST_HEARTBEAT_SECONDS", "30"))
+INGEST_SPOOL_DIR = os.getenv("INGEST_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "evidence-jobs"))
+# Jobs are claimed only by processes of the node whose spool directory holds their file
+INGEST_NODE = os.getenv("INGEST_NODE", socket.gethostname())
+SPOOL_CHUNK_SIZE = 1024 * 1024
+
+ProgressCallback = Callable[[str, int], None]
+JobHandler = Callable[[IngestionJob, Session, ProgressCallback], Awaitable[Dict[str, Any]]]
+
+
+class PermanentJobError(Exception):
+    """Raised by a job handler when retrying cannot help (e.g. invalid bundle)"""
+    pass
+
+
+class IngestionQueue:
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None, workers: int = INGEST_WORKERS,
+                 spool_dir: str = INGEST_SPOOL_DIR, node: str = INGEST_NODE,
+                 heartbeat_interval: float = INGEST_HEARTBEAT_INTERVAL):
+        self._session_factory = session_factory
+        self.workers = workers
+        self.spool_dir = spool_dir
+        self.node = node
+        self.heartbeat_interval = heartbeat_interval
+        self._handlers: Dict[str, JobHandler] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    def _new_session(self) -> Session:
+        if self._session_factory is None:
+            from ..database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def register(self, job_type: str, handler: JobHandler):
+        """Register the pipeline that runs jobs of job_type"""
+        self._handlers[job_type] = handler
+
+    def spool(self, stream: BinaryIO) -> Tuple[str, str, int]:
+        """Copy an upload stream into the spool directory, hashing it on the way. Returns (path, sha256, size)."""
+        os.makedirs(self.spool_dir, exist_ok=True)
+        spool_path = os.path.join(self.spool_dir, f"{uuid4()}.upload")
+        sha256_hash = hashlib.sha256()
+        size = 0
+        stream.seek(0)
+        with open(spool_path, "wb") as spool:
+            for chunk in iter(lambda: stream.read(SPOOL_CHUNK_SIZE), b""):
+                sha256_hash.update(chunk)
+                spool.write(chunk)
+                size += len(chunk)
+        return spool_path, sha256_hash.hexdigest(), size
+
+    def enqueue(
+        self,
+        db: Session,
+        job_type: str,
+        spool_path: str,
+        filename: str,
+        content_type: Optional[str] = None,
+        sha256: Optional[str] = None,
+        size_bytes: Optional[int] = None,
+    ) -> IngestionJob:
+        """Queue a spooled upload and wake a local worker"""
+        if job_type not in self._handlers:
+            raise ValueError(f"No ingestion handler registered for job type '{job_type}'")
+        job = IngestionJob(
+            job_type=job_type,
+            status="queued",
+            stage="queued",
+            progress=0,
+            spool_path=spool_path,
+            spool_node=self.node,
+            filename=filename,
+            content_type=content_type,
+            sha256=sha256,
+            size_bytes=size_bytes,
+            attempts=0,
+        )
+        db.add(job)
+        db.commit()
+        if self._wakeup:
+            self._wakeup.set()
+        return job
+
+    def get(self, db: Session, job_id: UUID) -> Optional[IngestionJob]:
+        return db.query(IngestionJob).filter(IngestionJob.id == job_id).one_or_none()
+
+    def claim(self, db: Session) -> Optional[IngestionJob]:
+        """
+        Claim the oldest runnable job spooled on this node, skipping rows other
+        workers hold locked (rows from before spool_node existed are anyone's)
+        """
+        now = datetime.utcnow()
+        while True:
+            job = (
+                db.query(IngestionJob)
+                .filter(or_(
+                    IngestionJob.status == "queued",
+                    and_(IngestionJob.status == "running", IngestionJob.updated_at < now - INGEST_STALE_AFTER),
+                ))
+                .filter(or_(IngestionJob.spool_node == self.node, IngestionJob.spool_node.is_(None)))
+                .order_by(IngestionJob.created_at)
+                .with_for_update(skip_locked=True)
+                .first()
+            )
+            if job is None:
+                db.rollback()
+                return None
+            if job.attempts >= INGEST_MAX_ATTEMPTS:
+                # Orphaned too many times; give up rather than loop forever
+                job.status = "failed"
+                job.error = job.error or f"Abandoned after {job.attempts} attempts"
+                job.finished_at = now
+                db.commit()
+                self._remove_spool(job.spool_path)
+                continue
+            job.status = "running"
+            job.stage = "claimed"
+            job.attempts += 1
+            job.started_at = now
+            db.commit()
+            return job
+
+    def _update(self, job_id: UUID, **fields):
+        """Write job bookkeeping in its own short transaction"""
+        db = self._new_session()
+        try:
+            db.query(IngestionJob).filter(IngestionJob.id == job_id).update(
+                {**fields, "updated_at": datetime.utcnow()}, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def report(self, job_id: UUID, stage: str, progress: int):
+        """Record pipeline progress (refreshes the heartbeat too)"""
+        self._update(job_id, stage=stage, progress=max(0, min(100, progress)))
+
+    async def _report_after(self, previous: Optional[asyncio.Task], job_id: UUID, stage: str, progress: int):
+        """Write one progress update off the event loop, after the one reported before it"""
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        try:
+            await asyncio.to_thread(self.report, job_id, stage, progress)
+        except Exception as e:
+            logger.warning(f"Progress update for ingestion job {job_id} failed: {e}")
+
+    async def _heartbeat(self, job_id: UUID):
+        """Refresh updated_at while a job runs, however long a single stage takes"""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await asyncio.to_thread(self._update, job_id)
+            except Exception as e:
+                logger.warning(f"Heartbeat for ingestion job {job_id} failed: {e}")
+
+    async def process(self, job_id: UUID):
+        """Run one claimed job through its handler and record the outcome"""
+        db = self._new_session()
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        reports: List[asyncio.Task] = []
+
+        def progress(stage: str, percent: int):
+            # Handlers report synchronously; the writes run on threads, in order
+            previous = reports[-1] if reports else None
+            reports.append(asyncio.create_task(self._report_after(previous, job_id, stage, percent)))
+
+        try:
+            job = self.get(db, job_id)
+            if job is None:
+                return
+            spool_path, attempts = job.spool_path, job.attempts
+            try:
+                handler = self._handlers.get(job.job_type)
+                if handler is None:
+                    raise PermanentJobError(f"No ingestion handler registered for job type '{job.job_type}'")
+                if not os.path.exists(spool_path):
+                    raise PermanentJobError("Spooled upload is missing on this node")
+                try:
+                    result = await handler(job, db, progress)
+                finally:
+                    # Pending progress writes land before the outcome so they cannot overwrite it
+                    await asyncio.gather(*reports, return_exceptions=True)
+            except PermanentJobError as e:
+                db.rollback()
+                await asyncio.to_thread(self._finish, job_id, spool_path, status="failed", error=str(e))
+            except Exception as e:
+                db.rollback()
+                logger.exception(f"Ingestion job {job_id} failed")
+                if attempts >= INGEST_MAX_ATTEMPTS:
+                    await asyncio.to_thread(self._finish, job_id, spool_path, status="failed", error=str(e))
+                else:
+                    await asyncio.to_thread(self._update, job_id, status="queued", stage="retrying", error=str(e))
+            else:
+                result = json.loads(json.dumps(result, default=str))
+                await asyncio.to_thread(self._finish, job_id, spool_path, status="completed", result=result)
+        finally:
+            heartbeat.cancel()
+            db.close()
+
+    def _finish(self, job_id: UUID, spool_path: str, status: str, **fields):
+        if status == "completed":
+            fields["progress"] = 100
+        self._update(job_id, status=status, stage=status, finished_at=datetime.utcnow(), **fields)
+        self._remove_spool(spool_path)
+
+    @staticmethod
+    def _remove_spool(spool_path: str):
+        try:
+            os.unlink(spool_path)
+        except FileNotFoundError:
+            pass
+
+    def _claim_next(self) -> Optional[UUID]:
+        db = self._new_session()
+        try:
+            job = self.claim(db)
+            return job.id if job else None
+        finally:
+            db.close()
+
+    async def _worker(self, index: int):
+        logger.info(f"Ingestion worker {index} started")
+        while not self._stopping:
+            try:
+                job_id = await asyncio.to_thread(self._claim_next)
+            except Exception as e:
+                logger.error(f"Ingestion worker {index} could not claim a job: {e}")
+                job_id = None
+            if job_id is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), INGEST_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+            await self.process(job_id)
+
+    def start(self):
+        """Start the worker tasks on the running event loop"""
+        if self._tasks or self.workers <= 0:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self):
+        """Stop the worker tasks; a job cut short is re-claimed once its heartbeat goes stale"""
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+def job_status(job: IngestionJob) -> Dict[str, Any]:
+    """Public view of an ingestion job"""
+    return {
+        "id": str(job.id),
+        "job_type": job.job_type,
+        "status": job.status,
+        "stage": job.stage,
+        "progress": job.progress,
+        "filename": job.filename,
+        "sha256": job.sha256,
+        "attempts": job.attempts,
+        "error": job.error,
+        "result": job.result,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+# Global instance
+ingestion_queue = IngestionQueue()
@@ -0,0 +1,89 @@
+"""
+Keyset pagination helpers for list endpoints.
+
+Pages are addressed by an opaque cursor holding the sort key of the last row
+returned, so fetching page N costs the same as page 1 (an index range scan)
+instead of growing with OFFSET. Totals are opt-in: an exact count cached for a
+short TTL, or the planner's row estimate, which is constant-time.
+"""
+import base64
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Hashable, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.orm import Query, Session
+
+logger = logging.getLogger(__name__)
+
+COUNT_CACHE_TTL = float(os.getenv("ITEMS_COUNT_CACHE_TTL", "60"))
+COUNT_CACHE_SIZE = 256
+COUNT_MODES = ("none", "estimate", "exact")
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """Opaque, URL-safe cursor for the row after which the next page starts"""
+    payload = json.dumps({"c": created_at.isoformat(), "i": str(row_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(payload["c"]), UUID(payload["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {e}")
+
+
+class CountCache:
+    """Exact counts per filter, reused for a few seconds so paging does not recount"""
+
+    def __init__(self, ttl: float = COUNT_CACHE_TTL, max_entries: int = COUNT_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._counts: Dict[Hashable, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def count(self, key: Hashable, query: Query) -> int:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._counts.get(key)
+        if cached and now - cached[0] < self.ttl:
+            return cached[1]
+        total = query.order_by(None).count()
+        with self._lock:
+            if len(self._counts) >= self.max_entries:
+                self._counts.clear()
+            self._counts[key] = (now, total)
+        return total
+
+    def clear(self):
+        with self._lock:
+            self._counts.clear()
+
+
+def estimate_count(db: Session, query: Query) -> Optional[int]:
+    """Planner row estimate for a query (PostgreSQL EXPLAIN); None where unavailable"""
+    statement = query.order_by(None).statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+    try:
+        plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {statement}")).scalar()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Could not estimate row count: {e}")
+        return None
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+# Global instance
+count_cache = CountCache()
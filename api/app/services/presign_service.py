@@ -0,0 +1,77 @@
+"""
+Presigned GET URL cache.
+
+A presigned URL is an HMAC over the object key and its expiry, so one signed
+URL can be handed out again until shortly before it expires. Reusing it keeps
+repeated map and popup loads from re-signing, and lets browsers reuse their
+cached copy of the object since the URL does not change.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, NamedTuple, Tuple
+
+logger = logging.getLogger(__name__)
+
+PRESIGN_EXPIRY = timedelta(minutes=15)
+# A cached URL is re-signed once less than this much of its lifetime is left
+PRESIGN_REFRESH_MARGIN = timedelta(seconds=int(os.getenv("PRESIGN_REFRESH_MARGIN_SECONDS", "180")))
+PRESIGN_CACHE_SIZE = int(os.getenv("PRESIGN_CACHE_SIZE", "10000"))
+PRESIGN_BATCH_MAX = int(os.getenv("PRESIGN_BATCH_MAX", "500"))
+
+
+class PresignedUrl(NamedTuple):
+    url: str
+    expires_at: datetime  # UTC
+
+
+class PresignCache:
+    def __init__(self, expiry: timedelta = PRESIGN_EXPIRY, refresh_margin: timedelta = PRESIGN_REFRESH_MARGIN,
+                 max_entries: int = PRESIGN_CACHE_SIZE):
+        self.expiry = expiry
+        self.refresh_margin = refresh_margin
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # (bucket, object_name) -> (monotonic deadline for reuse, signed URL)
+        self._urls: "OrderedDict[Tuple[str, str], Tuple[float, PresignedUrl]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, client, bucket: str, object_name: str) -> PresignedUrl:
+        """Reusable presigned GET URL for an object; raises what the client raises"""
+        key = (bucket, object_name)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._urls.get(key)
+            if cached and now < cached[0]:
+                self._urls.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+        expires_at = datetime.utcnow() + self.expiry
+        signed = PresignedUrl(client.presigned_get_object(bucket, object_name, expires=self.expiry), expires_at)
+        reuse_until = now + (self.expiry - self.refresh_margin).total_seconds()
+        with self._lock:
+            self._urls[key] = (reuse_until, signed)
+            self._urls.move_to_end(key)
+            while len(self._urls) > self.max_entries:
+                self._urls.popitem(last=False)
+        return signed
+
+    def get_many(self, client, bucket: str, object_names: Iterable[str]) -> Dict[str, PresignedUrl]:
+        """Presigned URLs for several objects, in input order without duplicates"""
+        return {name: self.get(client, bucket, name) for name in dict.fromkeys(object_names)}
+
+    def clear(self):
+        with self._lock:
+            self._urls.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "urls": len(self._urls)}
+
+
+# Global instance
+presign_cache = PresignCache()
@@ -0,0 +1,128 @@
+"""
+Read-side response cache with a dataset version.
+
+Evidence only changes when an upload commits, so encoded list responses are
+cached in memory under their normalised parameters and the current dataset
+version. Any commit that wrote an evidence object or file bumps the version,
+which retires every cached body and ETag at once; conditional GETs are then
+answered from the version alone, without touching Postgres.
+
+The version is per process (a random boot token plus a counter), so an ETag
+from one API process never matches another's. This process never sees another
+process's commits, so the version also carries a wall-clock epoch that rolls
+over every RESPONSE_CACHE_TTL seconds: cached bodies and ETags (and with them
+304 answers) go stale at the next rollover, which bounds how long another
+process's ingest can be hidden.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+from itertools import chain
+from typing import Callable, Hashable, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..models import EvidenceFile, EvidenceObject
+from .tile_service import TileCache
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+RESPONSE_CACHE_BYTES = int(os.getenv("RESPONSE_CACHE_BYTES", str(64 * 1024 * 1024)))
+# Larger bodies are streamed without being kept
+RESPONSE_CACHE_MAX_ENTRY = int(os.getenv("RESPONSE_CACHE_MAX_ENTRY", str(8 * 1024 * 1024)))
+
+# Rows whose commit changes what the read endpoints return
+TRACKED_MODELS = (EvidenceObject, EvidenceFile)
+
+
+class DatasetVersion:
+    """Counter bumped after every commit that wrote tracked rows, plus a TTL epoch"""
+
+    def __init__(self, ttl: float = RESPONSE_CACHE_TTL):
+        self.boot = uuid.uuid4().hex[:12]
+        self.counter = 0
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[], None]] = []
+
+    def current(self) -> str:
+        return f"{self.boot}.{self.counter}.{int(time.time() // self.ttl)}"
+
+    def subscribe(self, listener: Callable[[], None]):
+        """Call listener (e.g. a cache's clear) after each bump"""
+        self._listeners.append(listener)
+
+    def bump(self):
+        with self._lock:
+            self.counter += 1
+        for listener in self._listeners:
+            try:
+                listener()
+            except Exception as e:
+                logger.warning(f"Dataset version listener failed: {e}")
+
+    def track(self, session_class=Session):
+        """Bump on commit of any session of session_class that flushed tracked rows"""
+
+        @event.listens_for(session_class, "after_flush")
+        def _mark_changed(session, flush_context):
+            if any(isinstance(obj, TRACKED_MODELS) for obj in chain(session.new, session.dirty, session.deleted)):
+                session.info["dataset_changed"] = True
+
+        @event.listens_for(session_class, "after_commit")
+        def _bump_on_commit(session):
+            if session.info.pop("dataset_changed", False):
+                self.bump()
+
+        @event.listens_for(session_class, "after_rollback")
+        def _forget_on_rollback(session):
+            session.info.pop("dataset_changed", None)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header lists etag (or is *)"""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class ResponseCache(TileCache):
+    """Encoded response bodies by (parameters, dataset version)"""
+
+    def __init__(self, version: DatasetVersion, ttl: float = RESPONSE_CACHE_TTL,
+                 max_bytes: int = RESPONSE_CACHE_BYTES, max_entry: int = RESPONSE_CACHE_MAX_ENTRY):
+        super().__init__(ttl=ttl, max_bytes=max_bytes)
+        self.version = version
+        self.max_entry = max_entry
+        version.subscribe(self.clear)
+
+    @staticmethod
+    def etag(key: Hashable, version: str) -> str:
+        """Strong ETag: the body is a function of the parameters and the dataset version"""
+        return '"' + hashlib.sha256(repr((version, key)).encode()).hexdigest()[:32] + '"'
+
+    def tee(self, key: Hashable, version: str, chunks: Iterator[bytes]) -> Iterator[bytes]:
+        """Pass a streamed body through, keeping a copy if it completes and is small enough"""
+        body, size = [], 0
+        for chunk in chunks:
+            if body is not None:
+                size += len(chunk)
+                if size > self.max_entry:
+                    body = None
+                else:
+                    body.append(chunk)
+            yield chunk
+        if body is not None:
+            self.put((key, version), b"".join(body))
+
+
+# Global instances
+dataset_version = DatasetVersion()
+dataset_version.track()
+response_cache = ResponseCache(dataset_version)
@@ -0,0 +1,370 @@
+"""
+Resumable chunked uploads.
+
+Session state lives in Postgres (``upload_sessions``) and the bytes in a local
+spool file. Chunks must arrive in order at the current offset (tus-style), so
+the running SHA-256 is updated as each chunk lands and finalize does not need
+another pass over the file.
+
+The spool is node-local: every chunk and the finalize of a session must reach
+the process that created it (sticky routing, or a UPLOAD_SPOOL_DIR volume shared
+by all processes). Each process periodically sweeps stale sessions: abandoned
+ones expire and lose their spool files, and a finalize that died with its
+process is reopened so the client can finalize again.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from ..models import UploadSession
+from .hashing_service import hashing_service
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "evidence-uploads"))
+# Chunk size advertised to clients; any size is accepted
+RESUMABLE_CHUNK_SIZE = int(os.getenv("RESUMABLE_CHUNK_SIZE", str(8 * 1024 * 1024)))
+RESUMABLE_MAX_SIZE = int(os.getenv("RESUMABLE_MAX_SIZE", str(20 * 1024 * 1024 * 1024)))
+# Bytes buffered in memory before each spool write
+SPOOL_WRITE_SIZE = 1024 * 1024
+# Running hashers kept in memory; a session evicted from here is re-hashed from its spool file
+MAX_CACHED_HASHERS = 256
+# Sessions with no activity for this long are expired and their spool files deleted
+RESUMABLE_SESSION_TTL = timedelta(hours=int(os.getenv("RESUMABLE_SESSION_TTL_HOURS", "24")))
+# A session still finalizing after this long lost its finalize request and is reopened
+RESUMABLE_FINALIZE_STALE_AFTER = timedelta(minutes=int(os.getenv("RESUMABLE_FINALIZE_STALE_MINUTES", "60")))
+RESUMABLE_SWEEP_INTERVAL = float(os.getenv("RESUMABLE_SWEEP_SECONDS", "600"))
+
+UPLOAD_TYPES = ("general", "proofmode")
+
+
+class UploadSessionError(Exception):
+    """Raised for invalid resumable-upload operations; carries the HTTP status to return"""
+
+    def __init__(self, status_code: int, detail: str):
+        self.status_code = status_code
+        self.detail = detail
+        super().__init__(detail)
+
+
+class ResumableUploadService:
+    def __init__(self, spool_dir: str = UPLOAD_SPOOL_DIR, session_factory: Optional[Callable[[], Session]] = None,
+                 sweep_interval: float = RESUMABLE_SWEEP_INTERVAL):
+        self.spool_dir = spool_dir
+        self.sweep_interval = sweep_interval
+        self._session_factory = session_factory
+        self._hashers: "OrderedDict[UUID, Tuple[int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def spool_path(self, session_id: UUID) -> str:
+        return os.path.join(self.spool_dir, f"{session_id}.part")
+
+    def _cache_hasher(self, session_id: UUID, offset: int, hasher):
+        with self._lock:
+            self._hashers[session_id] = (offset, hasher)
+            self._hashers.move_to_end(session_id)
+            while len(self._hashers) > MAX_CACHED_HASHERS:
+                self._hashers.popitem(last=False)
+
+    def _hasher_at(self, session_id: UUID, offset: int):
+        """Running hasher positioned at offset, rebuilt from the spool file if not cached"""
+        with self._lock:
+            cached = self._hashers.get(session_id)
+        if cached and cached[0] == offset:
+            return cached[1].copy()
+        hasher = hashlib.sha256()
+        with open(self.spool_path(session_id), "rb") as spool:
+            remaining = offset
+            while remaining > 0:
+                block = spool.read(min(SPOOL_WRITE_SIZE, remaining))
+                if not block:
+                    break
+                hasher.update(block)
+                remaining -= len(block)
+        return hasher
+
+    def create(
+        self,
+        db: Session,
+        filename: str,
+        total_size: int,
+        upload_type: str = "general",
+        content_type: Optional[str] = None,
+        expected_sha256: Optional[str] = None,
+    ) -> UploadSession:
+        """Open a new session and its empty spool file"""
+        if upload_type not in UPLOAD_TYPES:
+            raise UploadSessionError(400, f"upload_type must be one of {', '.join(UPLOAD_TYPES)}")
+        if total_size <= 0 or total_size > RESUMABLE_MAX_SIZE:
+            raise UploadSessionError(400, f"size must be between 1 and {RESUMABLE_MAX_SIZE} bytes")
+        session = UploadSession(
+            filename=os.path.basename(filename),
+            content_type=content_type,
+            upload_type=upload_type,
+            total_size=total_size,
+            received_bytes=0,
+            expected_sha256=expected_sha256.lower() if expected_sha256 else None,
+            status="open",
+        )
+        db.add(session)
+        db.flush()
+        os.makedirs(self.spool_dir, exist_ok=True)
+        open(self.spool_path(session.id), "wb").close()
+        db.commit()
+        self._cache_hasher(session.id, 0, hashlib.sha256())
+        return session
+
+    def get(self, db: Session, session_id: UUID, for_update: bool = False) -> UploadSession:
+        """Load a session, optionally locking its row (fails fast if another request holds it)"""
+        query = db.query(UploadSession).filter(UploadSession.id == session_id)
+        if for_update:
+            query = query.with_for_update(nowait=True)
+        try:
+            session = query.one_or_none()
+        except OperationalError:
+            db.rollback()
+            raise UploadSessionError(409, "Another request is writing to this upload session.")
+        if session is None:
+            raise UploadSessionError(404, f"Upload session {session_id} not found.")
+        return session
+
+    async def append(
+        self,
+        db: Session,
+        session_id: UUID,
+        offset: int,
+        chunks: AsyncIterator[bytes],
+        chunk_sha256: Optional[str] = None,
+    ) -> UploadSession:
+        """
+        Append one chunk at offset. The chunk is all-or-nothing: on any error the
+        spool file is truncated back to the previous offset.
+        """
+        session = self.get(db, session_id, for_update=True)
+        if session.status != "open":
+            db.rollback()
+            raise UploadSessionError(409, f"Upload session is {session.status}.")
+        if offset != session.received_bytes:
+            db.rollback()
+            raise UploadSessionError(409, f"Offset mismatch: expected {session.received_bytes}, got {offset}.")
+
+        start = session.received_bytes
+        hasher = await asyncio.to_thread(self._hasher_at, session.id, start)
+        chunk_hasher = hashlib.sha256()
+        written = 0
+        spool = open(self.spool_path(session.id), "r+b")
+        try:
+            spool.seek(start)
+            spool.truncate()
+            buffer = bytearray()
+            async for data in chunks:
+                if start + written + len(buffer) + len(data) > session.total_size:
+                    raise UploadSessionError(400, "Chunk exceeds the declared upload size.")
+                buffer += data
+                if len(buffer) >= SPOOL_WRITE_SIZE:
+                    await asyncio.to_thread(self._write_block, spool, bytes(buffer), hasher, chunk_hasher)
+                    written += len(buffer)
+                    buffer.clear()
+            if buffer:
+                await asyncio.to_thread(self._write_block, spool, bytes(buffer), hasher, chunk_hasher)
+                written += len(buffer)
+            if chunk_sha256 and chunk_hasher.hexdigest() != chunk_sha256.lower():
+                raise UploadSessionError(400, "Chunk SHA-256 does not match the X-Chunk-SHA256 header.")
+            spool.flush()
+        except BaseException:
+            spool.truncate(start)
+            spool.close()
+            db.rollback()
+            raise
+        spool.close()
+
+        session.received_bytes = start + written
+        db.commit()
+        self._cache_hasher(session.id, session.received_bytes, hasher)
+        return session
+
+    @staticmethod
+    def _write_block(spool, block: bytes, hasher, chunk_hasher):
+        spool.write(block)
+        hasher.update(block)
+        chunk_hasher.update(block)
+
+    async def begin_finalize(self, db: Session, session_id: UUID) -> UploadSession:
+        """
+        Lock a fully received session for finalize and record its digest.
+        Uses the running hash; only re-reads the spool file if it was evicted.
+        """
+        session = self.get(db, session_id, for_update=True)
+        if session.status != "open":
+            db.rollback()
+            raise UploadSessionError(409, f"Upload session is {session.status}.")
+        if session.received_bytes != session.total_size:
+            db.rollback()
+            raise UploadSessionError(
+                409, f"Upload incomplete: {session.received_bytes} of {session.total_size} bytes received."
+            )
+
+        with self._lock:
+            cached = self._hashers.get(session.id)
+        if cached and cached[0] == session.total_size:
+            sha256 = cached[1].hexdigest()
+        else:
+            sha256 = await hashing_service.sha256_file(self.spool_path(session.id))
+
+        if session.expected_sha256 and session.expected_sha256 != sha256:
+            session.status = "failed"
+            session.result = {"error": f"SHA-256 mismatch: expected {session.expected_sha256}, got {sha256}"}
+            db.commit()
+            self.discard(session.id)
+            raise UploadSessionError(400, session.result["error"])
+
+        session.sha256 = sha256
+        session.status = "finalizing"
+        db.commit()
+        return session
+
+    def complete(self, db: Session, session_id: UUID, result: Dict[str, Any]):
+        """Mark a session finalized and drop its spool file"""
+        session = self.get(db, session_id)
+        session.status = "completed"
+        session.result = result
+        db.commit()
+        self.discard(session_id)
+
+    def fail(self, db: Session, session_id: UUID, detail: Any, retryable: bool):
+        """Record a failed finalize; retryable failures reopen the session and keep its bytes"""
+        db.rollback()
+        session = self.get(db, session_id)
+        session.status = "open" if retryable else "failed"
+        session.result = {"error": str(detail)}
+        db.commit()
+        if not retryable:
+            self.discard(session_id)
+
+    def discard(self, session_id: UUID):
+        """Remove the spool file and cached hasher of a session"""
+        with self._lock:
+            self._hashers.pop(session_id, None)
+        try:
+            os.unlink(self.spool_path(session_id))
+        except FileNotFoundError:
+            pass
+
+    def expire_stale(self, db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Reopen sessions stuck finalizing, expire abandoned open sessions and delete
+        spool files in this node's spool directory that no live session owns.
+        Rows another request holds locked are skipped until the next sweep.
+        """
+        now = now or datetime.utcnow()
+        stuck = (
+            db.query(UploadSession)
+            .filter(UploadSession.status == "finalizing", UploadSession.updated_at < now - RESUMABLE_FINALIZE_STALE_AFTER)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        for session in stuck:
+            # The bytes and digest are kept; finalizing again re-runs the pipeline
+            session.status = "open"
+            session.result = {"error": "Finalize was interrupted; finalize again to retry."}
+        abandoned = (
+            db.query(UploadSession)
+            .filter(UploadSession.status == "open", UploadSession.updated_at < now - RESUMABLE_SESSION_TTL)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        for session in abandoned:
+            session.status = "expired"
+            session.result = {"error": f"No activity for {RESUMABLE_SESSION_TTL}; upload expired."}
+        db.commit()
+        for session in abandoned:
+            self.discard(session.id)
+
+        # Sessions expired or finished by another process leave their spool files here
+        orphans = 0
+        cutoff = time.time() - RESUMABLE_SESSION_TTL.total_seconds()
+        try:
+            names = os.listdir(self.spool_dir)
+        except FileNotFoundError:
+            names = []
+        stale_files = {}
+        for name in names:
+            path = os.path.join(self.spool_dir, name)
+            try:
+                if name.endswith(".part") and os.path.getmtime(path) < cutoff:
+                    stale_files[UUID(name[:-len(".part")])] = path
+            except (ValueError, OSError):
+                continue
+        if stale_files:
+            live = {
+                session_id for (session_id,) in db.query(UploadSession.id)
+                .filter(UploadSession.id.in_(stale_files), UploadSession.status.in_(("open", "finalizing")))
+            }
+            db.rollback()
+            for session_id in stale_files.keys() - live:
+                self.discard(session_id)
+                orphans += 1
+        return {"reopened": len(stuck), "expired": len(abandoned), "orphaned_spool_files": orphans}
+
+    def _sweep(self):
+        if self._session_factory is None:
+            from ..database import SessionLocal
+            self._session_factory = SessionLocal
+        db = self._session_factory()
+        try:
+            swept = self.expire_stale(db)
+        finally:
+            db.close()
+        if any(swept.values()):
+            logger.info(f"Swept stale upload sessions: {swept}")
+
+    async def _sweep_loop(self):
+        while True:
+            try:
+                await asyncio.to_thread(self._sweep)
+            except Exception as e:
+                logger.error(f"Upload session sweep failed: {e}")
+            await asyncio.sleep(self.sweep_interval)
+
+    def start(self):
+        """Start the periodic stale-session sweep on the running event loop"""
+        if self._sweeper is None and self.sweep_interval > 0:
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self):
+        """Stop the sweep"""
+        if self._sweeper:
+            self._sweeper.cancel()
+            await asyncio.gather(self._sweeper, return_exceptions=True)
+            self._sweeper = None
+
+
+def session_status(session: UploadSession) -> Dict[str, Any]:
+    """Public view of an upload session"""
+    return {
+        "id": str(session.id),
+        "filename": session.filename,
+        "upload_type": session.upload_type,
+        "size": session.total_size,
+        "offset": session.received_bytes,
+        "status": session.status,
+        "sha256": session.sha256,
+        "chunk_size": RESUMABLE_CHUNK_SIZE,
+        "result": session.result,
+    }
+
+
+# Global instance
+resumable_upload_service = ResumableUploadService()
@@ -0,0 +1,293 @@
+"""
+ProofMode GPG signature verification.
+
+One long-lived keyring is shared by every request: a bundle's public key is
+imported the first time it is seen and skipped afterwards, and the keyring's
+keys are indexed by fingerprint in memory. Because the keyring holds every key
+seen so far, a bundle's signatures only count when made by the key(s) in that
+bundle's own ``pubkey.asc``, or by a key of the operator's trusted keyring
+(GPG_TRUSTED_HOME, the default GnuPG home as before), which also covers bundles
+that ship no key. Each ``gpg --verify`` is a separate
+subprocess, so a thread pool runs a bundle's detached signatures concurrently.
+"""
+import asyncio
+import base64
+import binascii
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import gnupg
+
+logger = logging.getLogger(__name__)
+
+GPG_HOME = os.getenv("GPG_HOME", os.path.join(tempfile.gettempdir(), "evidence-gnupg"))
+# Keys in this keyring may sign any bundle; it must not be GPG_HOME, which collects bundle keys
+GPG_TRUSTED_HOME = os.getenv("GPG_TRUSTED_HOME", os.getenv("GNUPGHOME", os.path.join(os.path.expanduser("~"), ".gnupg")))
+GPG_VERIFY_WORKERS = int(os.getenv("GPG_VERIFY_WORKERS", str(min(8, (os.cpu_count() or 1) * 2))))
+
+PUBLIC_KEY_HEADER = b"-----BEGIN PGP PUBLIC KEY BLOCK-----"
+ARMOR_HEADER = b"-----BEGIN PGP SIGNATURE-----"
+
+# OpenPGP signature subpacket types (RFC 4880 5.2.3.1)
+SUBPACKET_ISSUER_KEY_ID = 16
+SUBPACKET_ISSUER_FINGERPRINT = 33
+
+
+def is_public_key_file(file_path: str) -> bool:
+    """True for an armored public key (ProofMode ships its key as pubkey.asc)"""
+    with open(file_path, "rb") as f:
+        return f.read(len(PUBLIC_KEY_HEADER) + 64).lstrip().startswith(PUBLIC_KEY_HEADER)
+
+
+def _dearmor(data: bytes) -> bytes:
+    """Binary packets of an ASCII-armored signature (binary input is returned as is)"""
+    if not data.lstrip().startswith(ARMOR_HEADER):
+        return data
+    lines = data.strip().splitlines()[1:]
+    # Skip armor headers (e.g. "Version: ...") up to the blank separator line
+    if b"" in lines:
+        lines = lines[lines.index(b"") + 1:]
+    body = [line.strip() for line in lines if line.strip() and not line.startswith((b"=", b"-----"))]
+    return base64.b64decode(b"".join(body))
+
+
+def _subpackets(data: bytes):
+    """Yield (type, body) for a block of signature subpackets"""
+    pos = 0
+    while pos < len(data):
+        first = data[pos]
+        if first < 192:
+            length, pos = first, pos + 1
+        elif first < 255:
+            length, pos = ((first - 192) << 8) + data[pos + 1] + 192, pos + 2
+        else:
+            length, pos = int.from_bytes(data[pos + 1:pos + 5], "big"), pos + 5
+        if length == 0:
+            return
+        yield data[pos] & 0x7F, data[pos + 1:pos + length]
+        pos += length
+
+
+def signature_issuer(sig_data: bytes) -> Optional[str]:
+    """
+    Issuer fingerprint (or 16-hex key id, if that is all the packet carries) of a
+    detached signature, read from the packet without running gpg. None if unreadable.
+    """
+    try:
+        packet = _dearmor(sig_data)
+        header = packet[0]
+        if header & 0x40:  # New-format packet header
+            tag, first = header & 0x3F, packet[1]
+            if first < 192:
+                body = packet[2:2 + first]
+            elif first < 224:
+                body = packet[3:3 + ((first - 192) << 8) + packet[2] + 192]
+            elif first == 255:
+                body = packet[6:6 + int.from_bytes(packet[2:6], "big")]
+            else:
+                return None  # Partial body lengths are not used for signatures
+        else:
+            tag, length_type = (header >> 2) & 0x0F, header & 0x03
+            size = {0: 1, 1: 2, 2: 4}.get(length_type)
+            if size is None:
+                body = packet[1:]
+            else:
+                body = packet[1 + size:1 + size + int.from_bytes(packet[1:1 + size], "big")]
+        if tag != 2:
+            return None
+        if body[0] == 3:
+            return body[7:15].hex().upper()
+        if body[0] != 4:
+            return None
+        hashed_len = int.from_bytes(body[4:6], "big")
+        hashed = body[6:6 + hashed_len]
+        unhashed_len = int.from_bytes(body[6 + hashed_len:8 + hashed_len], "big")
+        unhashed = body[8 + hashed_len:8 + hashed_len + unhashed_len]
+        key_id = None
+        for subpacket_type, data in [*_subpackets(hashed), *_subpackets(unhashed)]:
+            if subpacket_type == SUBPACKET_ISSUER_FINGERPRINT and data[:1] == b"\x04":
+                return data[1:21].hex().upper()
+            if subpacket_type == SUBPACKET_ISSUER_KEY_ID:
+                key_id = data[:8].hex().upper()
+        return key_id
+    except (IndexError, ValueError, binascii.Error):
+        return None
+
+
+class SignatureVerifier:
+    def __init__(self, gnupghome: str = GPG_HOME, max_workers: int = GPG_VERIFY_WORKERS,
+                 trusted_home: Optional[str] = GPG_TRUSTED_HOME):
+        self.gnupghome = gnupghome
+        self.max_workers = max_workers
+        self.trusted_home = trusted_home
+        self._trusted: Optional[List[str]] = None
+        self._gpg: Optional[gnupg.GPG] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # fingerprint -> key details from the keyring
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        # SHA-256 of armored key blocks already imported -> their fingerprints
+        self._imported: Dict[str, List[str]] = {}
+
+    def _get_gpg(self) -> gnupg.GPG:
+        """Get or create the shared keyring, indexing the keys it already holds"""
+        with self._lock:
+            if self._gpg is None:
+                os.makedirs(self.gnupghome, mode=0o700, exist_ok=True)
+                gpg = gnupg.GPG(gnupghome=self.gnupghome)
+                for key in gpg.list_keys():
+                    self._index_key(key)
+                self._gpg = gpg
+                logger.info(f"GPG keyring at {self.gnupghome} loaded with {len(self._keys)} keys")
+            return self._gpg
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get or create the verification thread pool"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="gpg-verify")
+        return self._executor
+
+    def _index_key(self, key: Dict[str, Any]):
+        """Index a key under its primary and subkey fingerprints (ProofMode may sign with a subkey)"""
+        self._keys[key["fingerprint"]] = key
+        for subkey in key.get("subkeys", []):
+            if len(subkey) > 2 and subkey[2]:
+                self._keys[subkey[2]] = key
+
+    def warm(self):
+        """Open the keyring ahead of the first upload"""
+        self._get_gpg()
+
+    def key(self, fingerprint: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Details of a key in the keyring, by fingerprint"""
+        return self._keys.get(fingerprint) if fingerprint else None
+
+    def resolve_fingerprint(self, issuer: Optional[str]) -> Optional[str]:
+        """Full fingerprint, present in the keyring, for a signature's issuer fingerprint or key id"""
+        if not issuer:
+            return None
+        self._get_gpg()
+        if len(issuer) == 40:
+            return issuer if issuer in self._keys else None
+        matches = [fp for fp in self._keys if fp.endswith(issuer)]
+        return matches[0] if len(matches) == 1 else None
+
+    def trusted_fingerprints(self) -> List[str]:
+        """
+        Primary fingerprints of the operator's trusted keyring, copied into the shared
+        keyring on first use (keys added to it later are picked up on restart)
+        """
+        if self._trusted is not None:
+            return self._trusted
+        fingerprints = []
+        if not self.trusted_home or not os.path.isdir(self.trusted_home):
+            pass
+        elif os.path.realpath(self.trusted_home) == os.path.realpath(self.gnupghome):
+            logger.error("GPG_TRUSTED_HOME is the shared bundle keyring; ignoring it")
+        else:
+            trusted = gnupg.GPG(gnupghome=self.trusted_home)
+            fingerprints = [key["fingerprint"] for key in trusted.list_keys()]
+            if fingerprints:
+                armored = trusted.export_keys(fingerprints)
+                gpg = self._get_gpg()
+                with self._lock:
+                    gpg.import_keys(armored)
+                    for key in gpg.list_keys(keys=fingerprints):
+                        self._index_key(key)
+                logger.info(f"Trusting {len(fingerprints)} key(s) from {self.trusted_home} for every bundle")
+        self._trusted = fingerprints
+        return fingerprints
+
+    def is_trusted(self, fingerprint: Optional[str], trusted: Iterable[str]) -> bool:
+        """True if fingerprint, or the primary key it is a subkey of, is one of trusted"""
+        if not fingerprint:
+            return False
+        trusted = set(trusted)
+        if fingerprint in trusted:
+            return True
+        key = self.key(fingerprint)
+        return key is not None and key["fingerprint"] in trusted
+
+    def restrict(self, verification: Dict[str, Any], trusted: Iterable[str]) -> Dict[str, Any]:
+        """Mark a verification invalid unless it was made by one of the trusted keys"""
+        if not verification["valid"] or self.is_trusted(verification.get("fingerprint"), trusted):
+            return verification
+        return {
+            **verification,
+            "valid": False,
+            "error": f"Signed by key {verification.get('fingerprint')}, which is not the bundle's public key or a trusted key",
+        }
+
+    def signing_fingerprint(self, sig_file: str) -> Optional[str]:
+        """Fingerprint of the keyring key that a detached signature names as its issuer"""
+        with open(sig_file, "rb") as f:
+            return self.resolve_fingerprint(signature_issuer(f.read()))
+
+    def import_key_file(self, file_path: str) -> List[str]:
+        """Import an armored public key once; repeated imports of the same block are skipped"""
+        with open(file_path, "rb") as f:
+            key_data = f.read()
+        digest = hashlib.sha256(key_data).hexdigest()
+        gpg = self._get_gpg()
+        with self._lock:
+            if digest in self._imported:
+                return self._imported[digest]
+            result = gpg.import_keys(key_data)
+            fingerprints = [fp for fp in result.fingerprints if fp]
+            if fingerprints:
+                for key in gpg.list_keys(keys=fingerprints):
+                    self._index_key(key)
+                logger.info(f"Imported GPG key(s) {', '.join(fingerprints)}")
+            self._imported[digest] = fingerprints
+            return fingerprints
+
+    def verify_sync(self, sig_file: str, data_file: str) -> Dict[str, Any]:
+        """Verify one detached signature on the calling thread"""
+        result = {
+            "signature_file": os.path.basename(sig_file),
+            "data_file": os.path.basename(data_file),
+        }
+        if not os.path.exists(data_file):
+            return {**result, "valid": False, "error": "Corresponding data file not found"}
+        with open(sig_file, "rb") as sig_f:
+            verification = self._get_gpg().verify_file(sig_f, data_file)
+        return {
+            **result,
+            "valid": verification.valid,
+            "fingerprint": verification.fingerprint,
+            "status": verification.status,
+            "trust_level": verification.trust_level,
+            "error": None if verification.valid else verification.stderr,
+        }
+
+    async def verify_many(
+        self, pairs: Iterable[Tuple[str, str]], trusted: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Verify (signature, data) pairs concurrently; results keep the input order.
+        With trusted fingerprints, signatures by any other key in the keyring are invalid.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        results = list(await asyncio.gather(
+            *(loop.run_in_executor(executor, self.verify_sync, sig_file, data_file) for sig_file, data_file in pairs)
+        ))
+        if trusted is None:
+            return results
+        trusted = set(trusted)
+        return [self.restrict(result, trusted) for result in results]
+
+    def close(self):
+        """Shut down the verification pool"""
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Global instance
+signature_verifier = SignatureVerifier()
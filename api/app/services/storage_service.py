@@ -0,0 +1,96 @@
+"""
+Concurrent MinIO uploads.
+
+A shared, bounded thread pool runs the blocking ``put_object`` calls; each
+request gets an UploadBatch that caps how many of its puts are in flight so
+one large bundle cannot occupy every worker.
+"""
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Callable, Dict, Optional
+
+from minio import Minio
+
+logger = logging.getLogger(__name__)
+
+MINIO_UPLOAD_WORKERS = int(os.getenv("MINIO_UPLOAD_WORKERS", "16"))
+# Puts allowed in flight for a single request
+MINIO_REQUEST_CONCURRENCY = int(os.getenv("MINIO_REQUEST_CONCURRENCY", "4"))
+# Multipart tuning: MinIO needs parts of at least 5 MiB; bigger parts mean fewer round trips
+MINIO_PART_SIZE = int(os.getenv("MINIO_PART_SIZE", str(16 * 1024 * 1024)))
+MINIO_PART_PARALLELISM = int(os.getenv("MINIO_PART_PARALLELISM", "4"))
+
+
+class UploadScheduler:
+    def __init__(
+        self,
+        max_workers: int = MINIO_UPLOAD_WORKERS,
+        part_size: int = MINIO_PART_SIZE,
+        part_parallelism: int = MINIO_PART_PARALLELISM,
+    ):
+        self.max_workers = max_workers
+        self.part_size = part_size
+        self.part_parallelism = part_parallelism
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get or create the upload thread pool"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="minio-put")
+        return self._executor
+
+    async def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking storage call on the upload pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), lambda: fn(*args, **kwargs))
+
+    @property
+    def put_options(self) -> Dict[str, int]:
+        """Multipart settings passed to every put_object call"""
+        return {"part_size": self.part_size, "num_parallel_uploads": self.part_parallelism}
+
+    def put_object_sync(
+        self, client: Minio, bucket: str, object_name: str, data: BinaryIO, length: int, **kwargs
+    ):
+        """Blocking put_object with the scheduler's multipart settings"""
+        return client.put_object(bucket, object_name, data, length=length, **self.put_options, **kwargs)
+
+    def put_file_sync(self, client: Minio, bucket: str, object_name: str, file_path: str, **kwargs):
+        """Blocking put of a local file"""
+        with open(file_path, "rb") as file_data:
+            return self.put_object_sync(client, bucket, object_name, file_data, os.fstat(file_data.fileno()).st_size, **kwargs)
+
+    def batch(self, concurrency: int = MINIO_REQUEST_CONCURRENCY) -> "UploadBatch":
+        """Start a batch of puts for one request"""
+        return UploadBatch(self, concurrency)
+
+    def close(self):
+        """Shut down the upload pool"""
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+class UploadBatch:
+    """Puts belonging to one request, with at most `concurrency` running at once"""
+
+    def __init__(self, scheduler: UploadScheduler, concurrency: int):
+        self._scheduler = scheduler
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run any blocking storage call under this batch's concurrency limit"""
+        async with self._semaphore:
+            return await self._scheduler.submit(fn, *args, **kwargs)
+
+    async def put_object(self, client: Minio, bucket: str, object_name: str, data: BinaryIO, length: int, **kwargs):
+        return await self.run(self._scheduler.put_object_sync, client, bucket, object_name, data, length, **kwargs)
+
+    async def put_file(self, client: Minio, bucket: str, object_name: str, file_path: str, **kwargs):
+        return await self.run(self._scheduler.put_file_sync, client, bucket, object_name, file_path, **kwargs)
+
+
+# Global instance
+upload_scheduler = UploadScheduler()
@@ -0,0 +1,127 @@
+"""
+Thumbnail and derivative rendering on a process pool.
+
+Decoding and resampling are CPU-bound and hold the GIL, so images are
+rendered in worker processes. JPEGs are decoded in draft mode: libjpeg scales
+the DCT output by 1/2, 1/4 or 1/8 while decoding, so a 48 MP photo is never
+materialised at full size. Encoded output is hashed as it is written.
+"""
+import asyncio
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, NamedTuple, Optional, Sequence
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = 1024
+THUMBNAIL_QUALITY = 85
+# 0 renders on a thread instead of worker processes
+THUMBNAIL_WORKERS = int(os.getenv("THUMBNAIL_WORKERS", str(os.cpu_count() or 1)))
+# Derivative pyramid: longest edge in px, and encodings produced for each size
+DERIVATIVE_SIZES = tuple(sorted(int(size) for size in os.getenv("DERIVATIVE_SIZES", "128,512,1024").split(",")))
+DERIVATIVE_FORMATS = tuple(os.getenv("DERIVATIVE_FORMATS", "webp,jpeg").split(","))
+
+# Pillow encoder name, content type, file extension and save options per format
+ENCODINGS = {
+    "jpeg": ("JPEG", "image/jpeg", "jpg", {"quality": THUMBNAIL_QUALITY, "optimize": True}),
+    "webp": ("WEBP", "image/webp", "webp", {"quality": 80, "method": 4}),
+}
+
+
+class Derivative(NamedTuple):
+    size: int  # Requested longest edge
+    format: str
+    content_type: str
+    extension: str
+    data: bytes
+    sha256: str
+    width: int
+    height: int
+    original_width: int
+    original_height: int
+
+
+class _HashingBuffer(io.BytesIO):
+    """In-memory output that hashes bytes as the encoder writes them"""
+
+    def __init__(self):
+        super().__init__()
+        self.sha256 = hashlib.sha256()
+
+    def write(self, data) -> int:
+        self.sha256.update(data)
+        return super().write(data)
+
+
+def render_derivatives(
+    image_path: str, sizes: Sequence[int] = DERIVATIVE_SIZES, formats: Sequence[str] = DERIVATIVE_FORMATS
+) -> List[Derivative]:
+    """
+    Render the derivative pyramid of one image (runs in a worker process).
+    The image is decoded once, at draft scale for the largest size, and each
+    smaller level is resampled from the level above it.
+    """
+    derivatives = []
+    with Image.open(image_path) as img:
+        original_width, original_height = img.size
+        img.draft("RGB", (max(sizes), max(sizes)))
+        level = img.convert("RGB") if img.mode != "RGB" else img
+        for size in sorted(sizes, reverse=True):
+            level = level.copy()
+            level.thumbnail((size, size), Image.Resampling.LANCZOS)
+            for fmt in formats:
+                encoder, content_type, extension, options = ENCODINGS[fmt]
+                buffer = _HashingBuffer()
+                level.save(buffer, encoder, **options)
+                derivatives.append(Derivative(
+                    size=size,
+                    format=fmt,
+                    content_type=content_type,
+                    extension=extension,
+                    data=buffer.getvalue(),
+                    sha256=buffer.sha256.hexdigest(),
+                    width=level.width,
+                    height=level.height,
+                    original_width=original_width,
+                    original_height=original_height,
+                ))
+    return derivatives
+
+
+class ThumbnailService:
+    def __init__(self, max_workers: int = THUMBNAIL_WORKERS):
+        self.max_workers = max_workers
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        """Get or create the rendering pool"""
+        if self._executor is None:
+            if self.max_workers > 0:
+                # spawn: forking a process that already runs threads can deadlock the child
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="thumbnail")
+        return self._executor
+
+    async def render_derivatives(self, image_path: str) -> List[Derivative]:
+        """Render the derivative pyramid on the pool; raises if the file is not a decodable image"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), render_derivatives, image_path)
+
+    def close(self):
+        """Shut down the rendering pool"""
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global instance
+thumbnail_service = ThumbnailService()
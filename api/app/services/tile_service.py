@@ -0,0 +1,170 @@
+"""
+Mapbox Vector Tiles of evidence points.
+
+Tiles are encoded by PostGIS (``ST_AsMVTGeom`` / ``ST_AsMVT``), so only the
+points inside one tile leave the database and the map fetches what is on
+screen at the current zoom. Encoded tiles are kept in an in-memory LRU for a
+short TTL, keyed by tile coordinates and filters.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Hashable, NamedTuple, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+TILE_EXTENT = 4096
+# Pixels (in tile units of TILE_EXTENT) kept around each tile so symbols at the edge are not cut
+TILE_BUFFER = 64
+TILE_MAX_ZOOM = int(os.getenv("TILE_MAX_ZOOM", "22"))
+TILE_LAYER = "evidence"
+TILE_CACHE_TTL = float(os.getenv("TILE_CACHE_TTL", "60"))
+TILE_CACHE_BYTES = int(os.getenv("TILE_CACHE_BYTES", str(64 * 1024 * 1024)))
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+
+
+class TileFilters(NamedTuple):
+    object_type: Optional[str] = None
+    captured_from: Optional[datetime] = None
+    captured_to: Optional[datetime] = None
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """captured_at is stored as naive UTC"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def tile_filters(
+    object_type: Optional[str] = None,
+    captured_from: Optional[datetime] = None,
+    captured_to: Optional[datetime] = None,
+) -> TileFilters:
+    return TileFilters(object_type or None, naive_utc(captured_from), naive_utc(captured_to))
+
+
+def tile_in_range(z: int, x: int, y: int) -> bool:
+    """True for an existing XYZ tile at a served zoom level"""
+    return 0 <= z <= TILE_MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def tile_statement(z: int, x: int, y: int, filters: TileFilters) -> Tuple[Any, Dict[str, Any]]:
+    """SQL and parameters returning one encoded tile (an empty bytea if it holds no points)"""
+    conditions = ["f.geometry IS NOT NULL"]
+    params: Dict[str, Any] = {
+        "z": z, "x": x, "y": y, "extent": TILE_EXTENT, "buffer": TILE_BUFFER, "layer": TILE_LAYER,
+    }
+    if z >= 2:
+        # Index prefilter on the geography column, buffer included; ST_AsMVTGeom clips exactly.
+        # Tiles at z0/z1 span 180 degrees or more, which has no unambiguous geography envelope,
+        # and cover the whole world anyway.
+        conditions.append(
+            "f.geometry && ST_Transform(ST_TileEnvelope(:z, :x, :y, margin => :margin), 4326)::geography"
+        )
+        params["margin"] = TILE_BUFFER / TILE_EXTENT
+    if filters.object_type:
+        conditions.append("o.object_type = :object_type")
+        params["object_type"] = filters.object_type
+    if filters.captured_from:
+        conditions.append("f.captured_at >= :captured_from")
+        params["captured_from"] = filters.captured_from
+    if filters.captured_to:
+        conditions.append("f.captured_at < :captured_to")
+        params["captured_to"] = filters.captured_to
+
+    sql = f"""
+        WITH tile AS (
+            SELECT
+                ST_AsMVTGeom(
+                    ST_Transform(f.geometry::geometry, 3857), ST_TileEnvelope(:z, :x, :y), :extent, :buffer, true
+                ) AS geom,
+                f.id::text AS id,
+                f.object_id::text AS object_id,
+                o.object_type,
+                f.mime_type,
+                extract(epoch FROM f.captured_at)::bigint AS captured_at
+            FROM evidence_files f
+            JOIN evidence_objects o ON o.id = f.object_id
+            WHERE {" AND ".join(conditions)}
+        )
+        SELECT ST_AsMVT(tile.*, :layer, :extent, 'geom') FROM tile WHERE geom IS NOT NULL
+    """
+    return text(sql), params
+
+
+class TileCache:
+    """Encoded tiles by key, least recently used evicted first once over the byte budget"""
+
+    def __init__(self, ttl: float = TILE_CACHE_TTL, max_bytes: int = TILE_CACHE_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._tiles: "OrderedDict[Hashable, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._tiles.get(key)
+            if cached is None or now - cached[0] >= self.ttl:
+                if cached is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._tiles.move_to_end(key)
+            self.hits += 1
+            return cached[1]
+
+    def put(self, key: Hashable, tile: bytes):
+        if len(tile) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._tiles:
+                self._drop(key)
+            self._tiles[key] = (time.monotonic(), tile)
+            self.size_bytes += len(tile)
+            while self.size_bytes > self.max_bytes:
+                self._drop(next(iter(self._tiles)))
+
+    def _drop(self, key: Hashable):
+        _, tile = self._tiles.pop(key)
+        self.size_bytes -= len(tile)
+
+    def clear(self):
+        with self._lock:
+            self._tiles.clear()
+            self.size_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "tiles": len(self._tiles), "bytes": self.size_bytes}
+
+
+class TileService:
+    def __init__(self, cache: Optional[TileCache] = None):
+        self.cache = cache or TileCache()
+
+    def tile(self, db: Session, z: int, x: int, y: int, filters: TileFilters = TileFilters()) -> bytes:
+        """Encoded tile, from the cache or PostGIS"""
+        key = (z, x, y, filters)
+        tile = self.cache.get(key)
+        if tile is not None:
+            return tile
+        statement, params = tile_statement(z, x, y, filters)
+        started = time.perf_counter()
+        tile = bytes(db.execute(statement, params).scalar() or b"")
+        logger.debug(f"Tile {z}/{x}/{y} encoded in {time.perf_counter() - started:.3f}s ({len(tile)} bytes)")
+        self.cache.put(key, tile)
+        return tile
+
+
+# Global instance
+tile_service = TileService()
@@ -0,0 +1,134 @@
+"""
+Persistent cache of accepted GPG signature verdicts.
+
+Rows are keyed by (data sha256, signature sha256, key fingerprint). The
+fingerprint used for a lookup is the issuer named inside the signature packet,
+resolved against the keys currently in the keyring, so a verdict recorded for
+one key is never served for a signature that names another (or a removed) key.
+A cached verdict still only counts when its key is one the current bundle ships.
+Only valid verdicts are stored; anything else is re-checked by gpg every time.
+"""
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..models import SignatureVerification
+from .hashing_service import DigestCache
+from .signature_service import SignatureVerifier, signature_verifier
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str, str]
+
+
+class VerificationCache:
+    def __init__(self, verifier: Optional[SignatureVerifier] = None):
+        self._verifier = verifier or signature_verifier
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def lookup_many(self, db: Session, keys: Iterable[CacheKey]) -> Dict[CacheKey, SignatureVerification]:
+        """Return the cached verdicts among keys"""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        rows = db.query(SignatureVerification).filter(
+            tuple_(
+                SignatureVerification.data_sha256,
+                SignatureVerification.signature_sha256,
+                SignatureVerification.fingerprint,
+            ).in_(keys)
+        ).all()
+        return {(row.data_sha256, row.signature_sha256, row.fingerprint): row for row in rows}
+
+    def record(self, db: Session, key: CacheKey, verification: Dict[str, Any]):
+        """Record a valid verdict in the caller's transaction; duplicates are ignored"""
+        data_sha256, signature_sha256, fingerprint = key
+        db.execute(
+            insert(SignatureVerification)
+            .values(
+                data_sha256=data_sha256,
+                signature_sha256=signature_sha256,
+                fingerprint=fingerprint,
+                status=verification.get("status"),
+                trust_level=verification.get("trust_level"),
+            )
+            .on_conflict_do_nothing()
+        )
+
+    async def verify_many(
+        self,
+        db: Session,
+        pairs: List[Tuple[str, str]],
+        digest_cache: DigestCache,
+        trusted: Optional[Iterable[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Verify (signature, data) pairs like SignatureVerifier.verify_many, answering
+        from the cache where possible. Results keep the input order.
+        """
+        trusted = set(trusted) if trusted is not None else None
+        existing = [path for pair in pairs for path in pair if os.path.exists(path)]
+        digests = await digest_cache.sha256_many(existing)
+        keys: Dict[int, CacheKey] = {}
+        for index, (sig_file, data_file) in enumerate(pairs):
+            fingerprint = self._verifier.signing_fingerprint(sig_file)
+            if fingerprint and data_file in digests:
+                keys[index] = (digests[data_file], digests[sig_file], fingerprint)
+
+        try:
+            cached = self.lookup_many(db, keys.values())
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Signature verification cache unavailable: {e}")
+            cached = {}
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(pairs)
+        pending = []
+        for index, (sig_file, data_file) in enumerate(pairs):
+            row = cached.get(keys.get(index))
+            if row is None:
+                pending.append(index)
+                continue
+            verification = {
+                "signature_file": os.path.basename(sig_file),
+                "data_file": os.path.basename(data_file),
+                "valid": True,
+                "fingerprint": row.fingerprint,
+                "status": row.status,
+                "trust_level": row.trust_level,
+                "error": None,
+                "cached": True,
+            }
+            results[index] = verification if trusted is None else self._verifier.restrict(verification, trusted)
+        self.hits += len(pairs) - len(pending)
+        self.misses += len(pending)
+
+        fresh = await self._verifier.verify_many((pairs[index] for index in pending), trusted)
+        accepted = []
+        for index, verification in zip(pending, fresh):
+            results[index] = {**verification, "cached": False}
+            key = keys.get(index)
+            # The verdict is only reusable for the key the signature itself names
+            if verification["valid"] and key and verification.get("fingerprint") == key[2]:
+                accepted.append((key, verification))
+        if accepted:
+            try:
+                for key, verification in accepted:
+                    self.record(db, key, verification)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Could not record signature verdicts: {e}")
+        return results
+
+
+# Global instance
+verification_cache = VerificationCache()
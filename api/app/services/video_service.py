@@ -0,0 +1,143 @@
+"""
+Video metadata and poster frames via ffprobe/ffmpeg.
+
+Both tools read the file from disk themselves (ffmpeg seeks straight to the
+poster timestamp), so a video is never loaded into Python memory. Each call is
+a subprocess, so a small thread pool keeps them off the event loop and runs a
+bundle's videos concurrently.
+"""
+import asyncio
+import json
+import logging
+import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
+from typing import Any, Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+FFPROBE_BINARY = os.getenv("FFPROBE_BINARY", "ffprobe")
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+VIDEO_WORKERS = int(os.getenv("VIDEO_WORKERS", "2"))
+VIDEO_TOOL_TIMEOUT = int(os.getenv("VIDEO_TOOL_TIMEOUT", "120"))
+# Poster frame timestamp, clamped to the middle of shorter clips
+POSTER_AT_SECONDS = float(os.getenv("VIDEO_POSTER_AT_SECONDS", "1.0"))
+# Longest edge of the extracted poster; derivatives are rendered from it
+POSTER_MAX_SIZE = 1920
+
+# Container types by extension; mimetypes does not know all of them on every platform
+VIDEO_MIME_TYPES = {
+    '.mp4': 'video/mp4',
+    '.m4v': 'video/x-m4v',
+    '.mov': 'video/quicktime',
+    '.3gp': 'video/3gpp',
+    '.webm': 'video/webm',
+    '.mkv': 'video/x-matroska',
+}
+
+
+class VideoExtract(NamedTuple):
+    info: Dict[str, Any]
+    poster_path: Optional[str]
+
+
+def video_info(probe: Dict[str, Any]) -> Dict[str, Any]:
+    """Summarise ffprobe JSON output (-show_format -show_streams)"""
+    fmt = probe.get("format", {})
+    streams = probe.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), {})
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), {})
+
+    def number(value, cast=float):
+        try:
+            return cast(value)
+        except (TypeError, ValueError):
+            return None
+
+    frame_rate = None
+    if video.get("avg_frame_rate") and video["avg_frame_rate"] != "0/0":
+        try:
+            frame_rate = round(float(Fraction(video["avg_frame_rate"])), 3)
+        except (ValueError, ZeroDivisionError):
+            pass
+
+    return {
+        "duration": number(fmt.get("duration")) or number(video.get("duration")),
+        "container": fmt.get("format_name"),
+        "bit_rate": number(fmt.get("bit_rate"), int),
+        "video_codec": video.get("codec_name"),
+        "width": number(video.get("width"), int),
+        "height": number(video.get("height"), int),
+        "frame_rate": frame_rate,
+        "rotation": number((video.get("tags") or {}).get("rotate"), int),
+        "audio_codec": audio.get("codec_name"),
+        "creation_time": (fmt.get("tags") or {}).get("creation_time"),
+    }
+
+
+class VideoService:
+    def __init__(self, max_workers: int = VIDEO_WORKERS):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get or create the extraction thread pool"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="video")
+        return self._executor
+
+    @staticmethod
+    def available() -> bool:
+        return shutil.which(FFPROBE_BINARY) is not None and shutil.which(FFMPEG_BINARY) is not None
+
+    def probe_sync(self, video_path: str) -> Dict[str, Any]:
+        """Duration, codec and dimensions of a video"""
+        completed = subprocess.run(
+            [FFPROBE_BINARY, "-v", "error", "-print_format", "json", "-show_format", "-show_streams", video_path],
+            capture_output=True, check=True, timeout=VIDEO_TOOL_TIMEOUT,
+        )
+        return video_info(json.loads(completed.stdout))
+
+    def poster_sync(self, video_path: str, poster_path: str, duration: Optional[float]) -> Optional[str]:
+        """Write one JPEG frame near the start of the video; None if no frame could be decoded"""
+        at = POSTER_AT_SECONDS if not duration else min(POSTER_AT_SECONDS, duration / 2)
+        subprocess.run(
+            [
+                FFMPEG_BINARY, "-v", "error", "-y",
+                # -ss before -i seeks in the demuxer, so only the frames around `at` are decoded
+                "-ss", f"{at:.3f}", "-i", video_path,
+                "-frames:v", "1",
+                "-vf", f"scale='min({POSTER_MAX_SIZE},iw)':'min({POSTER_MAX_SIZE},ih)':force_original_aspect_ratio=decrease",
+                "-q:v", "2",
+                poster_path,
+            ],
+            capture_output=True, check=True, timeout=VIDEO_TOOL_TIMEOUT,
+        )
+        return poster_path if os.path.exists(poster_path) and os.path.getsize(poster_path) > 0 else None
+
+    def extract_sync(self, video_path: str, poster_path: Optional[str]) -> VideoExtract:
+        info = self.probe_sync(video_path)
+        poster = None
+        if poster_path:
+            try:
+                poster = self.poster_sync(video_path, poster_path, info.get("duration"))
+            except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+                logger.warning(f"No poster frame for {video_path}: {e}")
+        return VideoExtract(info, poster)
+
+    async def extract(self, video_path: str, poster_path: Optional[str] = None) -> VideoExtract:
+        """Probe a video and, given a poster_path, write its poster frame there, on the extraction pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), self.extract_sync, video_path, poster_path)
+
+    def close(self):
+        """Shut down the extraction pool"""
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Global instance
+video_service = VideoService()
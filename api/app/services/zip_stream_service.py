@@ -0,0 +1,160 @@
+"""
+Streaming ZIP ingestion helpers.
+
+Bundle members are read straight out of the uploaded archive, hashed while
+they are read and handed to MinIO without being extracted to disk first.
+"""
+import hashlib
+import logging
+import os
+import zipfile
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+from minio import Minio
+
+logger = logging.getLogger(__name__)
+
+# Read size used when pulling bytes out of a ZIP member or an upload stream
+CHUNK_SIZE = 1024 * 1024
+
+
+class DigestMismatchError(Exception):
+    """Raised when streamed bytes do not match the SHA-256 declared for them"""
+
+    def __init__(self, name: str, expected: str, actual: str):
+        self.name = name
+        self.expected = expected
+        self.actual = actual
+        super().__init__(f"SHA-256 mismatch for '{name}': Expected {expected}, Got {actual}")
+
+
+class HashingReader:
+    """
+    Read-only file-like wrapper that hashes bytes as they pass through.
+
+    When an expected digest is given, the final read raises DigestMismatchError
+    instead of returning the last chunk, so a consumer such as
+    ``Minio.put_object`` aborts before the object is completed.
+    """
+
+    def __init__(self, raw: BinaryIO, length: int, name: str = "", expected_sha256: Optional[str] = None):
+        self._raw = raw
+        self._remaining = length
+        self._name = name
+        self._expected = expected_sha256.lower() if expected_sha256 else None
+        self._hash = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        if self._remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._raw.read(size)
+        self._hash.update(data)
+        self._remaining -= len(data)
+        if not data:
+            self._remaining = 0
+        if self._remaining == 0 and self._expected and self.hexdigest() != self._expected:
+            raise DigestMismatchError(self._name, self._expected, self.hexdigest())
+        return data
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def hash_stream(stream: BinaryIO) -> Tuple[str, int]:
+    """Hash a seekable stream from the start and rewind it. Returns (sha256, size)."""
+    sha256_hash = hashlib.sha256()
+    size = 0
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+        sha256_hash.update(chunk)
+        size += len(chunk)
+    stream.seek(0)
+    return sha256_hash.hexdigest(), size
+
+
+def list_members(zip_ref: zipfile.ZipFile) -> Dict[str, zipfile.ZipInfo]:
+    """Map normalised member paths to their ZipInfo, skipping directory entries"""
+    members = {}
+    for info in zip_ref.infolist():
+        if info.is_dir():
+            continue
+        members[info.filename.replace('\\', '/')] = info
+    return members
+
+
+def check_member_name(member_name: str) -> List[str]:
+    """
+    Split a member name into its path segments. Absolute paths and empty, '.'
+    or '..' segments are refused rather than normalised away, since 'a/../b'
+    would otherwise land on the same file or object as 'b'.
+    """
+    parts = member_name.replace('\\', '/').split('/')
+    if any(part in ("", ".", "..") for part in parts):
+        raise ValueError(f"Invalid ZIP member name: {member_name!r}")
+    return parts
+
+
+def _safe_member_path(dest_dir: str, member_name: str) -> str:
+    """Resolve a member name below dest_dir"""
+    return os.path.join(dest_dir, *check_member_name(member_name))
+
+
+def hash_member(zip_ref: zipfile.ZipFile, info: zipfile.ZipInfo) -> str:
+    """SHA-256 of a ZIP member, read straight out of the archive"""
+    sha256_hash = hashlib.sha256()
+    with zip_ref.open(info) as source:
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+            sha256_hash.update(chunk)
+    return sha256_hash.hexdigest()
+
+
+def extract_member(zip_ref: zipfile.ZipFile, info: zipfile.ZipInfo, dest_dir: str) -> Tuple[str, str]:
+    """Extract a single member below dest_dir, hashing it as it is written. Returns (path, sha256)."""
+    target_path = _safe_member_path(dest_dir, info.filename)
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    sha256_hash = hashlib.sha256()
+    with zip_ref.open(info) as source, open(target_path, "wb") as target:
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+            sha256_hash.update(chunk)
+            target.write(chunk)
+    return target_path, sha256_hash.hexdigest()
+
+
+def extract_members(zip_ref: zipfile.ZipFile, dest_dir: str) -> Dict[str, str]:
+    """Extract every file member below dest_dir. Returns {extracted path: sha256}."""
+    return dict(extract_member(zip_ref, info, dest_dir) for info in list_members(zip_ref).values())
+
+
+def put_member(
+    minio_client: Minio,
+    bucket: str,
+    object_name: str,
+    zip_ref: zipfile.ZipFile,
+    info: zipfile.ZipInfo,
+    expected_sha256: Optional[str] = None,
+    content_type: str = "application/octet-stream",
+    metadata: Optional[Dict[str, Any]] = None,
+    **put_options: Any,
+) -> Tuple[Any, str]:
+    """
+    Stream a ZIP member into MinIO, hashing it on the way.
+
+    Returns (ObjectWriteResult, sha256). If expected_sha256 is given and the
+    member does not match, DigestMismatchError is raised and the put is aborted.
+    Extra keyword arguments (e.g. part_size) are passed to put_object.
+    """
+    member_name = info.filename.replace('\\', '/')
+    with zip_ref.open(info) as source:
+        reader = HashingReader(source, info.file_size, member_name, expected_sha256)
+        result = minio_client.put_object(
+            bucket,
+            object_name,
+            reader,
+            length=info.file_size,
+            content_type=content_type,
+            metadata=metadata,
+            **put_options,
+        )
+    return result, reader.hexdigest()
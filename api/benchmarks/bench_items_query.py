@@ -0,0 +1,120 @@
+"""
+/api/v1/items benchmark: the previous ORM path (EvidenceFile objects, a lazy
+evidence_object load per parent, to_shape per row) against the joined,
+column-projected SELECT now used by the endpoint. The endpoint streams its
+response, so the joined timing includes encoding the whole body.
+
+    cd api && python -m benchmarks.bench_items_query [--sizes 1000,10000,100000] [--files-per-object 1]
+
+Needs the PostGIS database configured through the POSTGRES_* variables.
+Rows are seeded inside a transaction that is rolled back afterwards.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from geoalchemy2.shape import to_shape
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+from app.database import create_tables, engine
+from app.main import get_evidence_items
+from app.models import EvidenceFile, EvidenceObject
+
+
+class QueryCounter:
+    def __init__(self, connection):
+        self.count = 0
+        event.listen(connection, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+def seed(session: Session, rows: int, files_per_object: int):
+    start = datetime.utcnow() - timedelta(days=30)
+    objects, files = [], []
+    for i in range(0, rows, files_per_object):
+        object_id = uuid.uuid4()
+        created_at = start + timedelta(seconds=i)
+        objects.append({
+            "id": object_id, "object_name": f"bundles/{i}.zip", "sha256": f"{i:064x}",
+            "object_type": "proofmode_bundle", "created_at": created_at,
+        })
+        for j in range(min(files_per_object, rows - i)):
+            files.append({
+                "id": uuid.uuid4(), "object_id": object_id, "filename": f"IMG_{i + j}.jpg",
+                "sha256": f"{i + j:064x}", "mime_type": "image/jpeg", "size_bytes": 2_000_000,
+                "minio_object_name": f"media/{i + j:064x}.jpg", "created_at": created_at,
+                "geometry": f"SRID=4326;POINT({random.uniform(-180, 180)} {random.uniform(-85, 85)})",
+            })
+    for table, batch in ((EvidenceObject, objects), (EvidenceFile, files)):
+        for k in range(0, len(batch), 5000):
+            session.execute(insert(table), batch[k:k + 5000])
+    session.flush()
+
+
+def legacy_items(session: Session, limit: int):
+    """The pre-change loop, reproduced for comparison"""
+    features = []
+    for evidence_file in session.query(EvidenceFile).filter(EvidenceFile.geometry.isnot(None)).limit(limit).all():
+        point = to_shape(evidence_file.geometry)
+        features.append({
+            "coordinates": [point.x, point.y],
+            "created_at": evidence_file.evidence_object.created_at.isoformat() if evidence_file.evidence_object else None,
+            "object_type": evidence_file.evidence_object.object_type if evidence_file.evidence_object else None,
+        })
+    session.query(EvidenceFile).filter(EvidenceFile.geometry.isnot(None)).count()
+    return features
+
+
+def measure(counter: QueryCounter, fn):
+    counter.count = 0
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, counter.count, result
+
+
+async def streamed_items(session, rows):
+    # Called outside FastAPI, so every parameter with a Query/Header default is passed explicitly
+    response = await get_evidence_items(
+        limit=rows, offset=0, bbox=None, cursor=None, count="none",
+        captured_from=None, captured_to=None, object_type=None, mime_type=None, object_id=None,
+        if_none_match=None, db=session,
+    )
+    return json.loads(b"".join([chunk async for chunk in response.body_iterator]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--files-per-object", type=int, default=1,
+                        help="evidence files per evidence object (1 = worst case for the lazy loads)")
+    args = parser.parse_args()
+    create_tables()
+
+    print(f"{'rows':>8} {'path':<8} {'queries':>8} {'seconds':>9}")
+    for rows in (int(size) for size in args.sizes.split(",")):
+        with engine.connect() as connection:
+            transaction = connection.begin()
+            counter = QueryCounter(connection)
+            try:
+                session = Session(bind=connection)
+                seed(session, rows, args.files_per_object)
+                session.expunge_all()
+                seconds, queries, features = measure(counter, lambda: legacy_items(session, rows))
+                print(f"{rows:>8} {'legacy':<8} {queries:>8} {seconds:>9.3f}")
+                session.expunge_all()
+                seconds, queries, page = measure(counter, lambda: asyncio.run(streamed_items(session, rows)))
+                assert len(page["features"]) == len(features) == rows
+                print(f"{rows:>8} {'joined':<8} {queries:>8} {seconds:>9.3f}")
+            finally:
+                transaction.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Derivative benchmark: the previous inline path (a full decode + LANCZOS on the
+event loop for every pyramid level, one image at a time) against
+ThumbnailService.render_derivatives (one draft decode per image, each level
+resampled from the one above, on a process pool).
+
+    cd api && python -m benchmarks.bench_thumbnails [bundle_dir] [--copies N]
+
+bundle_dir defaults to ../test_proofmode_data. Its sample JPEG is a text
+placeholder, so when the directory holds no decodable images a 48 MP JPEG is
+synthesised and benchmarked instead.
+"""
+import argparse
+import asyncio
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import time
+
+from PIL import Image, UnidentifiedImageError
+
+from app.services.thumbnail_service import DERIVATIVE_FORMATS, DERIVATIVE_SIZES, ENCODINGS, ThumbnailService
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def legacy_derivatives(image_path: str):
+    """The pre-pool implementation: full-size decode, LANCZOS, encode, hash, once per level"""
+    digests = []
+    for size in DERIVATIVE_SIZES:
+        with Image.open(image_path) as img:
+            if img.mode != "RGB":
+                img = img.convert("RGB")
+            img.thumbnail((size, size), Image.Resampling.LANCZOS)
+            for fmt in DERIVATIVE_FORMATS:
+                encoder, _, _, options = ENCODINGS[fmt]
+                buffer = io.BytesIO()
+                img.save(buffer, encoder, **options)
+                digests.append(hashlib.sha256(buffer.getvalue()).hexdigest())
+    return digests
+
+
+def decodable_images(bundle_dir: str):
+    images = []
+    for root, _, files in os.walk(bundle_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            if os.path.splitext(name)[1].lower() not in IMAGE_EXTENSIONS:
+                continue
+            try:
+                with Image.open(path) as img:
+                    img.verify()
+                images.append(path)
+            except (UnidentifiedImageError, OSError):
+                print(f"skipping {path}: not a decodable image")
+    return images
+
+
+def synthesise_photo(path: str, size=(8000, 6000)):
+    """A noisy 48 MP JPEG; noise keeps the encoder from compressing it to nothing"""
+    tile = Image.effect_noise((1000, 1000), 64).convert("RGB")
+    img = Image.new("RGB", size)
+    for x in range(0, size[0], tile.width):
+        for y in range(0, size[1], tile.height):
+            img.paste(tile, (x, y))
+    img.save(path, "JPEG", quality=92)
+
+
+async def run_service(paths, workers):
+    service = ThumbnailService(max_workers=workers)
+    try:
+        # Warm the pool so process start-up is not billed to the first image
+        await service.render_derivatives(paths[0])
+        start = time.perf_counter()
+        await asyncio.gather(*(service.render_derivatives(path) for path in paths))
+        return time.perf_counter() - start
+    finally:
+        service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("bundle_dir", nargs="?", default=os.path.join(os.path.dirname(__file__), "..", "..", "test_proofmode_data"))
+    parser.add_argument("--copies", type=int, default=8, help="images per run (the bundle's images are repeated)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        sources = decodable_images(args.bundle_dir)
+        if not sources:
+            synthetic = os.path.join(temp_dir, "synthetic_48mp.jpg")
+            synthesise_photo(synthetic)
+            sources = [synthetic]
+        paths = []
+        for i in range(args.copies):
+            source = sources[i % len(sources)]
+            path = os.path.join(temp_dir, f"{i}_{os.path.basename(source)}")
+            shutil.copyfile(source, path)
+            paths.append(path)
+
+        start = time.perf_counter()
+        for path in paths:
+            legacy_derivatives(path)
+        legacy = time.perf_counter() - start
+        pooled = asyncio.run(run_service(paths, args.workers))
+
+    print(f"{len(paths)} images, {args.workers} workers")
+    print(f"legacy inline:  {legacy:.2f}s ({legacy / len(paths) * 1000:.0f} ms/image)")
+    print(f"process pool:   {pooled:.2f}s ({pooled / len(paths) * 1000:.0f} ms/image)")
+    print(f"speed-up:       {legacy / pooled:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Shared fixtures. Service tests run against in-memory SQLite, so the
+PostgreSQL-only column types used by the models are rendered as plain types.
+"""
+import shutil
+
+import gnupg
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_as_json(element, compiler, **kw):
+    return "JSON"
+
+
+@compiles(UUID, "sqlite")
+def _uuid_as_char(element, compiler, **kw):
+    return "CHAR(32)"
+
+
+@pytest.fixture
+def sqlite_session_factory():
+    """Return a factory that creates the given model tables in a fresh in-memory database"""
+    sessions = []
+
+    def make(*models):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        for model in models:
+            model.__table__.create(engine)
+        session = sessionmaker(bind=engine)()
+        sessions.append(session)
+        return session
+
+    yield make
+    for session in sessions:
+        session.close()
+
+
+@pytest.fixture
+def signed_bundle(tmp_path):
+    """A ProofMode-like directory: media, JSON, detached signatures and pubkey.asc"""
+    if shutil.which("gpg") is None:
+        pytest.skip("gpg binary not installed")
+    (tmp_path / "signer").mkdir(mode=0o700)
+    signer = gnupg.GPG(gnupghome=str(tmp_path / "signer"))
+    key = signer.gen_key(signer.gen_key_input(
+        key_type="RSA", key_length=2048, name_email="device@proofmode.test", no_protection=True
+    ))
+    bundle = tmp_path / "bundle"
+    bundle.mkdir()
+    (bundle / "pubkey.asc").write_text(signer.export_keys(key.fingerprint))
+    for name, data in (("1746004259789.jpg", b"\xff\xd8jpeg"), ("1746004259789.json", b'{"Latitude": 1}')):
+        (bundle / name).write_bytes(data)
+        signature = signer.sign(data, keyid=key.fingerprint, detach=True)
+        (bundle / f"{name}.asc").write_bytes(signature.data)
+    return bundle, key.fingerprint
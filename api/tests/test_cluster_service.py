@@ -0,0 +1,38 @@
+import math
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.main import build_items_query
+from app.services.cluster_service import (
+    CLUSTER_MAX_CELLS,
+    HALF_WORLD,
+    cluster_query,
+    grid_size,
+    mercator,
+)
+
+
+def test_grid_stays_bounded_at_any_zoom():
+    assert grid_size(0) == 2 * HALF_WORLD / 4
+    for zoom in range(0, 23):
+        size = grid_size(zoom)
+        assert math.ceil(2 * HALF_WORLD / size) ** 2 <= CLUSTER_MAX_CELLS
+
+    city = (4.8, 52.3, 4.95, 52.42)
+    assert grid_size(14, city) == 2 * HALF_WORLD / (2 ** 14 * 4)
+    min_x, min_y = mercator(*city[:2])
+    max_x, max_y = mercator(*city[2:])
+    size = grid_size(22, city)
+    assert math.ceil((max_x - min_x) / size) * math.ceil((max_y - min_y) / size) <= CLUSTER_MAX_CELLS
+
+
+def test_clusters_group_the_filtered_items_on_a_snapped_grid():
+    items = build_items_query(Session(), "4.8,52.3,4.9,52.4")
+
+    sql = str(cluster_query(items, 1000.0).statement.compile(dialect=postgresql.dialect()))
+
+    assert "ST_SnapToGrid(ST_Transform(ST_SetSRID(ST_MakePoint(" in sql
+    assert "GROUP BY ST_SnapToGrid" in sql
+    assert "ST_Intersects" in sql
+    assert "count(*)" in sql
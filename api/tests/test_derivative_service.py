@@ -0,0 +1,98 @@
+import asyncio
+import hashlib
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from fastapi.testclient import TestClient
+from minio import Minio
+from PIL import Image
+
+import app.main as main
+from app.database import get_db
+from app.models import EvidenceDerivative
+from app.services.derivative_service import DerivativeService
+from app.services.thumbnail_service import ThumbnailService
+
+
+class RecordingMinio:
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, bucket, object_name, data, length, **kwargs):
+        self.objects[object_name] = (data.read(), kwargs["content_type"])
+        return SimpleNamespace(version_id=f"v-{object_name}", etag="etag")
+
+
+def test_store_renders_and_puts_full_pyramid(tmp_path):
+    path = tmp_path / "photo.jpg"
+    Image.new("RGB", (2000, 1500), (10, 120, 200)).save(path, "JPEG")
+    minio = RecordingMinio()
+    renderer = ThumbnailService(max_workers=0)
+    service = DerivativeService(renderer)
+
+    try:
+        stored = asyncio.run(service.store(minio, "evidence", str(path), "ab" * 32, "upload-1"))
+    finally:
+        renderer.close()
+
+    assert {(d["size"], d["format"], d["width"], d["height"]) for d in stored} == {
+        (size, fmt, size, size * 3 // 4) for size in (128, 512, 1024) for fmt in ("webp", "jpeg")
+    }
+    for derivative in stored:
+        data, content_type = minio.objects[derivative["object_name"]]
+        assert hashlib.sha256(data).hexdigest() == derivative["sha256"]
+        assert content_type == derivative["content_type"]
+    assert "derivatives/" + "ab" * 32 + "/512.webp" in minio.objects
+
+
+def derivative(width, fmt="webp", size_bytes=1000):
+    return EvidenceDerivative(size=width, format=fmt, width=width, height=width, size_bytes=size_bytes)
+
+
+def test_closest_picks_smallest_rendition_that_fills_the_width():
+    derivatives = [derivative(w, fmt) for w in (128, 512, 1024) for fmt in ("webp", "jpeg")]
+
+    assert (DerivativeService.closest(derivatives, 300).width, DerivativeService.closest(derivatives, 300).format) == (512, "webp")
+    assert DerivativeService.closest(derivatives, 100, "jpeg").width == 128
+    assert DerivativeService.closest(derivatives, 4000).width == 1024
+    assert DerivativeService.closest(derivatives, 300, "avif").width == 512
+    assert DerivativeService.closest([], 300) is None
+
+
+def test_existing_only_returns_complete_pyramids(sqlite_session_factory):
+    db = sqlite_session_factory(EvidenceDerivative)
+    service = DerivativeService()
+    for sha, sizes in (("a" * 64, (128, 512, 1024)), ("b" * 64, (128, 512))):
+        for size in sizes:
+            for fmt in ("webp", "jpeg"):
+                db.add(EvidenceDerivative(
+                    evidence_file_id=uuid.uuid4(), size=size, format=fmt, width=size, height=size,
+                    object_name=service.object_name(sha, size, fmt), sha256="c" * 64,
+                    size_bytes=10, content_type=f"image/{fmt}"
+                ))
+    db.commit()
+
+    existing = service.existing(db, ["a" * 64, "b" * 64])
+
+    assert list(existing) == ["a" * 64]
+    assert len(existing["a" * 64]) == 6 and all(d["deduplicated"] for d in existing["a" * 64])
+
+
+def test_only_images_fall_back_to_the_original(monkeypatch):
+    files = {}
+    db = MagicMock()
+    db.query.return_value.filter.return_value.one_or_none.side_effect = lambda: files["current"]
+    monkeypatch.setattr(main, "minio_client_external", Minio("localhost:9000", "key", "secret", region="us-east-1"))
+    main.app.dependency_overrides[get_db] = lambda: db
+    try:
+        client = TestClient(main.app)
+        files["current"] = SimpleNamespace(derivatives=[], minio_object_name="a/photo.jpg", mime_type="image/jpeg", size_bytes=10)
+        image = client.get(f"/api/v1/evidence/files/{uuid.uuid4()}/derivative")
+        files["current"] = SimpleNamespace(derivatives=[], minio_object_name="a/clip.mp4", mime_type="video/mp4", size_bytes=10)
+        video = client.get(f"/api/v1/evidence/files/{uuid.uuid4()}/derivative")
+    finally:
+        main.app.dependency_overrides.clear()
+
+    assert image.status_code == 200 and image.json()["original"]
+    assert video.status_code == 404
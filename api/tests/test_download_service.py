@@ -0,0 +1,108 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.models import EvidenceAccessLog
+from app.services.download_service import AccessLogWriter, RangeNotSatisfiable, parse_range, stream_object
+
+
+class ObjectResponse:
+    """Stand-in for the urllib3 response returned by Minio.get_object"""
+
+    def __init__(self, data):
+        self.data = data
+        self.closed = self.released = False
+
+    def stream(self, amt):
+        for i in range(0, len(self.data), amt):
+            yield self.data[i:i + amt]
+
+    def close(self):
+        self.closed = True
+
+    def release_conn(self):
+        self.released = True
+
+
+class FakeMinio:
+    def __init__(self, objects):
+        self.objects = objects
+        self.reads = []
+
+    def stat_object(self, bucket, object_name):
+        data = self.objects[object_name]
+        return SimpleNamespace(size=len(data), etag="abc123", version_id="v1", content_type="video/mp4")
+
+    def get_object(self, bucket, object_name, offset=0, length=0):
+        self.reads.append((offset, length))
+        return ObjectResponse(self.objects[object_name][offset:offset + length])
+
+
+def test_parse_range_follows_rfc_9110():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("bytes=9-0", 100) is None
+    assert parse_range("items=0-1", 100) is None
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range("bytes=100-", 100)
+
+
+def test_stream_reports_bytes_sent_and_early_disconnects():
+    finished = []
+    response = ObjectResponse(b"x" * 10)
+
+    assert b"".join(stream_object(response, lambda *args: finished.append(args), chunk_size=4)) == b"x" * 10
+    partial = stream_object(ObjectResponse(b"x" * 10), lambda *args: finished.append(args), chunk_size=4)
+    next(partial)
+    partial.close()
+
+    assert finished == [(10, True), (4, False)]
+    assert response.closed and response.released
+
+
+def test_access_log_batches_and_keeps_records_when_the_insert_fails(sqlite_session_factory):
+    session = sqlite_session_factory(EvidenceAccessLog)
+    writer = AccessLogWriter(session_factory=lambda: session, max_pending=3)
+    for i in range(4):
+        writer.record(object_name=f"media/{i}.mp4", bytes_sent=i, status_code=200, completed=True)
+
+    assert writer.stats() == {"pending": 3, "written": 0, "dropped": 1}
+    assert writer.flush() == 3
+    assert [row.object_name for row in session.query(EvidenceAccessLog).order_by(EvidenceAccessLog.id)] == [
+        "media/1.mp4", "media/2.mp4", "media/3.mp4"
+    ]
+
+    broken = AccessLogWriter(session_factory=lambda: sqlite_session_factory())
+    broken.record(object_name="media/x.mp4", bytes_sent=0, status_code=200, completed=True)
+    assert broken.flush() == 0
+    assert broken.stats()["pending"] == 1
+
+
+def test_download_proxy_serves_ranges_and_logs_each_access(monkeypatch):
+    minio = FakeMinio({"media/clip.mp4": bytes(range(256)) * 4})
+    records = []
+    monkeypatch.setattr(main, "minio_client", minio)
+    monkeypatch.setattr(main.access_log, "record", lambda **fields: records.append(fields))
+    client = TestClient(main.app)
+
+    ranged = client.get("/api/v1/download/media/clip.mp4", headers={"Range": "bytes=1000-"})
+    whole = client.get("/api/v1/download/media/clip.mp4")
+    stale = client.get("/api/v1/download/media/clip.mp4", headers={"Range": "bytes=0-9", "If-Range": '"old"'})
+    beyond = client.get("/api/v1/download/media/clip.mp4", headers={"Range": "bytes=5000-"})
+
+    assert ranged.status_code == 206
+    assert ranged.content == (bytes(range(256)) * 4)[1000:]
+    assert ranged.headers["content-range"] == "bytes 1000-1023/1024"
+    assert whole.status_code == 200 and len(whole.content) == 1024
+    assert stale.status_code == 200
+    assert beyond.status_code == 416 and beyond.headers["content-range"] == "bytes */1024"
+    assert minio.reads == [(1000, 24), (0, 1024), (0, 1024)]
+    assert [(r["status_code"], r["range_start"], r["bytes_sent"], r["completed"]) for r in records] == [
+        (206, 1000, 24, True), (200, None, 1024, True), (200, None, 1024, True), (416, None, 0, True)
+    ]
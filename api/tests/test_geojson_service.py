@@ -0,0 +1,56 @@
+import json
+import tracemalloc
+
+from app.services.geojson_service import stream_feature_collection
+
+
+class Rows:
+    """Stand-in for a server-side cursor result"""
+
+    def __init__(self, count):
+        self.count = count
+        self.closed = False
+
+    def __iter__(self):
+        return iter(range(self.count))
+
+    def close(self):
+        self.closed = True
+
+
+def feature(row):
+    return {"type": "Feature", "geometry": {"type": "Point", "coordinates": [row / 1000, 52.0]},
+            "properties": {"id": f"id-{row}", "sha256": "a" * 64}}
+
+
+def metadata(last, has_more, returned):
+    return {"returned_count": returned, "next_cursor": f"after-{last}" if has_more else None}
+
+
+def test_stream_is_a_valid_feature_collection_with_page_metadata():
+    rows = Rows(5)
+
+    body = b"".join(stream_feature_collection(rows, feature, metadata, limit=3))
+
+    collection = json.loads(body)
+    assert [f["properties"]["id"] for f in collection["features"]] == ["id-0", "id-1", "id-2"]
+    assert collection["metadata"] == {"returned_count": 3, "next_cursor": "after-2"}
+    assert rows.closed
+    assert json.loads(b"".join(stream_feature_collection(Rows(0), feature, metadata, limit=3))) == {
+        "type": "FeatureCollection", "features": [], "metadata": {"returned_count": 0, "next_cursor": None}
+    }
+
+
+def test_peak_memory_does_not_grow_with_feature_count():
+    def peak(count):
+        tracemalloc.start()
+        total = sum(len(chunk) for chunk in stream_feature_collection(Rows(count), feature, metadata, limit=count))
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return total, peak_bytes
+
+    small_size, small_peak = peak(2_000)
+    large_size, large_peak = peak(100_000)
+
+    assert large_size > 40 * small_size
+    assert large_peak < 2 * small_peak + 256 * 1024
@@ -0,0 +1,48 @@
+import asyncio
+import hashlib
+
+from app.services import hashing_service as hashing_module
+from app.services.hashing_service import DigestCache, HashingService, sha256_file_sync
+
+
+def test_sha256_file_sync_matches_hashlib(tmp_path, monkeypatch):
+    data = b"x" * (3 * 1024 * 1024 + 17)
+    path = tmp_path / "large.bin"
+    path.write_bytes(data)
+    expected = hashlib.sha256(data).hexdigest()
+
+    assert sha256_file_sync(str(path)) == expected
+    # Same digest through the memory-mapped path
+    monkeypatch.setattr(hashing_module, "MMAP_THRESHOLD", 1)
+    assert sha256_file_sync(str(path)) == expected
+
+
+def test_sha256_files_hashes_in_parallel(tmp_path):
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"member{i}.jpg"
+        path.write_bytes(bytes([i]) * 1000)
+        paths.append(str(path))
+
+    service = HashingService(max_workers=3)
+    try:
+        digests = asyncio.run(service.sha256_files(paths))
+    finally:
+        service.close()
+
+    assert digests == {p: hashlib.sha256(open(p, "rb").read()).hexdigest() for p in paths}
+
+
+def test_digest_cache_reuses_seeded_digests(tmp_path):
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(b"original")
+    cache = DigestCache()
+    cache.seed({str(path): "seeded"})
+
+    assert asyncio.run(cache.sha256(str(path))) == "seeded"
+    assert (cache.hits, cache.misses) == (1, 0)
+
+    # A rewrite changes size/mtime, so the file is hashed again
+    path.write_bytes(b"rewritten bytes")
+    assert asyncio.run(cache.sha256(str(path))) == hashlib.sha256(b"rewritten bytes").hexdigest()
+    assert cache.misses == 1
@@ -0,0 +1,183 @@
+import asyncio
+import json
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from immudb.rootService import State
+
+import app.main as main
+from app.database import get_db
+from app.models import EvidenceObject
+from app.services.immudb_service import ImmudbService, LedgerWriter, TrustedState
+
+
+class FakeImmudb:
+    """Records each committed batch as one transaction"""
+
+    def __init__(self, fail=False, latency=0.0):
+        self.fail = fail
+        self.latency = latency
+        self.batches = []
+        self.store = {}
+
+    def commit(self, kv):
+        time.sleep(self.latency)
+        if self.fail:
+            raise ConnectionError("immudb unavailable")
+        self.batches.append(dict(kv))
+        self.store.update(kv)
+        return len(self.batches)
+
+
+class FakeStateService:
+    """The CurrentState call of the immudb gRPC stub"""
+
+    def __init__(self, tx_id):
+        self.tx_id = tx_id
+
+    def CurrentState(self, request):
+        return SimpleNamespace(
+            db="defaultdb", txId=self.tx_id, txHash=b"\x01" * 32,
+            signature=SimpleNamespace(publicKey=b"", signature=b""),
+        )
+
+
+def test_burst_is_written_in_few_batches():
+    client = FakeImmudb(latency=0.01)
+    writer = LedgerWriter(client.commit, batch_size=50, max_delay=0.05)
+    try:
+        futures = [writer.submit(f"evidence:{i}".encode(), b"{}") for i in range(120)]
+        tx_ids = [future.result(timeout=5) for future in futures]
+    finally:
+        writer.close()
+
+    assert sum(len(batch) for batch in client.batches) == 120
+    assert len(client.batches) <= 4
+    assert max(len(batch) for batch in client.batches) == 50
+    # Each caller gets the transaction its entry was committed in
+    assert tx_ids[0] == "1" and tx_ids[-1] == str(len(client.batches))
+
+
+def test_repeated_key_waits_for_the_next_transaction():
+    client = FakeImmudb()
+    writer = LedgerWriter(client.commit, batch_size=10, max_delay=0.05)
+    try:
+        first = writer.submit(b"evidence:a", b"1")
+        second = writer.submit(b"evidence:a", b"2")
+        assert first.result(timeout=5) != second.result(timeout=5)
+    finally:
+        writer.close()
+
+    assert client.store[b"evidence:a"] == b"2"
+
+
+def test_failed_batch_fails_every_caller_and_reconnects():
+    client = FakeImmudb(fail=True)
+    resets = []
+    writer = LedgerWriter(client.commit, on_error=lambda: resets.append(True), max_delay=0.05)
+    try:
+        futures = [writer.submit(f"evidence:{i}".encode(), b"{}") for i in range(3)]
+        for future in futures:
+            with pytest.raises(ConnectionError):
+                future.result(timeout=5)
+    finally:
+        writer.close()
+
+    assert resets
+    assert writer.stats()["entries"] == 0
+
+
+def test_close_writes_queued_entries_then_refuses_new_ones():
+    client = FakeImmudb()
+    writer = LedgerWriter(client.commit, max_delay=10)
+    future = writer.submit(b"evidence:x", b"{}")
+
+    writer.close()
+
+    assert future.result(timeout=0) == "1"
+    with pytest.raises(RuntimeError):
+        writer.submit(b"evidence:y", b"{}")
+
+
+def test_concurrent_uploads_share_a_transaction(tmp_path):
+    client = FakeImmudb()
+    service = ImmudbService(state_file=str(tmp_path / "state.json"))
+    service.ledger = LedgerWriter(client.commit)
+
+    async def upload():
+        return await service.write_evidence_transaction(
+            uuid4(), "ab" * 32, "v1", datetime(2025, 1, 1), {"filename": "a.jpg"}
+        )
+
+    async def burst():
+        return await asyncio.gather(*(upload() for _ in range(20)))
+
+    try:
+        tx_ids = asyncio.run(burst())
+    finally:
+        service.close()
+
+    assert set(tx_ids) == {"1"}
+    entry = json.loads(next(iter(client.batches[0].values())))
+    assert entry["type"] == "evidence_upload" and entry["filename"] == "a.jpg"
+
+
+def test_trusted_state_survives_restarts(tmp_path):
+    path = str(tmp_path / "state" / "immudb.json")
+    first = TrustedState(path, "immudb:3322")
+    first.init("immudb:3322/defaultdb", FakeStateService(tx_id=7))
+    assert first.get().txId == 7
+    first.set(State(db="defaultdb", txId=42, txHash=b"\x02" * 32, publicKey=b"", signature=b"\x03"))
+
+    # Another ledger's state lives next to it; a restart resumes from the verified tx, not the server's
+    TrustedState(path, "other:3322").init(b"defaultdb", FakeStateService(tx_id=1))
+    restarted = TrustedState(path, "immudb:3322")
+    restarted.init(b"defaultdb", FakeStateService(tx_id=99))
+
+    assert restarted.get() == State(db="defaultdb", txId=42, txHash=b"\x02" * 32, publicKey=b"", signature=b"\x03")
+
+
+def test_trusted_state_is_kept_per_database(tmp_path):
+    state = TrustedState(str(tmp_path / "immudb.json"), "immudb:3322")
+    state.init("immudb:3322/defaultdb", FakeStateService(tx_id=42))
+    state.init(b"evidence", FakeStateService(tx_id=5))
+    assert state.get().txId == 5
+
+    # Switching back reloads the database's own state instead of keeping the last one
+    state.init(b"defaultdb", FakeStateService(tx_id=99))
+    assert state.get().txId == 42
+
+
+def test_proof_endpoint_reports_the_ledger_entry(sqlite_session_factory, monkeypatch):
+    db = sqlite_session_factory(EvidenceObject)
+    evidence = EvidenceObject(
+        object_name="bundles/a.zip", sha256="a" * 64, object_type="general_upload", immudb_tx_id="12"
+    )
+    db.add(evidence)
+    db.commit()
+    entries = {evidence.id: {"sha256": "a" * 64, "type": "evidence_upload"}}
+
+    async def evidence_proof(object_id):
+        if object_id not in entries:
+            return None
+        return {"key": f"evidence:{object_id}", "value": json.dumps(entries[object_id]), "tx_id": 12, "verified": True}
+
+    monkeypatch.setattr(main.immudb_service, "evidence_proof", evidence_proof)
+    main.app.dependency_overrides[get_db] = lambda: db
+    try:
+        client = TestClient(main.app)
+        found = client.get(f"/api/v1/evidence/{evidence.id}/proof")
+        entries.clear()
+        missing = client.get(f"/api/v1/evidence/{evidence.id}/proof")
+    finally:
+        main.app.dependency_overrides.clear()
+
+    assert found.status_code == 200
+    body = found.json()
+    assert body["entry"]["sha256"] == "a" * 64 and body["matches_database"]
+    assert body["tx_id"] == 12 and body["recorded_tx_id"] == "12"
+    assert missing.status_code == 404
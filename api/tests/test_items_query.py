@@ -0,0 +1,68 @@
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.main import build_items_query, item_feature
+
+Row = namedtuple("Row", "id object_id filename sha256 captured_at mime_type size_bytes minio_object_name "
+                        "created_at object_created_at object_type lon lat")
+
+
+def test_items_are_one_joined_select_with_postgis_coordinates():
+    sql = str(build_items_query(Session(), "4.8,52.3,4.9,52.4").statement.compile(dialect=postgresql.dialect()))
+
+    assert sql.count("SELECT") == 1
+    assert "LEFT OUTER JOIN evidence_objects" in sql
+    assert "ST_X(CAST(evidence_files.geometry AS geometry(POINT,4326)))" in sql
+    assert "ST_Intersects" in sql
+
+
+def test_filters_are_pushed_down_into_the_where_clause():
+    object_id = uuid4()
+    query = build_items_query(
+        Session(),
+        captured_from=datetime(2025, 4, 30, 12, tzinfo=timezone(timedelta(hours=2))),
+        captured_to=datetime(2025, 5, 1),
+        object_type="proofmode_bundle",
+        mime_type="image/",
+        object_id=object_id,
+    )
+
+    compiled = query.statement.compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+
+    assert "evidence_files.captured_at >= %(captured_at_1)s" in sql
+    assert "evidence_files.captured_at < %(captured_at_2)s" in sql
+    assert "evidence_objects.object_type = %(object_type_1)s" in sql
+    assert "evidence_files.mime_type LIKE" in sql
+    assert "evidence_files.object_id = %(object_id_1)s" in sql
+    assert compiled.params["captured_at_1"] == datetime(2025, 4, 30, 10)
+    assert compiled.params["mime_type_1"] == "image//"  # "/" doubles as the LIKE escape character
+    exact = str(build_items_query(Session(), mime_type="image/jpeg").statement.compile(dialect=postgresql.dialect()))
+    assert "evidence_files.mime_type = " in exact
+
+
+def test_empty_capture_window_is_rejected():
+    with pytest.raises(HTTPException) as exc:
+        build_items_query(Session(), captured_from=datetime(2025, 5, 1), captured_to=datetime(2025, 4, 30))
+
+    assert exc.value.status_code == 400
+
+
+def test_item_feature_builds_geojson_from_projected_row():
+    created = datetime(2025, 4, 30, 9, 11)
+    row = Row(uuid4(), uuid4(), "IMG_1.jpg", "a" * 64, None, "image/jpeg", 78, "media/a.jpg",
+              created, created, "proofmode_bundle", 4.8364, 52.3734)
+
+    feature = item_feature(row)
+
+    assert feature["geometry"] == {"type": "Point", "coordinates": [4.8364, 52.3734]}
+    assert feature["properties"]["created_at"] == "2025-04-30T09:11:00"
+    assert feature["properties"]["object_type"] == "proofmode_bundle"
+    orphan = item_feature(row._replace(object_created_at=None, object_type=None, lon=None, lat=None))
+    assert orphan["geometry"] is None and orphan["properties"]["created_at"] is None
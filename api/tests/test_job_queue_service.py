@@ -0,0 +1,103 @@
+import asyncio
+import io
+import os
+import threading
+
+from sqlalchemy.orm import sessionmaker
+
+from app.models import IngestionJob
+from app.services.job_queue_service import IngestionQueue, PermanentJobError
+
+
+def make_queue(sqlite_session_factory, tmp_path, **options):
+    db = sqlite_session_factory(IngestionJob)
+    factory = sessionmaker(bind=db.get_bind())
+    return IngestionQueue(session_factory=factory, workers=0, spool_dir=str(tmp_path), **options), db
+
+
+def test_job_runs_pipeline_and_reports_progress(sqlite_session_factory, tmp_path):
+    queue, db = make_queue(sqlite_session_factory, tmp_path)
+    reports = []
+    report = queue.report
+
+    def recording_report(job_id, stage, progress):
+        # Progress is written off the event loop
+        reports.append((stage, progress, threading.current_thread() is threading.main_thread()))
+        report(job_id, stage, progress)
+
+    queue.report = recording_report
+
+    async def handler(job, session, progress):
+        progress("storing", 50)
+        progress("indexing", 80)
+        return {"id": "evidence-1", "size": os.path.getsize(job.spool_path)}
+
+    queue.register("general", handler)
+    spool_path, sha256, size = queue.spool(io.BytesIO(b"field video"))
+    job = queue.enqueue(db, "general", spool_path, "clip.mp4", sha256=sha256, size_bytes=size)
+
+    claimed = queue.claim(db)
+    assert claimed.id == job.id and claimed.status == "running"
+    assert queue.claim(db) is None
+
+    asyncio.run(queue.process(job.id))
+    db.expire_all()
+    finished = queue.get(db, job.id)
+    assert reports == [("storing", 50, False), ("indexing", 80, False)]
+    assert (finished.status, finished.progress) == ("completed", 100)
+    assert finished.result == {"id": "evidence-1", "size": 11}
+    assert not os.path.exists(spool_path)
+
+
+def test_transient_failures_are_retried_permanent_ones_are_not(sqlite_session_factory, tmp_path):
+    queue, db = make_queue(sqlite_session_factory, tmp_path)
+    errors = [RuntimeError("minio unavailable"), PermanentJobError("bad signature")]
+
+    async def handler(job, session, progress):
+        raise errors.pop(0)
+
+    queue.register("proofmode", handler)
+    spool_path, sha256, size = queue.spool(io.BytesIO(b"zip"))
+    job = queue.enqueue(db, "proofmode", spool_path, "bundle.zip", sha256=sha256, size_bytes=size)
+
+    queue.claim(db)
+    asyncio.run(queue.process(job.id))
+    db.expire_all()
+    assert queue.get(db, job.id).status == "queued"
+
+    queue.claim(db)
+    asyncio.run(queue.process(job.id))
+    db.expire_all()
+    failed = queue.get(db, job.id)
+    assert (failed.status, failed.error, failed.attempts) == ("failed", "bad signature", 2)
+
+
+def test_jobs_are_only_claimed_on_the_spooling_node(sqlite_session_factory, tmp_path):
+    queue, db = make_queue(sqlite_session_factory, tmp_path, node="api-1")
+    queue.register("general", lambda job, session, progress: None)
+    spool_path, sha256, size = queue.spool(io.BytesIO(b"photo"))
+    job = queue.enqueue(db, "general", spool_path, "a.jpg", sha256=sha256, size_bytes=size)
+
+    other = IngestionQueue(session_factory=sessionmaker(bind=db.get_bind()), workers=0, node="api-2")
+    assert other.claim(db) is None
+    assert queue.claim(db).id == job.id
+
+
+def test_heartbeat_keeps_a_long_stage_from_going_stale(sqlite_session_factory, tmp_path):
+    queue, db = make_queue(sqlite_session_factory, tmp_path, heartbeat_interval=0.05)
+    beats = []
+
+    async def handler(job, session, progress):
+        for _ in range(3):
+            await asyncio.sleep(0.2)
+            session.expire_all()
+            beats.append(queue.get(session, job.id).updated_at)
+        return {}
+
+    queue.register("general", handler)
+    spool_path, sha256, size = queue.spool(io.BytesIO(b"long video"))
+    job = queue.enqueue(db, "general", spool_path, "clip.mp4", sha256=sha256, size_bytes=size)
+    queue.claim(db)
+    asyncio.run(queue.process(job.id))
+
+    assert beats == sorted(beats) and len(set(beats)) == 3
@@ -0,0 +1,45 @@
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from app.services.pagination_service import CountCache, InvalidCursorError, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trips_and_rejects_garbage():
+    created_at, row_id = datetime(2025, 4, 30, 11, 11, 4, 476000), uuid4()
+
+    cursor = encode_cursor(created_at, row_id)
+
+    assert "=" not in cursor and "/" not in cursor
+    assert decode_cursor(cursor) == (created_at, row_id)
+    for bad in ("not-a-cursor", encode_cursor(created_at, row_id)[:-6]):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(bad)
+
+
+class CountingQuery:
+    def __init__(self, total):
+        self.total = total
+        self.calls = 0
+
+    def order_by(self, *args):
+        return self
+
+    def count(self):
+        self.calls += 1
+        return self.total
+
+
+def test_exact_counts_are_cached_per_filter_until_ttl(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("app.services.pagination_service.time.monotonic", lambda: clock[0])
+    cache = CountCache(ttl=60)
+    world, city = CountingQuery(500), CountingQuery(12)
+
+    assert cache.count(("items", None), world) == 500
+    assert cache.count(("items", None), world) == 500
+    assert cache.count(("items", "4.8,52.3,4.9,52.4"), city) == 12
+    clock[0] += 61
+    assert cache.count(("items", None), world) == 500
+    assert (world.calls, city.calls) == (2, 1)
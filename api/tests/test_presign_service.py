@@ -0,0 +1,34 @@
+from datetime import timedelta
+
+from minio import Minio
+
+from app.services.presign_service import PresignCache
+
+# With a fixed region minio-py signs locally, so no server is needed
+client = Minio("localhost:9000", access_key="minioadmin", secret_key="minioadmin", secure=False, region="us-east-1")
+
+
+def test_urls_are_reused_until_close_to_expiry(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("app.services.presign_service.time.monotonic", lambda: clock[0])
+    cache = PresignCache(expiry=timedelta(minutes=15), refresh_margin=timedelta(minutes=3))
+
+    first = cache.get(client, "evidence", "media/a.jpg")
+    clock[0] += 11 * 60
+    assert cache.get(client, "evidence", "media/a.jpg") is first
+
+    clock[0] += 2 * 60
+    renewed = cache.get(client, "evidence", "media/a.jpg")
+    assert renewed is not first
+    assert "X-Amz-Expires=900" in renewed.url and "media/a.jpg" in renewed.url
+    assert cache.stats() == {"hits": 1, "misses": 2, "urls": 1}
+
+
+def test_batches_dedupe_and_the_cache_is_bounded():
+    cache = PresignCache(max_entries=2)
+
+    urls = cache.get_many(client, "evidence", ["media/a.jpg", "media/b.jpg", "media/a.jpg", "media/c.jpg"])
+
+    assert list(urls) == ["media/a.jpg", "media/b.jpg", "media/c.jpg"]
+    assert len({url.url for url in urls.values()}) == 3
+    assert cache.stats()["urls"] == 2
@@ -0,0 +1,57 @@
+import asyncio
+import hashlib
+import json
+
+from app.main import index_proofmode_sidecars, parse_proofmode_contents
+
+
+def test_media_are_matched_to_sidecars_by_name_and_hash(tmp_path):
+    photos = {f"IMG_{i}.jpg": bytes([i]) * 10 for i in range(3)}
+    for name, data in photos.items():
+        (tmp_path / name).write_bytes(data)
+    by_hash = hashlib.sha256(photos["IMG_2.jpg"]).hexdigest()
+    sidecars = {
+        "IMG_0.jpg.proof.json": {"Location.Latitude": "1", "Location.Longitude": "2", "n": 0},
+        "IMG_1.json": {"n": 1},
+        f"{by_hash}.proof.json": {"n": 2},
+    }
+    for name, content in sidecars.items():
+        (tmp_path / name).write_text(json.dumps(content))
+
+    result = asyncio.run(parse_proofmode_contents(str(tmp_path)))
+
+    assert result["valid"]
+    matched = {media["filename"]: media["metadata"]["n"] for media in result["media_files"]}
+    assert matched == {"IMG_0.jpg": 0, "IMG_1.jpg": 1, "IMG_2.jpg": 2}
+
+
+def test_sidecar_index_parses_each_file_once(tmp_path, monkeypatch):
+    paths = []
+    for i in range(50):
+        path = tmp_path / f"IMG_{i}.jpg.proof.json"
+        path.write_text(json.dumps({"File": {"HashSHA256": f"{i:064x}"}}))
+        paths.append(str(path))
+    loads = []
+    original_load = json.load
+    monkeypatch.setattr(json, "load", lambda f: loads.append(f.name) or original_load(f))
+
+    index = index_proofmode_sidecars(paths)
+
+    assert sorted(loads) == sorted(paths)
+    assert index.match("IMG_7.jpg", "f" * 64) == {"File": {"HashSHA256": f"{7:064x}"}}
+    assert index.match("unrelated.jpg", f"{9:064x}") == {"File": {"HashSHA256": f"{9:064x}"}}
+    assert index.match("unrelated.jpg", "f" * 64) is None
+
+
+def test_malformed_sidecar_is_skipped(tmp_path):
+    (tmp_path / "IMG_0.jpg").write_bytes(b"a")
+    (tmp_path / "IMG_1.jpg").write_bytes(b"b")
+    (tmp_path / "IMG_0.jpg.proof.json").write_text(json.dumps({"n": 0}))
+    (tmp_path / "IMG_1.jpg.proof.json").write_text('{"n": 1,')
+
+    index = index_proofmode_sidecars([str(path) for path in sorted(tmp_path.glob("*.json"))])
+    result = asyncio.run(parse_proofmode_contents(str(tmp_path)))
+
+    assert index.match("IMG_0.jpg", "f" * 64) == {"n": 0}
+    assert index.match("IMG_1.jpg", "f" * 64) is None
+    assert result["valid"] and len(result["media_files"]) == 2
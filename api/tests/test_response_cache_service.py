@@ -0,0 +1,84 @@
+from unittest.mock import MagicMock
+
+from fastapi.testclient import TestClient
+
+from app.database import get_db
+import app.services.response_cache_service as module
+from app.main import app, items_cache_filters
+from app.models import EvidenceObject, IngestionJob
+from app.services.response_cache_service import (
+    DatasetVersion,
+    ResponseCache,
+    dataset_version,
+    etag_matches,
+    response_cache,
+)
+
+
+def test_version_bumps_only_on_committed_evidence_writes(sqlite_session_factory):
+    session = sqlite_session_factory(EvidenceObject, IngestionJob)
+    start = dataset_version.counter
+
+    session.add(EvidenceObject(object_name="bundles/a.zip", sha256="a" * 64, object_type="general_upload"))
+    session.flush()
+    session.rollback()
+    assert dataset_version.counter == start
+
+    session.add(IngestionJob(job_type="general", status="queued", spool_path="/tmp/x", filename="x"))
+    session.commit()
+    assert dataset_version.counter == start
+
+    session.add(EvidenceObject(object_name="bundles/b.zip", sha256="b" * 64, object_type="general_upload"))
+    session.commit()
+    assert dataset_version.counter == start + 1
+
+
+def test_tee_keeps_complete_small_bodies_until_the_version_moves():
+    version = DatasetVersion()
+    cache = ResponseCache(version, max_entry=8)
+    old = version.current()
+
+    assert b"".join(cache.tee("small", old, iter([b"abc", b"def"]))) == b"abcdef"
+    assert b"".join(cache.tee("large", old, iter([b"abcdef", b"ghijkl"]))) == b"abcdefghijkl"
+    assert cache.get(("small", old)) == b"abcdef"
+    assert cache.get(("large", old)) is None
+
+    version.bump()
+    assert cache.get(("small", old)) is None
+    assert ResponseCache.etag("small", old) != ResponseCache.etag("small", version.current())
+    assert etag_matches('"x", ' + ResponseCache.etag("small", old), ResponseCache.etag("small", old))
+    assert not etag_matches(None, ResponseCache.etag("small", old))
+
+
+def test_items_are_served_from_cache_and_revalidated_without_the_database():
+    db = MagicMock(side_effect=AssertionError("database touched"))
+    db.execute.side_effect = db.query.side_effect = AssertionError("database touched")
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        version = dataset_version.current()
+        key = ("items", 1000, 0, None, "none", *items_cache_filters())
+        response_cache.put((key, version), b'{"type":"FeatureCollection","features":[]}')
+        client = TestClient(app)
+
+        cached = client.get("/api/v1/items?limit=1000")
+        revalidated = client.get("/api/v1/items?limit=1000", headers={"If-None-Match": cached.headers["etag"]})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert cached.status_code == 200
+    assert cached.json() == {"type": "FeatureCollection", "features": []}
+    assert cached.headers["etag"] == ResponseCache.etag(key, version)
+    assert revalidated.status_code == 304
+    assert not db.execute.called
+
+
+def test_version_rolls_over_each_ttl_so_other_processes_ingests_surface(monkeypatch):
+    version = DatasetVersion(ttl=300)
+    monkeypatch.setattr(module.time, "time", lambda: 1000.0)
+    before = version.current()
+    monkeypatch.setattr(module.time, "time", lambda: 1199.0)
+    assert version.current() == before
+    # No local commit, yet a client revalidating after the TTL gets a fresh body
+    monkeypatch.setattr(module.time, "time", lambda: 1200.0)
+    assert version.current() != before
+    assert ResponseCache.etag("items", version.current()) != ResponseCache.etag("items", before)
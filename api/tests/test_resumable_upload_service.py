@@ -0,0 +1,79 @@
+import asyncio
+import hashlib
+import os
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from app.models import UploadSession
+from app.services.resumable_upload_service import ResumableUploadService, UploadSessionError
+
+
+@pytest.fixture
+def db(sqlite_session_factory):
+    return sqlite_session_factory(UploadSession)
+
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+
+def test_chunks_resume_and_hash_incrementally(db, tmp_path):
+    service = ResumableUploadService(spool_dir=str(tmp_path))
+    payload = b"0123456789" * 100
+    session = service.create(db, "bundle.zip", len(payload), upload_type="proofmode",
+                             expected_sha256=hashlib.sha256(payload).hexdigest())
+
+    asyncio.run(service.append(db, session.id, 0, _chunks(payload[:300], payload[300:400])))
+    # A retried chunk at a stale offset is rejected with the current offset
+    with pytest.raises(UploadSessionError) as exc:
+        asyncio.run(service.append(db, session.id, 0, _chunks(payload[:300])))
+    assert exc.value.status_code == 409
+
+    # Evicting the running hasher forces a rebuild from the spool file
+    service._hashers.clear()
+    asyncio.run(service.append(db, session.id, 400, _chunks(payload[400:]),
+                               chunk_sha256=hashlib.sha256(payload[400:]).hexdigest()))
+
+    finalized = asyncio.run(service.begin_finalize(db, session.id))
+    assert finalized.sha256 == hashlib.sha256(payload).hexdigest()
+    assert open(service.spool_path(session.id), "rb").read() == payload
+
+
+def test_bad_chunk_checksum_is_discarded(db, tmp_path):
+    service = ResumableUploadService(spool_dir=str(tmp_path))
+    session = service.create(db, "clip.mp4", 10)
+
+    with pytest.raises(UploadSessionError):
+        asyncio.run(service.append(db, session.id, 0, _chunks(b"12345"), chunk_sha256="0" * 64))
+
+    assert service.get(db, session.id).received_bytes == 0
+    assert open(service.spool_path(session.id), "rb").read() == b""
+
+
+def test_sweep_expires_abandoned_sessions_and_reopens_stuck_finalizes(db, tmp_path):
+    service = ResumableUploadService(spool_dir=str(tmp_path))
+    abandoned = service.create(db, "abandoned.zip", 10)
+    stuck = service.create(db, "stuck.zip", 5)
+    asyncio.run(service.append(db, stuck.id, 0, _chunks(b"12345")))
+    asyncio.run(service.begin_finalize(db, stuck.id))
+    active = service.create(db, "active.zip", 10)
+    # A spool file whose session finished on another process
+    orphan = tmp_path / f"{uuid.uuid4()}.part"
+    orphan.write_bytes(b"x")
+    os.utime(orphan, (0, 0))
+
+    later = datetime.utcnow() + timedelta(hours=2)
+    db.query(UploadSession).filter(UploadSession.id != active.id).update({"updated_at": later - timedelta(days=2)})
+    db.commit()
+    swept = service.expire_stale(db, now=later)
+
+    assert swept == {"reopened": 1, "expired": 1, "orphaned_spool_files": 1}
+    assert service.get(db, abandoned.id).status == "expired"
+    assert not os.path.exists(service.spool_path(abandoned.id))
+    # The stuck session keeps its bytes and can be finalized again
+    assert service.get(db, stuck.id).status == "open"
+    assert asyncio.run(service.begin_finalize(db, stuck.id)).sha256 == hashlib.sha256(b"12345").hexdigest()
+    assert service.get(db, active.id).status == "open" and os.path.exists(service.spool_path(active.id))
+    assert not orphan.exists()
@@ -0,0 +1,86 @@
+import asyncio
+
+from app.services.signature_service import SignatureVerifier, is_public_key_file
+
+def test_verifies_bundle_signatures_with_imported_key(signed_bundle, tmp_path):
+    bundle, fingerprint = signed_bundle
+    assert is_public_key_file(str(bundle / "pubkey.asc"))
+    assert not is_public_key_file(str(bundle / "1746004259789.jpg.asc"))
+
+    verifier = SignatureVerifier(gnupghome=str(tmp_path / "keyring"), max_workers=2)
+    try:
+        assert verifier.import_key_file(str(bundle / "pubkey.asc")) == [fingerprint]
+        # Second import of the same key block is served from the cache
+        assert verifier.import_key_file(str(bundle / "pubkey.asc")) == [fingerprint]
+        assert verifier.key(fingerprint)["fingerprint"] == fingerprint
+
+        (bundle / "1746004259789.json").write_bytes(b'{"Latitude": 2}')
+        pairs = [(str(bundle / f"{name}.asc"), str(bundle / name))
+                 for name in ("1746004259789.jpg", "1746004259789.json", "missing.jpg")]
+        results = asyncio.run(verifier.verify_many(pairs))
+    finally:
+        verifier.close()
+
+    assert [r["data_file"] for r in results] == ["1746004259789.jpg", "1746004259789.json", "missing.jpg"]
+    assert results[0]["valid"] and results[0]["fingerprint"] == fingerprint
+    assert not results[1]["valid"]
+    assert results[2] == {
+        "signature_file": "missing.jpg.asc", "data_file": "missing.jpg",
+        "valid": False, "error": "Corresponding data file not found"
+    }
+
+    # A fresh verifier on the same home sees the key without re-importing it
+    reopened = SignatureVerifier(gnupghome=str(tmp_path / "keyring"))
+    reopened.warm()
+    assert reopened.key(fingerprint) is not None
+
+
+def test_bundle_signed_by_another_keyring_key_is_rejected(signed_bundle, tmp_path, monkeypatch):
+    import gnupg
+
+    import app.main as main
+
+    bundle, fingerprint = signed_bundle
+    verifier = SignatureVerifier(gnupghome=str(tmp_path / "keyring"), max_workers=2, trusted_home=None)
+    monkeypatch.setattr(main, "signature_verifier", verifier)
+    monkeypatch.setattr(main, "GPG_SKIP_VERIFICATION", False)
+    monkeypatch.setattr(main, "TESTING_MODE", False)
+    try:
+        # An earlier bundle brought key A into the shared keyring
+        assert asyncio.run(main.verify_proofmode_signatures(str(bundle)))["valid"]
+
+        # This bundle is signed by A but ships key B
+        (tmp_path / "other").mkdir(mode=0o700)
+        other = gnupg.GPG(gnupghome=str(tmp_path / "other"))
+        key_b = other.gen_key(other.gen_key_input(
+            key_type="RSA", key_length=2048, name_email="other@proofmode.test", no_protection=True
+        ))
+        (bundle / "pubkey.asc").write_text(other.export_keys(key_b.fingerprint))
+        result = asyncio.run(main.verify_proofmode_signatures(str(bundle)))
+    finally:
+        verifier.close()
+
+    assert not result["valid"]
+    assert all(not v["valid"] and v["fingerprint"] == fingerprint for v in result["verifications"])
+    assert "not the bundle's public key" in result["errors"][0]
+
+
+def test_bundle_without_pubkey_falls_back_to_the_trusted_keyring(signed_bundle, tmp_path, monkeypatch):
+    import app.main as main
+
+    bundle, fingerprint = signed_bundle
+    (bundle / "pubkey.asc").unlink()
+    monkeypatch.setattr(main, "GPG_SKIP_VERIFICATION", False)
+    monkeypatch.setattr(main, "TESTING_MODE", False)
+    results = {}
+    for name, trusted_home in (("untrusted", str(tmp_path / "nowhere")), ("trusted", str(tmp_path / "signer"))):
+        verifier = SignatureVerifier(gnupghome=str(tmp_path / f"keyring-{name}"), trusted_home=trusted_home)
+        monkeypatch.setattr(main, "signature_verifier", verifier)
+        try:
+            results[name] = asyncio.run(main.verify_proofmode_signatures(str(bundle)))
+        finally:
+            verifier.close()
+
+    assert not results["untrusted"]["valid"]
+    assert results["trusted"]["valid"]
+    assert {v["fingerprint"] for v in results["trusted"]["verifications"]} == {fingerprint}
@@ -0,0 +1,47 @@
+import asyncio
+import io
+import threading
+import time
+
+from app.services.storage_service import UploadScheduler
+
+
+class SlowMinio:
+    """Tracks how many puts run at the same time."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.calls = []
+
+    def put_object(self, bucket, object_name, data, length, **kwargs):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.02)
+        with self.lock:
+            self.active -= 1
+            self.calls.append((object_name, data.read(length), kwargs))
+        return type("Result", (), {"version_id": object_name, "etag": "etag"})()
+
+
+def test_batch_caps_concurrency_and_keeps_order():
+    scheduler = UploadScheduler(max_workers=8, part_size=8 * 1024 * 1024, part_parallelism=2)
+    client = SlowMinio()
+
+    async def run():
+        batch = scheduler.batch(concurrency=3)
+        return await asyncio.gather(*(
+            batch.put_object(client, "evidence", f"media/{i}", io.BytesIO(b"x" * i), i)
+            for i in range(10)
+        ))
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        scheduler.close()
+
+    assert [r.version_id for r in results] == [f"media/{i}" for i in range(10)]
+    assert client.peak <= 3
+    assert all(kwargs["part_size"] == 8 * 1024 * 1024 for _, _, kwargs in client.calls)
@@ -0,0 +1,42 @@
+import asyncio
+import hashlib
+
+import pytest
+from PIL import Image, UnidentifiedImageError
+
+from app.services.thumbnail_service import ThumbnailService, render_derivatives
+
+
+def test_render_derivatives_downscales_jpeg_and_hashes_output(tmp_path):
+    path = tmp_path / "photo.jpg"
+    Image.new("RGB", (4000, 3000), (200, 30, 30)).save(path, "JPEG")
+
+    derivatives = render_derivatives(str(path), sizes=(512, 1024), formats=("jpeg",))
+
+    assert [(d.width, d.height) for d in derivatives] == [(1024, 768), (512, 384)]
+    for derivative in derivatives:
+        assert (derivative.original_width, derivative.original_height) == (4000, 3000)
+        assert derivative.sha256 == hashlib.sha256(derivative.data).hexdigest()
+        assert derivative.data[:2] == b"\xff\xd8"
+
+
+def test_service_renders_on_worker_processes(tmp_path):
+    png = tmp_path / "overlay.png"
+    Image.new("RGBA", (300, 100)).save(png)
+    not_an_image = tmp_path / "placeholder.jpg"
+    not_an_image.write_text("mock image")
+
+    service = ThumbnailService(max_workers=1)
+
+    async def render_both():
+        derivatives = await service.render_derivatives(str(png))
+        with pytest.raises(UnidentifiedImageError):
+            await service.render_derivatives(str(not_an_image))
+        return derivatives
+
+    try:
+        derivatives = asyncio.run(render_both())
+    finally:
+        service.close()
+    # Never upscaled: every level of a 300px image stays at 300px
+    assert {(d.width, d.height) for d in derivatives if d.size >= 512} == {(300, 100)}
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+from app.services.tile_service import (
+    TileCache,
+    TileService,
+    tile_filters,
+    tile_in_range,
+    tile_statement,
+)
+
+
+def test_tile_coordinates_are_validated():
+    assert tile_in_range(0, 0, 0)
+    assert tile_in_range(3, 7, 7)
+    assert not tile_in_range(3, 8, 0)
+    assert not tile_in_range(-1, 0, 0)
+    assert not tile_in_range(23, 0, 0)
+
+
+def test_statement_applies_filters_and_skips_prefilter_on_world_tiles():
+    filters = tile_filters("proofmode_bundle", datetime(2025, 1, 1, 2, tzinfo=timezone(timedelta(hours=2))), None)
+
+    world_sql, world_params = tile_statement(0, 0, 0, filters)
+    city_sql, city_params = tile_statement(14, 8185, 5447, filters)
+
+    assert "&&" not in str(world_sql) and "&&" in str(city_sql)
+    assert "o.object_type = :object_type" in str(city_sql)
+    assert "captured_to" not in str(city_sql)
+    assert city_params["captured_from"] == datetime(2025, 1, 1, 0)
+    assert (city_params["z"], city_params["x"], city_params["y"]) == (14, 8185, 5447)
+    assert world_params["object_type"] == "proofmode_bundle"
+
+
+def test_tiles_are_cached_per_filter():
+    db = MagicMock()
+    db.execute.return_value.scalar.return_value = memoryview(b"\x1a\x05tile")
+    service = TileService(TileCache(ttl=60))
+
+    assert service.tile(db, 5, 1, 2) == b"\x1a\x05tile"
+    assert service.tile(db, 5, 1, 2) == b"\x1a\x05tile"
+    service.tile(db, 5, 1, 2, tile_filters(object_type="general_upload"))
+
+    assert db.execute.call_count == 2
+    assert service.cache.stats()["hits"] == 1
+
+
+def test_cache_evicts_least_recently_used_over_budget_and_expires(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr("app.services.tile_service.time.monotonic", lambda: clock[0])
+    cache = TileCache(ttl=60, max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    cache.get("a")
+    cache.put("c", b"cccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa" and cache.get("c") == b"cccc"
+    assert cache.size_bytes == 8
+
+    clock[0] = 61.0
+    assert cache.get("a") is None
+    assert cache.size_bytes == 4
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from app.models import SignatureVerification
+from app.services.hashing_service import DigestCache
+from app.services.signature_service import SignatureVerifier
+from app.services.verification_cache_service import VerificationCache
+
+
+def test_identical_resubmission_is_answered_from_cache(signed_bundle, sqlite_session_factory, tmp_path, monkeypatch):
+    bundle, fingerprint = signed_bundle
+    db = sqlite_session_factory(SignatureVerification)
+    verifier = SignatureVerifier(gnupghome=str(tmp_path / "keyring"), max_workers=2)
+    verifier.import_key_file(str(bundle / "pubkey.asc"))
+    cache = VerificationCache(verifier)
+    pairs = [(str(bundle / f"{name}.asc"), str(bundle / name)) for name in ("1746004259789.jpg", "1746004259789.json")]
+
+    try:
+        first = asyncio.run(cache.verify_many(db, pairs, DigestCache()))
+        assert [(r["valid"], r["cached"]) for r in first] == [(True, False), (True, False)]
+        assert db.query(SignatureVerification).filter_by(fingerprint=fingerprint).count() == 2
+
+        def no_gpg(*args):
+            raise AssertionError("gpg should not run for a cached verdict")
+
+        monkeypatch.setattr(verifier, "verify_sync", no_gpg)
+        second = asyncio.run(cache.verify_many(db, pairs, DigestCache()))
+    finally:
+        verifier.close()
+
+    assert [(r["valid"], r["cached"], r["fingerprint"]) for r in second] == [(True, True, fingerprint)] * 2
+    assert [r["data_file"] for r in second] == ["1746004259789.jpg", "1746004259789.json"]
+    assert cache.stats() == {"hits": 2, "misses": 2}
+
+
+def test_verdict_for_another_key_is_not_reused(signed_bundle, sqlite_session_factory, tmp_path):
+    bundle, fingerprint = signed_bundle
+    db = sqlite_session_factory(SignatureVerification)
+    verifier = SignatureVerifier(gnupghome=str(tmp_path / "keyring"), max_workers=2)
+    verifier.import_key_file(str(bundle / "pubkey.asc"))
+    cache = VerificationCache(verifier)
+    pairs = [(str(bundle / "1746004259789.jpg.asc"), str(bundle / "1746004259789.jpg"))]
+    digests = asyncio.run(DigestCache().sha256_many([pairs[0][1], pairs[0][0]]))
+
+    db.add(SignatureVerification(
+        data_sha256=digests[pairs[0][1]], signature_sha256=digests[pairs[0][0]],
+        fingerprint="0" * 40, status="signature valid"
+    ))
+    db.commit()
+    try:
+        # Tamper with the data: the stale verdict of another key must not mask the failure
+        (bundle / "1746004259789.jpg").write_bytes(b"tampered")
+        result = asyncio.run(cache.verify_many(db, pairs, DigestCache()))
+        assert not result[0]["valid"] and not result[0]["cached"]
+        # Same bytes as the foreign verdict: still checked by gpg against the real key
+        (bundle / "1746004259789.jpg").write_bytes(b"\xff\xd8jpeg")
+        result = asyncio.run(cache.verify_many(db, pairs, DigestCache()))
+        assert result[0]["valid"] and not result[0]["cached"] and result[0]["fingerprint"] == fingerprint
+    finally:
+        verifier.close()
+    assert cache.stats() == {"hits": 0, "misses": 2}
+
+
+def test_cached_verdict_needs_the_bundles_own_key(signed_bundle, sqlite_session_factory, tmp_path, monkeypatch):
+    bundle, fingerprint = signed_bundle
+    db = sqlite_session_factory(SignatureVerification)
+    verifier = SignatureVerifier(gnupghome=str(tmp_path / "keyring"), max_workers=2)
+    verifier.import_key_file(str(bundle / "pubkey.asc"))
+    cache = VerificationCache(verifier)
+    pairs = [(str(bundle / "1746004259789.jpg.asc"), str(bundle / "1746004259789.jpg"))]
+
+    try:
+        assert asyncio.run(cache.verify_many(db, pairs, DigestCache(), {fingerprint}))[0]["valid"]
+        monkeypatch.setattr(verifier, "verify_sync", lambda *args: pytest.fail("gpg ran for a cached verdict"))
+        # Same bytes in a bundle that ships a different key
+        result = asyncio.run(cache.verify_many(db, pairs, DigestCache(), {"F" * 40}))
+    finally:
+        verifier.close()
+
+    assert result[0]["cached"] and not result[0]["valid"]
+    assert "not the bundle's public key" in result[0]["error"]
@@ -0,0 +1,64 @@
+import asyncio
+import shutil
+import subprocess
+
+import pytest
+
+from app.main import parse_proofmode_contents
+from app.services.video_service import VideoService, video_info
+
+PROBE = {
+    "format": {"format_name": "mov,mp4,m4a,3gp,3g2,mj2", "duration": "12.480000", "bit_rate": "8123456",
+               "tags": {"creation_time": "2025-04-30T09:11:04.000000Z"}},
+    "streams": [
+        {"codec_type": "video", "codec_name": "hevc", "width": 3840, "height": 2160,
+         "avg_frame_rate": "30000/1001", "tags": {"rotate": "90"}},
+        {"codec_type": "audio", "codec_name": "aac"},
+    ],
+}
+
+
+def test_video_info_summarises_ffprobe_output():
+    assert video_info(PROBE) == {
+        "duration": 12.48,
+        "container": "mov,mp4,m4a,3gp,3g2,mj2",
+        "bit_rate": 8123456,
+        "video_codec": "hevc",
+        "width": 3840,
+        "height": 2160,
+        "frame_rate": 29.97,
+        "rotation": 90,
+        "audio_codec": "aac",
+        "creation_time": "2025-04-30T09:11:04.000000Z",
+    }
+    assert video_info({"streams": [{"codec_type": "video", "avg_frame_rate": "0/0"}]})["frame_rate"] is None
+
+
+def test_bundle_videos_are_parsed_as_media(tmp_path):
+    (tmp_path / "clip.mov").write_bytes(b"\x00\x00\x00\x14ftypqt  ")
+    (tmp_path / "clip.mov.proof.json").write_text('{"n": 1}')
+
+    result = asyncio.run(parse_proofmode_contents(str(tmp_path)))
+
+    assert [(m["filename"], m["mime_type"], m["metadata"]) for m in result["media_files"]] == [
+        ("clip.mov", "video/quicktime", {"n": 1})
+    ]
+
+
+@pytest.mark.skipif(not VideoService.available(), reason="ffmpeg/ffprobe not installed")
+def test_extract_probes_and_writes_poster(tmp_path):
+    video = tmp_path / "clip.mp4"
+    subprocess.run(
+        [shutil.which("ffmpeg"), "-v", "error", "-f", "lavfi", "-i", "testsrc=duration=3:size=640x360:rate=25",
+         "-pix_fmt", "yuv420p", str(video)],
+        check=True,
+    )
+    service = VideoService(max_workers=1)
+    try:
+        extract = asyncio.run(service.extract(str(video), str(tmp_path / "poster.jpg")))
+    finally:
+        service.close()
+
+    assert (extract.info["width"], extract.info["height"]) == (640, 360)
+    assert extract.info["duration"] == pytest.approx(3.0, abs=0.1)
+    assert extract.poster_path and (tmp_path / "poster.jpg").stat().st_size > 0
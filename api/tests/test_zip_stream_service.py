@@ -0,0 +1,112 @@
+import hashlib
+import io
+import json
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.services.zip_stream_service import (
+    DigestMismatchError,
+    extract_members,
+    hash_stream,
+    list_members,
+    put_member,
+)
+
+
+class FakeMinio:
+    """Records put_object calls, reading the stream the way the SDK does."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, bucket, object_name, data, length, content_type=None, metadata=None, **options):
+        body = b""
+        while len(body) < length:
+            body += data.read(min(5, length - len(body)))
+        self.objects[object_name] = body
+        return type("Result", (), {"version_id": "v1", "etag": "etag"})()
+
+
+def make_zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    buffer.seek(0)
+    return buffer
+
+
+def test_hash_stream_rewinds():
+    stream = io.BytesIO(b"evidence")
+    digest, size = hash_stream(stream)
+    assert digest == hashlib.sha256(b"evidence").hexdigest()
+    assert size == 8
+    assert stream.tell() == 0
+
+
+def test_put_member_hashes_while_uploading():
+    payload = b"photo bytes" * 10
+    with zipfile.ZipFile(make_zip({"media/a.jpg": payload})) as zf:
+        client = FakeMinio()
+        info = list_members(zf)["media/a.jpg"]
+        _, digest = put_member(client, "evidence", "uploads/a.jpg", zf, info,
+                               expected_sha256=hashlib.sha256(payload).hexdigest())
+    assert digest == hashlib.sha256(payload).hexdigest()
+    assert client.objects["uploads/a.jpg"] == payload
+
+
+def test_put_member_aborts_on_digest_mismatch():
+    with zipfile.ZipFile(make_zip({"a.txt": b"tampered"})) as zf:
+        client = FakeMinio()
+        with pytest.raises(DigestMismatchError):
+            put_member(client, "evidence", "uploads/a.txt", zf, list_members(zf)["a.txt"],
+                       expected_sha256="0" * 64)
+    assert client.objects == {}
+
+
+def test_extract_members_refuses_ambiguous_names(tmp_path):
+    for name in ("../escape.txt", "dir/../ok.txt", "/abs.txt", "dir//ok.txt"):
+        with zipfile.ZipFile(make_zip({name: b"x", "dir/ok.txt": b"y"})) as zf:
+            with pytest.raises(ValueError):
+                extract_members(zf, str(tmp_path))
+    with zipfile.ZipFile(make_zip({"dir/ok.txt": b"y"})) as zf:
+        extracted = extract_members(zf, str(tmp_path))
+    assert extracted == {str(tmp_path / "dir" / "ok.txt"): hashlib.sha256(b"y").hexdigest()}
+
+
+def test_digest_mismatch_rejects_the_bundle_before_anything_is_stored(monkeypatch):
+    client = FakeMinio()
+    monkeypatch.setattr(main, "minio_client", client)
+    manifest = {"files": [
+        {"filename": "a.jpg", "sha256": hashlib.sha256(b"good").hexdigest()},
+        {"filename": "b.jpg", "sha256": "0" * 64},
+    ]}
+    bundle = make_zip({"manifest.json": json.dumps(manifest), "a.jpg": b"good", "b.jpg": b"tampered"})
+
+    response = TestClient(main.app).post(
+        "/api/v1/upload", files={"file": ("bundle.zip", bundle, "application/zip")}
+    )
+
+    assert response.status_code == 400
+    assert "b.jpg" in response.json()["errors"][0] and "minio_uploads" not in response.json()
+    assert client.objects == {}
+
+
+def test_unsafe_manifest_names_reject_the_bundle_before_anything_is_stored(monkeypatch):
+    client = FakeMinio()
+    monkeypatch.setattr(main, "minio_client", client)
+    members = {"a.jpg": b"good", "dir/../b.jpg": b"b", "/c.jpg": b"c"}
+    manifest = {"files": [{"filename": name, "sha256": hashlib.sha256(data).hexdigest()} for name, data in members.items()]}
+    bundle = make_zip({"manifest.json": json.dumps(manifest), **members})
+
+    response = TestClient(main.app).post(
+        "/api/v1/upload", files={"file": ("bundle.zip", bundle, "application/zip")}
+    )
+
+    assert response.status_code == 400
+    errors = " ".join(response.json()["errors"])
+    assert "dir/../b.jpg" in errors and "/c.jpg" in errors
+    assert client.objects == {}
@@ -365,7 +365,7 @@ const EvidenceMap = ({ onEvidenceSelect, onBack }) => {
                 <span>{formatDate(selectedEvidence.properties.created_at)}</span>
               </div>
               
-              {selectedEvidence.properties.mime_type?.startsWith('image/') && (
+              {hasPreview(selectedEvidence.properties.mime_type) && (
                 <div className="thumbnail-container">
                   <EvidenceThumbnail evidenceFile={selectedEvidence.properties} />
                 </div>
@@ -385,6 +385,12 @@ const EvidenceMap = ({ onEvidenceSelect, onBack }) => {
   );
 };
 
+// Rendered width of the popup preview in CSS pixels
+const POPUP_THUMBNAIL_WIDTH = 320;
+
+// Images and videos (via their poster frame) have stored previews
+const hasPreview = (mimeType) => Boolean(mimeType?.startsWith('image/') || mimeType?.startsWith('video/'));
+
 // Component to handle thumbnail display with presigned URLs
 const EvidenceThumbnail = ({ evidenceFile }) => {
   const [thumbnailUrl, setThumbnailUrl] = useState(null);
@@ -395,31 +401,40 @@ const EvidenceThumbnail = ({ evidenceFile }) => {
     const fetchThumbnail = async () => {
       try {
         setLoading(true);
-        // Use MinIO object name to get presigned URL
-        if (!evidenceFile.minio_object_name) {
-          setError('No file object name available');
+        if (!evidenceFile.id) {
+          setError('No file id available');
           return;
         }
-        const response = await axios.get(`/api/v1/files/${evidenceFile.minio_object_name}`);
-        if (response.data && response.data.presigned_url) {
-          setThumbnailUrl(response.data.presigned_url);
+        // Ask for the smallest stored rendition that fills the popup, not the original
+        const width = Math.round(POPUP_THUMBNAIL_WIDTH * (window.devicePixelRatio || 1));
+        const response = await axios.get(`/api/v1/evidence/files/${evidenceFile.id}/derivative`, {
+          params: { width }
+        });
+        const rendition = response.data;
+        // Never load an original that is not an image (e.g. a video without a poster) into <img>
+        const imageOnly = !rendition?.original || rendition.content_type?.startsWith('image/');
+        if (rendition?.presigned_url && imageOnly) {
+          setThumbnailUrl(rendition.presigned_url);
         }
       } catch (err) {
-        console.error('Failed to fetch thumbnail:', err);
-        setError('Failed to load preview');
+        // 404: the file has no preview rendition; fall through to the placeholder
+        if (err.response?.status !== 404) {
+          console.error('Failed to fetch thumbnail:', err);
+          setError('Failed to load preview');
+        }
       } finally {
         setLoading(false);
       }
     };
 
-    if (evidenceFile.mime_type?.startsWith('image/')) {
+    if (hasPreview(evidenceFile.mime_type)) {
       fetchThumbnail();
     } else {
       setLoading(false);
     }
   }, [evidenceFile]);
 
-  if (!evidenceFile.mime_type?.startsWith('image/')) {
+  if (!hasPreview(evidenceFile.mime_type)) {
     return <p>Preview not available for this file type</p>;
   }
 